@@ -0,0 +1,67 @@
+"""Compare ``bulk_ingest`` with ``bulk_create`` through the parent table on the test models."""
+import datetime
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from django.db import transaction
+from django.utils import timezone
+
+from tests.models import IntegerRangeTable, ListTableText, TimeRangeTableB
+
+
+def _measure(func: Callable, repeat: int) -> List[float]:
+    """Timings of several runs, each of them is rolled back."""
+    timings = list()
+    for _ in range(repeat):
+        with transaction.atomic():
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+            transaction.set_rollback(True)
+    return timings
+
+
+def _time_range_rows(count: int) -> List[TimeRangeTableB]:
+    now = timezone.now()
+    TimeRangeTableB.partitioning.create_partitions(until=now + datetime.timedelta(days=7))
+    return [TimeRangeTableB(text=str(i), timestamp=now + datetime.timedelta(seconds=i * 7 * 86400 // count)) for i in range(count)]
+
+
+def _integer_range_rows(count: int) -> List[IntegerRangeTable]:
+    with transaction.atomic():
+        # Spread the rows over about ten partitions.
+        config = IntegerRangeTable.partitioning.config
+        config.width = max(count // 10, 1)
+        config.save()
+    IntegerRangeTable.partitioning.create_partitions(until=count)
+    return [IntegerRangeTable(id=i, text=str(i)) for i in range(1, count + 1)]
+
+
+def _list_rows(count: int) -> List[ListTableText]:
+    categories = ["A", "B", "C", "D"]
+    for category in categories:
+        ListTableText.partitioning.create_partition(f"list_table_text_{category.lower()}", category)
+    return [ListTableText(category=categories[i % len(categories)]) for i in range(count)]
+
+
+def run(count: int, repeat: int) -> List[Dict]:
+    results = list()
+    for factory in (_time_range_rows, _integer_range_rows, _list_rows):
+        rows = factory(count)
+        model = type(rows[0])
+        # bulk_create sets the primary keys of the instances, so it runs last.
+        bulk_ingest = _measure(lambda: model.partitioning.bulk_ingest(rows), repeat)
+        bulk_create = _measure(lambda: model.objects.bulk_create(rows, batch_size=10000), repeat)
+        for case, timings in (("bulk_ingest", bulk_ingest), ("bulk_create", bulk_create)):
+            results.append(
+                dict(
+                    benchmark=case,
+                    case=model.__name__,
+                    seconds=min(timings),
+                    median=statistics.median(timings),
+                    rows=count,
+                    rows_per_second=count / min(timings),
+                )
+            )
+    return results
@@ -0,0 +1,165 @@
+"""Measure the partition management operations and the query paths of ``TimeRangeTableB``.
+
+The partitions are committed, because ``DETACH``, ``ATTACH`` and ``SET TABLESPACE`` of large partitions can't be
+measured on rows that are rolled back, and they are dropped after each benchmark.
+"""
+import datetime
+import json
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List
+
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from pg_partitioning.constants import SQL_DROP_TABLE, PeriodType
+from pg_partitioning.shortcuts import double_quote, execute_sql, set_tablespace
+from tests.models import TimeRangeTableB
+
+PARTITION_COUNTS = (1, 30, 365, 8760)
+# Partitions created or dropped by a single transaction, so that the locks it takes stay below ``max_locks_per_transaction``.
+CHUNK_SIZE = 365
+
+SQL_INSERT_SERIES = """\
+INSERT INTO %(name)s (text, timestamp) SELECT i::text, %(start)s::timestamptz + i * interval '1 millisecond' FROM generate_series(1, %(rows)s) i"""
+SQL_EXPLAIN = "EXPLAIN (SUMMARY, FORMAT JSON) %(query)s"
+PLANNED_QUERIES = (("pruned", "SELECT * FROM %(name)s WHERE timestamp = %(value)s"), ("unpruned", "SELECT * FROM %(name)s WHERE text = '0'"))
+
+
+def _result(benchmark: str, case: str, timings: List[float], **extra) -> Dict:
+    return dict(benchmark=benchmark, case=case, seconds=min(timings), median=statistics.median(timings), **extra)
+
+
+def _error(benchmark: str, case: str, error: Exception) -> Dict:
+    return dict(benchmark=benchmark, case=case, error=str(error).strip())
+
+
+def _time(func: Callable) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _drop_partitions(model) -> None:
+    """Drop the partitions of the model and their logs in chunks."""
+    log_model = model.partitioning.log_model
+    logs = list(log_model.objects.filter(config=model.partitioning.config))
+    while logs:
+        chunk, logs = logs[:CHUNK_SIZE], logs[CHUNK_SIZE:]
+        with transaction.atomic():
+            execute_sql([SQL_DROP_TABLE % {"name": double_quote(log.table_name)} for log in chunk])
+            log_model.objects.filter(pk__in=[log.pk for log in chunk]).delete()
+
+
+@contextmanager
+def _configured(model, **fields):
+    """Update the configuration of the model without partitions, and restore it afterwards."""
+    config = model.partitioning.config
+    previous = {name: getattr(config, name) for name in fields}
+    _drop_partitions(model)
+    type(config).objects.filter(pk=config.pk).update(**fields)
+    try:
+        yield
+    finally:
+        _drop_partitions(model)
+        type(config).objects.filter(pk=config.pk).update(**previous)
+
+
+def _create_partitions(model, count: int) -> None:
+    while count > 0:
+        count -= len(model.partitioning.create_partitions(count=min(count, CHUNK_SIZE)))
+
+
+def _planning_time(query: str) -> float:
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_EXPLAIN % {"query": query})
+        plan = cursor.fetchone()[0]
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return plan[0]["Planning Time"] / 1000
+
+
+def bench_create_partitions(counts: Iterable[int], repeat: int) -> List[Dict]:
+    """Create hourly partitions with ``create_partitions`` in chunks, then measure the planning time of queries on the table."""
+    model = TimeRangeTableB
+    table_name = double_quote(model._meta.db_table)
+    results = list()
+    with _configured(model, period=PeriodType.Hour, interval=None):
+        for count in counts:
+            timings, planning = list(), {name: list() for name, _ in PLANNED_QUERIES}
+            try:
+                for _ in range(repeat):
+                    _drop_partitions(model)
+                    timings.append(_time(lambda: _create_partitions(model, count)))
+                    value = "'%s'" % timezone.now().isoformat()
+                    for name, query in PLANNED_QUERIES:
+                        query = query % {"name": table_name, "value": value}
+                        try:
+                            # The first planning loads the partitions into the relation cache.
+                            _planning_time(query)
+                            planning[name].append(_planning_time(query))
+                        except DatabaseError as e:
+                            planning[name] = e
+            except DatabaseError as e:
+                results.append(_error("create_partitions", str(count), e))
+                continue
+            results.append(_result("create_partitions", str(count), timings, partitions=count))
+            for name, _ in PLANNED_QUERIES:
+                case = "%s %d" % (name, count)
+                if isinstance(planning[name], Exception):
+                    results.append(_error("planning_time", case, planning[name]))
+                else:
+                    results.append(_result("planning_time", case, planning[name], partitions=count))
+    return results
+
+
+def bench_large_partition(rows: int, repeat: int) -> List[Dict]:
+    """Detach, attach and move the tablespace of a partition of the given number of rows."""
+    model = TimeRangeTableB
+    config = model.partitioning.config
+    tablespaces = [config.attach_tablespace, config.detach_tablespace]
+    results = list()
+    # Attaching and detaching are measured without moving the partition.
+    with _configured(model, period=PeriodType.Day, interval=None, attach_tablespace=None, detach_tablespace=None):
+        start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        log = model.partitioning.create_partitions(until=start + datetime.timedelta(hours=1))[-1]
+        execute_sql(SQL_INSERT_SERIES % {"name": double_quote(log.table_name), "start": "'%s'" % log.start.isoformat(), "rows": rows})
+        execute_sql("ANALYZE %s" % double_quote(log.table_name))
+
+        detach, attach = list(), list()
+        for _ in range(repeat):
+            detach.append(_time(lambda: model.partitioning.detach_partition([log])))
+            attach.append(_time(lambda: model.partitioning.attach_partition([log])))
+        results.append(_result("detach_partition", str(rows), detach, rows=rows))
+        results.append(_result("attach_partition", str(rows), attach, rows=rows))
+
+        if all(tablespaces):
+            moves = list()
+            for i in range(repeat * 2):
+                moves.append(_time(lambda: set_tablespace(log.table_name, tablespaces[i % 2])))
+            results.append(_result("set_tablespace", str(rows), moves, rows=rows))
+    return results
+
+
+def bench_insert(rows: int, repeat: int) -> List[Dict]:
+    """Insert rows of a single partition through the parent table and directly into the partition, each run is rolled back."""
+    model = TimeRangeTableB
+    results = list()
+    with _configured(model, period=PeriodType.Day, interval=None):
+        start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        log = model.partitioning.create_partitions(until=start + datetime.timedelta(hours=1))[-1]
+        # Other partitions around it, which the parent table routes the rows among.
+        _create_partitions(model, 30)
+        for case, table_name in (("parent", model._meta.db_table), ("partition", log.table_name)):
+            sql = SQL_INSERT_SERIES % {"name": double_quote(table_name), "start": "'%s'" % log.start.isoformat(), "rows": rows}
+            timings = list()
+            for _ in range(repeat):
+                with transaction.atomic():
+                    timings.append(_time(lambda: execute_sql(sql)))
+                    transaction.set_rollback(True)
+            results.append(_result("insert", case, timings, rows=rows, rows_per_second=rows / min(timings)))
+    return results
+
+
+def run(rows: int, repeat: int, counts: Iterable[int] = PARTITION_COUNTS) -> List[Dict]:
+    return bench_create_partitions(counts, repeat) + bench_large_partition(rows, repeat) + bench_insert(rows, repeat)
@@ -1,32 +1,184 @@
-SQL_CREATE_TIME_RANGE_PARTITION = """\
-CREATE TABLE IF NOT EXISTS %(child)s PARTITION OF %(parent)s FOR VALUES FROM (%(date_start)s) TO (%(date_end)s)"""
+SQL_CREATE_RANGE_PARTITION = """\
+CREATE TABLE IF NOT EXISTS %(child)s PARTITION OF %(parent)s FOR VALUES FROM (%(start)s) TO (%(end)s)"""
 SQL_CREATE_LIST_PARTITION = """\
 CREATE TABLE IF NOT EXISTS %(child)s PARTITION OF %(parent)s FOR VALUES IN (%(value)s)"""
+SQL_CREATE_HASH_PARTITION = """\
+CREATE TABLE IF NOT EXISTS %(child)s PARTITION OF %(parent)s FOR VALUES WITH (MODULUS %(modulus)s, REMAINDER %(remainder)s)"""
+SQL_CREATE_DEFAULT_PARTITION = "CREATE TABLE IF NOT EXISTS %(child)s PARTITION OF %(parent)s DEFAULT"
+SQL_CREATE_TABLE_LIKE = "CREATE TABLE %(name)s (LIKE %(parent)s INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+SQL_CREATE_TABLE_LIKE_WITH_INDEXES = "CREATE TABLE %(name)s (LIKE %(parent)s INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING INDEXES)"
 SQL_SET_TABLE_TABLESPACE = """\
 ALTER TABLE IF EXISTS %(name)s SET TABLESPACE %(tablespace)s"""
 SQL_APPEND_TABLESPACE = " TABLESPACE %(tablespace)s"
-SQL_ATTACH_TIME_RANGE_PARTITION = """\
-ALTER TABLE IF EXISTS %(parent)s ATTACH PARTITION %(child)s FOR VALUES FROM (%(date_start)s) TO (%(date_end)s)"""
+SQL_APPEND_PARTITION_BY = " PARTITION BY %(type)s (%(column)s)"
+SQL_ATTACH_RANGE_PARTITION = """\
+ALTER TABLE IF EXISTS %(parent)s ATTACH PARTITION %(child)s FOR VALUES FROM (%(start)s) TO (%(end)s)"""
 SQL_ATTACH_LIST_PARTITION = """\
 ALTER TABLE IF EXISTS %(parent)s ATTACH PARTITION %(child)s FOR VALUES IN (%(value)s)"""
+SQL_ATTACH_HASH_PARTITION = """\
+ALTER TABLE IF EXISTS %(parent)s ATTACH PARTITION %(child)s FOR VALUES WITH (MODULUS %(modulus)s, REMAINDER %(remainder)s)"""
+SQL_ADD_CHECK_CONSTRAINT = "ALTER TABLE IF EXISTS %(name)s ADD CONSTRAINT %(constraint)s CHECK (%(condition)s) NOT VALID"
+SQL_VALIDATE_CONSTRAINT = "ALTER TABLE IF EXISTS %(name)s VALIDATE CONSTRAINT %(constraint)s"
+SQL_DROP_CONSTRAINT = "ALTER TABLE IF EXISTS %(name)s DROP CONSTRAINT IF EXISTS %(constraint)s"
+SQL_RANGE_CHECK = "%(column)s IS NOT NULL AND %(column)s >= %(start)s AND %(column)s < %(end)s"
+SQL_LIST_CHECK = "%(column)s IS NOT NULL AND %(column)s IN (%(value)s)"
+SQL_LIST_NULL_CHECK = "%(column)s IS NULL"
+SQL_NOT_CHECK = "NOT (%(condition)s)"
+SQL_HASH_CHECK = "satisfies_hash_partition(%(parent)s::regclass, %(modulus)s, %(remainder)s, %(column)s)"
 SQL_DETACH_PARTITION = "ALTER TABLE IF EXISTS %(parent)s DETACH PARTITION %(child)s"
+SQL_DETACH_PARTITION_CONCURRENTLY = "ALTER TABLE IF EXISTS %(parent)s DETACH PARTITION %(child)s CONCURRENTLY"
+SQL_DETACH_PARTITION_FINALIZE = "ALTER TABLE IF EXISTS %(parent)s DETACH PARTITION %(child)s FINALIZE"
+SQL_GET_PENDING_DETACH_PARTITIONS = """\
+SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %(parent)s::regclass AND i.inhdetachpending"""
+SQL_GET_ATTACHED_PARTITIONS = """\
+SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %(parent)s::regclass%(condition)s"""
+SQL_GET_PARTITIONS = """\
+SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid \
+WHERE i.inhparent = %(parent)s::regclass ORDER BY c.relname"""
+SQL_GET_PARTITION_STATS = """\
+SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), ts.spcname, s.table_size, s.indexes_size, s.total_size, s.row_estimate, \
+s.dead_tuples, s.last_vacuum, s.last_autovacuum, s.last_analyze, s.last_autoanalyze \
+FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid LEFT JOIN pg_tablespace ts ON ts.oid = c.reltablespace \
+CROSS JOIN LATERAL (SELECT coalesce(sum(pg_table_size(t.relid)), 0)::bigint AS table_size, \
+coalesce(sum(pg_indexes_size(t.relid)), 0)::bigint AS indexes_size, coalesce(sum(pg_total_relation_size(t.relid)), 0)::bigint AS total_size, \
+coalesce(sum(greatest(l.reltuples, 0)), 0)::bigint AS row_estimate, coalesce(sum(st.n_dead_tup), 0)::bigint AS dead_tuples, \
+min(st.last_vacuum) AS last_vacuum, min(st.last_autovacuum) AS last_autovacuum, \
+min(st.last_analyze) AS last_analyze, min(st.last_autoanalyze) AS last_autoanalyze \
+FROM (WITH RECURSIVE tree(relid) AS (SELECT c.oid UNION ALL SELECT inhrelid FROM pg_inherits JOIN tree ON inhparent = tree.relid) \
+SELECT relid FROM tree) t JOIN pg_class l ON l.oid = t.relid LEFT JOIN pg_stat_user_tables st ON st.relid = t.relid WHERE l.relkind <> 'p') s \
+WHERE i.inhparent = %(parent)s::regclass ORDER BY c.relname"""
+SQL_GET_PARTITION_DRIFT = """\
+WITH p AS (SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid \
+WHERE i.inhparent = %(parent)s::regclass) \
+SELECT coalesce(n.name, p.relname), c.oid IS NOT NULL, p.relname IS NOT NULL, p.bound, ts.spcname \
+FROM unnest(%(names)s::text[]) n(name) FULL JOIN p ON p.relname = n.name \
+LEFT JOIN pg_class c ON c.oid = to_regclass(quote_ident(coalesce(n.name, p.relname))) LEFT JOIN pg_tablespace ts ON ts.oid = c.reltablespace"""
+SQL_LOCK_TABLE = "LOCK TABLE %(name)s IN %(mode)s MODE"
+SQL_INSERT_HASH_REMAINDER = """\
+INSERT INTO %(child)s SELECT * FROM %(source)s WHERE satisfies_hash_partition(%(parent)s::regclass, %(modulus)s, %(remainder)s, %(column)s)"""
+SQL_SELECT_MAX = "SELECT max(%(column)s) FROM %(name)s"
+SQL_SELECT_DISTINCT = "SELECT DISTINCT %(column)s FROM %(name)s"
+SQL_MOVE_ROWS = """\
+WITH moved AS (DELETE FROM %(source)s WHERE ctid IN (SELECT ctid FROM %(source)s WHERE %(condition)s LIMIT %(limit)s) RETURNING *), \
+inserted AS (INSERT INTO %(target)s SELECT * FROM moved RETURNING 1) SELECT count(*) FROM inserted"""
+SQL_COPY_FROM_STDIN = "COPY %(name)s (%(columns)s) FROM STDIN"
+SQL_COPY_TO_STDOUT_BINARY = "COPY (SELECT * FROM %(name)s) TO STDOUT (FORMAT binary)"
+SQL_COPY_FROM_STDIN_BINARY = "COPY %(name)s FROM STDIN (FORMAT binary)"
+SQL_GET_RELKIND = "SELECT relkind FROM pg_class WHERE oid = to_regclass(%(name)s)"
+SQL_SELECT_MIN_MAX = "SELECT min(%(column)s), max(%(column)s) FROM %(name)s"
+SQL_GET_INDEX_DEFINITIONS = """\
+SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisunique, i.indisprimary, \
+ARRAY(SELECT a.attname::text FROM pg_attribute a WHERE a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) \
+ORDER BY array_position(i.indkey::int2[], a.attnum)) FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid \
+WHERE i.indrelid = %(name)s::regclass ORDER BY c.relname"""
+SQL_GET_FOREIGN_KEYS = "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %(name)s::regclass AND contype = 'f'"
+SQL_GET_REFERENCING_FOREIGN_KEYS = "SELECT conname FROM pg_constraint WHERE confrelid = %(name)s::regclass AND contype = 'f'"
+SQL_GET_SERIAL_SEQUENCES = """\
+SELECT attname, pg_get_serial_sequence(%(name)s, attname) FROM pg_attribute \
+WHERE attrelid = %(name)s::regclass AND attnum > 0 AND NOT attisdropped AND pg_get_serial_sequence(%(name)s, attname) IS NOT NULL"""
+SQL_ADD_CONSTRAINT = "ALTER TABLE %(name)s ADD CONSTRAINT %(constraint)s %(definition)s"
+SQL_SET_SEQUENCE_OWNER = "ALTER SEQUENCE %(sequence)s OWNED BY %(name)s.%(column)s"
+SQL_RENAME_TABLE = "ALTER TABLE %(name)s RENAME TO %(new_name)s"
+SQL_RENAME_INDEX = "ALTER INDEX %(name)s RENAME TO %(new_name)s"
+SQL_CREATE_SYNC_FUNCTION = """\
+CREATE OR REPLACE FUNCTION %(function)s() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    DELETE FROM %(target)s WHERE %(pk)s = OLD.%(pk)s AND %(column)s = OLD.%(column)s;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO %(target)s SELECT NEW.*;
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql"""
+SQL_CREATE_SYNC_TRIGGER = "CREATE TRIGGER %(trigger)s AFTER INSERT OR UPDATE OR DELETE ON %(name)s FOR EACH ROW EXECUTE PROCEDURE %(function)s()"
+SQL_DROP_FUNCTION = "DROP FUNCTION IF EXISTS %(function)s() CASCADE"
+SQL_SELECT_BATCH_END = """\
+SELECT %(column)s FROM %(name)s WHERE %(condition)s AND %(column)s IS NOT NULL ORDER BY %(column)s OFFSET %(offset)s LIMIT 1"""
+SQL_SELECT_NULL_EXISTS = "SELECT EXISTS (SELECT FROM %(name)s WHERE %(column)s IS NULL)"
+SQL_LOCK_ROWS = "SELECT count(*) FROM (SELECT 1 FROM %(name)s WHERE %(condition)s FOR SHARE) locked"
+SQL_BACKFILL_ROWS = """\
+INSERT INTO %(target)s SELECT * FROM %(source)s s WHERE %(condition)s \
+AND NOT EXISTS (SELECT 1 FROM %(target)s t WHERE t.%(pk)s = s.%(pk)s AND t.%(column)s = s.%(column)s)"""
+SQL_GET_TABLE_SIZES = """\
+SELECT n.name, coalesce(sum(pg_total_relation_size(t.relid)), 0), coalesce(sum(pg_relation_size(t.relid)), 0) \
+FROM unnest(%(names)s::text[]) n(name) CROSS JOIN LATERAL (WITH RECURSIVE tree(relid) AS (SELECT to_regclass(quote_ident(n.name))::oid \
+UNION ALL SELECT inhrelid FROM pg_inherits JOIN tree ON inhparent = tree.relid) SELECT relid FROM tree) t GROUP BY n.name"""
+SQL_GET_BACKEND_LOCK_WAIT = "SELECT wait_event_type = 'Lock' FROM pg_stat_activity WHERE pid = %(pid)s"
+SQL_ADVISORY_XACT_LOCK = "SELECT pg_advisory_xact_lock(%(key)s)"
+SQL_TRY_ADVISORY_XACT_LOCK = "SELECT pg_try_advisory_xact_lock(%(key)s)"
+SQL_TRY_ADVISORY_LOCK = "SELECT pg_try_advisory_lock(%(key)s)"
+SQL_ADVISORY_UNLOCK = "SELECT pg_advisory_unlock(%(key)s)"
+SQL_SET_LOCK_TIMEOUT = "SET lock_timeout = %(timeout)s"
+SQL_RESET_LOCK_TIMEOUT = "RESET lock_timeout"
 SQL_DROP_TABLE = "DROP TABLE IF EXISTS %(name)s"
 SQL_TRUNCATE_TABLE = "TRUNCATE TABLE %(name)s"
 SQL_DROP_INDEX = "DROP INDEX IF EXISTS %(name)s"
 SQL_CREATE_INDEX = "CREATE INDEX IF NOT EXISTS %(name)s ON %(table_name)s USING %(method)s (%(column_name)s)"
 SQL_SET_INDEX_TABLESPACE = "ALTER INDEX %(name)s SET TABLESPACE %(tablespace)s"
 SQL_GET_TABLE_INDEXES = "SELECT indexname FROM pg_indexes WHERE tablename = %(table_name)s"
+SQL_GET_INDEXES = """\
+SELECT c.relname, i.indexrelid::regclass::text, coalesce(s.spcname, d.spcname) \
+FROM unnest(%(names)s::text[]) n(name) CROSS JOIN LATERAL to_regclass(quote_ident(n.name)) r(oid) \
+CROSS JOIN LATERAL (WITH RECURSIVE tree(relid) AS (SELECT r.oid UNION ALL \
+SELECT inhrelid FROM pg_inherits JOIN tree ON inhparent = tree.relid) SELECT relid FROM tree) t(relid) \
+JOIN pg_class c ON c.oid = t.relid JOIN pg_index i ON i.indrelid = t.relid JOIN pg_class ic ON ic.oid = i.indexrelid \
+LEFT JOIN pg_tablespace s ON s.oid = ic.reltablespace \
+JOIN pg_tablespace d ON d.oid = (SELECT dattablespace FROM pg_database WHERE datname = current_database()) \
+ORDER BY c.relname, ic.relname"""
+SQL_SET_LOCAL_DEFAULT_TABLESPACE = """\
+SELECT set_config('pg_partitioning.default_tablespace', current_setting('default_tablespace'), true), \
+set_config('default_tablespace', %(tablespace)s, true)"""
+SQL_RESTORE_DEFAULT_TABLESPACE = "SELECT set_config('default_tablespace', current_setting('pg_partitioning.default_tablespace'), true)"
 
 DT_FORMAT = "%Y-%m-%d"
+# Sub-day partitions are named in UTC, local names would collide when clocks are turned back.
+DT_FORMAT_SUB_DAY = "%Y%m%dT%H%MZ"
+
+PGCODE_LOCK_NOT_AVAILABLE = "55P03"
 
 
 class PartitioningType:
     Range = "RANGE"
     List = "LIST"
+    Hash = "HASH"
+
+
+class CompressionType:
+    Gzip = "gzip"
+    Zstd = "zstd"
+
+
+class DriftType:
+    Missing = "missing"
+    Orphaned = "orphaned"
+    WronglyAttached = "wrongly attached"
+    WrongTablespace = "wrong tablespace"
+
+
+class RetentionAction:
+    Drop = "drop"
+    Truncate = "truncate"
 
 
 class PeriodType:
+    Minute = "Minute"
+    Hour = "Hour"
     Day = "Day"
     Week = "Week"
     Month = "Month"
     Year = "Year"
+
+    @staticmethod
+    def multiple(count: int, period: str) -> str:
+        """A period of several minutes or hours, for example ``PeriodType.multiple(15, PeriodType.Minute)``."""
+        if period not in (PeriodType.Minute, PeriodType.Hour) or count < 1:
+            raise ValueError("Only a positive number of minutes or hours is supported.")
+        return "%d %s" % (count, period)
+
+    @staticmethod
+    def parse(period: str):
+        """Split a period into its count and unit, for example ``"15 Minute"`` into ``(15, "Minute")``."""
+        count, _, unit = period.rpartition(" ")
+        return int(count or 1), unit
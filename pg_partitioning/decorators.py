@@ -3,7 +3,8 @@ from typing import Type
 
 from django.db import models
 
-from pg_partitioning.manager import ListPartitionManager, TimeRangePartitionManager
+from pg_partitioning.constants import PartitioningType
+from pg_partitioning.manager import HashPartitionManager, IntegerRangePartitionManager, ListPartitionManager, TimeRangePartitionManager
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +18,18 @@ class _PartitioningBase:
         if model._meta.abstract:
             raise NotImplementedError("Decorative abstract model classes are not supported.")
 
+    def _check_subpartition_options(self, model: Type[models.Model]):
+        subpartition_type = self.options.get("subpartition_type")
+        if not subpartition_type:
+            return
+        if subpartition_type not in (PartitioningType.List, PartitioningType.Hash):
+            raise ValueError("The subpartition_type must be PartitioningType.List or PartitioningType.Hash.")
+        model._meta.get_field(self.options.get("subpartition_key"))
+        if subpartition_type == PartitioningType.List and not self.options.get("subpartition_values"):
+            raise ValueError("The subpartition_values must be specified for list sub-partitioning.")
+        if subpartition_type == PartitioningType.Hash and not self.options.get("subpartition_modulus"):
+            raise ValueError("The subpartition_modulus must be specified for hash sub-partitioning.")
+
 
 class TimeRangePartitioning(_PartitioningBase):
     """Use this decorator to declare the database table corresponding to the model to be partitioned by time range.
@@ -29,6 +42,13 @@ class TimeRangePartitioning(_PartitioningBase):
         - default_interval(int): Default detach partition interval.
         - default_attach_tablespace(str): Default tablespace for attached tables.
         - default_detach_tablespace(str): Default tablespace for attached tables.
+        - default_partition(bool): Create a default partition together with the table, which stores rows that don't belong to any other partition.
+        - lock_timeout(int): Milliseconds to wait for locks while attaching or detaching partitions, no limit by default.
+        - lock_retries(int): Times to retry with a jittered backoff when a lock can't be acquired in time, default is 0.
+        - subpartition_type(PartitioningType): Sub-partition each partition by ``PartitioningType.List`` or ``PartitioningType.Hash``.
+        - subpartition_key(str): Sub-partition key name.
+        - subpartition_values(dict): Name suffixes of list sub-partitions mapped to a value or a list of values.
+        - subpartition_modulus(int): Number of hash sub-partitions.
 
     Example:
       .. code-block:: python
@@ -49,15 +69,73 @@ class TimeRangePartitioning(_PartitioningBase):
         super().__call__(model)
         if model._meta.get_field(self.partition_key).get_internal_type() != models.DateTimeField().get_internal_type():
             raise ValueError("The partition_key must be DateTimeField type.")
+        self._check_subpartition_options(model)
         model.partitioning = TimeRangePartitionManager(model, self.partition_key, self.options)
         return model
 
 
+class IntegerRangePartitioning(_PartitioningBase):
+    """Use this decorator to declare the database table corresponding to the model to be partitioned by integer range.
+
+    Parameters:
+      partition_key(str): Partition field name of integer type, typically the auto-increment primary key.
+      options: Currently supports the following keyword parameters:
+
+        - default_width(int): Default partition width, default is 1000000.
+        - default_interval(int): Default detach partition interval, in numbers of widths below the current maximum value.
+        - default_attach_tablespace(str): Default tablespace for attached tables.
+        - default_detach_tablespace(str): Default tablespace for attached tables.
+        - default_partition(bool): Create a default partition together with the table, which stores rows that don't belong to any other partition.
+        - lock_timeout(int): Milliseconds to wait for locks while attaching or detaching partitions, no limit by default.
+        - lock_retries(int): Times to retry with a jittered backoff when a lock can't be acquired in time, default is 0.
+        - subpartition_type(PartitioningType): Sub-partition each partition by ``PartitioningType.List`` or ``PartitioningType.Hash``.
+        - subpartition_key(str): Sub-partition key name.
+        - subpartition_values(dict): Name suffixes of list sub-partitions mapped to a value or a list of values.
+        - subpartition_modulus(int): Number of hash sub-partitions.
+
+    Example:
+      .. code-block:: python
+
+          from django.db import models
+
+          from pg_partitioning.decorators import IntegerRangePartitioning
+
+
+          @IntegerRangePartitioning(partition_key="id", default_width=10000000)
+          class MyLog(models.Model):
+              id = models.BigAutoField(primary_key=True)
+              name = models.TextField(default="Hello World!")
+    """
+
+    integer_types = (
+        "AutoField",
+        "BigAutoField",
+        "BigIntegerField",
+        "IntegerField",
+        "PositiveIntegerField",
+        "PositiveSmallIntegerField",
+        "SmallIntegerField",
+    )
+
+    def __call__(self, model: Type[models.Model]):
+        super().__call__(model)
+        if model._meta.get_field(self.partition_key).get_internal_type() not in self.integer_types:
+            raise ValueError("The partition_key must be integer type.")
+        self._check_subpartition_options(model)
+        model.partitioning = IntegerRangePartitionManager(model, self.partition_key, self.options)
+        return model
+
+
 class ListPartitioning(_PartitioningBase):
     """Use this decorator to declare the database table corresponding to the model to be partitioned by list.
 
     Parameters:
       partition_key(str): Partition key name, the type of the key must be one of boolean, text or integer.
+      options: Currently supports the following keyword parameters:
+
+        - default_partition(bool): Create a default partition together with the table, which stores rows that don't belong to any other partition.
+        - lock_timeout(int): Milliseconds to wait for locks while attaching or detaching partitions, no limit by default.
+        - lock_retries(int): Times to retry with a jittered backoff when a lock can't be acquired in time, default is 0.
 
     Example:
       .. code-block:: python
@@ -78,3 +156,36 @@ class ListPartitioning(_PartitioningBase):
         super().__call__(model)
         model.partitioning = ListPartitionManager(model, self.partition_key, self.options)
         return model
+
+
+class HashPartitioning(_PartitioningBase):
+    """Use this decorator to declare the database table corresponding to the model to be partitioned by hash.
+    All partitions are created together with the table.
+
+    Parameters:
+      partition_key(str): Partition key name.
+      options: Currently supports the following keyword parameters:
+
+        - modulus(int): Number of partitions, default is 8.
+        - tablespace(str): Tablespace for partitions.
+        - lock_timeout(int): Milliseconds to wait for locks while splitting partitions, no limit by default.
+        - lock_retries(int): Times to retry with a jittered backoff when a lock can't be acquired in time, default is 0.
+
+    Example:
+      .. code-block:: python
+
+          from django.db import models
+
+          from pg_partitioning.decorators import HashPartitioning
+
+
+          @HashPartitioning(partition_key="id", modulus=16)
+          class MyLog(models.Model):
+              id = models.BigAutoField(primary_key=True)
+              name = models.TextField(default="Hello World!")
+    """
+
+    def __call__(self, model: Type[models.Model]):
+        super().__call__(model)
+        model.partitioning = HashPartitionManager(model, self.partition_key, self.options)
+        return model
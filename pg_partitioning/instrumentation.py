@@ -0,0 +1,277 @@
+"""
+Instrumentation of the SQL statements executed by pg_partitioning.
+
+Every batch of statements run by :func:`pg_partitioning.shortcuts.execute_sql` is measured while at least one collector is
+registered, and nothing is measured otherwise.
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.db import connection
+
+from pg_partitioning.constants import SQL_GET_BACKEND_LOCK_WAIT, SQL_GET_TABLE_SIZES
+
+logger = logging.getLogger(__name__)
+
+_TABLE_PATTERN = re.compile(
+    r"\b(?:TABLE|PARTITION OF|ATTACH PARTITION|DETACH PARTITION|INSERT INTO|COPY)\s+(?:IF (?:NOT )?EXISTS\s+)?(?:ONLY\s+)?"
+    r'("(?:[^"]|"")+"|[A-Za-z_][\w$]*)',
+    re.IGNORECASE,
+)
+_COMMAND_PATTERN = re.compile(r"^\s*(?:(CREATE|ALTER|DROP)\s+(?:UNIQUE\s+)?(\w+)|(\w+))", re.IGNORECASE)
+
+
+class StatementMetrics(NamedTuple):
+    """The metrics of a batch of statements executed in one round trip."""
+
+    step: str
+    command: str
+    tables: Tuple[str, ...]
+    statements: int
+    duration: float
+    lock_wait: Optional[float]
+    table_sizes: Dict[str, int]
+    failed: bool
+
+
+class Collector:
+    """The base class of the collectors of :class:`StatementMetrics`.
+
+    Parameters:
+      lock_wait_interval(float): The interval in seconds at which ``pg_stat_activity`` is sampled from a separate connection
+        to measure the time spent waiting on locks. None disables the sampling, and the lock wait of the metrics is None.
+    """
+
+    def __init__(self, lock_wait_interval: Optional[float] = None):
+        self.lock_wait_interval = lock_wait_interval
+
+    def collect(self, metrics: StatementMetrics) -> None:
+        raise NotImplementedError
+
+
+class MemoryCollector(Collector):
+    """Keep the metrics in memory, in the order they are collected."""
+
+    def __init__(self, lock_wait_interval: Optional[float] = None):
+        super().__init__(lock_wait_interval)
+        self.metrics: List[StatementMetrics] = []
+        self._lock = threading.Lock()
+
+    def collect(self, metrics: StatementMetrics) -> None:
+        with self._lock:
+            self.metrics.append(metrics)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.metrics = []
+
+
+class PrometheusCollector(Collector):
+    """Aggregate the metrics by step and command, and export them in the Prometheus text format."""
+
+    def __init__(self, lock_wait_interval: Optional[float] = None, prefix: str = "pg_partitioning"):
+        super().__init__(lock_wait_interval)
+        self.prefix = prefix
+        self._counters: Dict[Tuple[str, str], List[float]] = OrderedDict()
+        self._sizes: Dict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def collect(self, metrics: StatementMetrics) -> None:
+        with self._lock:
+            counter = self._counters.setdefault((metrics.step, metrics.command), [0, 0, 0.0, 0.0])
+            counter[0] += metrics.statements
+            counter[1] += metrics.failed
+            counter[2] += metrics.duration
+            counter[3] += metrics.lock_wait or 0.0
+            self._sizes.update(metrics.table_sizes)
+
+    def export(self) -> str:
+        """Render the collected metrics in the Prometheus text exposition format."""
+        families = (
+            ("statements_total", "counter", "Number of SQL statements executed.", 0),
+            ("failed_batches_total", "counter", "Number of batches of SQL statements that failed.", 1),
+            ("statement_seconds_total", "counter", "Wall time spent executing SQL statements.", 2),
+            ("lock_wait_seconds_total", "counter", "Time spent waiting on locks while executing SQL statements.", 3),
+        )
+        lines = []
+        with self._lock:
+            for name, kind, description, index in families:
+                name = "%s_%s" % (self.prefix, name)
+                lines += ["# HELP %s %s" % (name, description), "# TYPE %s %s" % (name, kind)]
+                for (step, command), counter in self._counters.items():
+                    lines.append('%s{step="%s",command="%s"} %s' % (name, _escape(step), _escape(command), _number(counter[index])))
+            name = "%s_table_size_bytes" % self.prefix
+            lines += ["# HELP %s Total size of a table after it was changed." % name, "# TYPE %s gauge" % name]
+            for table, size in self._sizes.items():
+                lines.append('%s{table="%s"} %s' % (name, _escape(table), size))
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+_collectors: List[Collector] = []
+_collectors_lock = threading.Lock()
+_local = threading.local()
+
+
+def register_collector(collector: Collector) -> None:
+    """Start sending the metrics of the statements executed in any thread to the collector."""
+    with _collectors_lock:
+        if collector not in _collectors:
+            _collectors.append(collector)
+
+
+def unregister_collector(collector: Collector) -> None:
+    """Stop sending metrics to the collector."""
+    with _collectors_lock:
+        if collector in _collectors:
+            _collectors.remove(collector)
+
+
+@contextmanager
+def collect(collector: Collector):
+    """Register the collector while the context is active.
+
+    Parameters:
+      collector(Collector): The collector.
+
+    Returns:
+      Collector: The collector.
+    """
+    register_collector(collector)
+    try:
+        yield collector
+    finally:
+        unregister_collector(collector)
+
+
+@contextmanager
+def step(name: str):
+    """Label the statements executed by the current thread while the context is active with the name of a step,
+    such as ``create_partition``. Steps can be nested, the innermost one labels the statements."""
+    previous = getattr(_local, "step", "")
+    _local.step = name
+    try:
+        yield
+    finally:
+        _local.step = previous
+
+
+def parse_tables(statements: Sequence[str]) -> Tuple[str, ...]:
+    """Extract the names of the tables changed by the statements, in order of appearance."""
+    tables = OrderedDict()
+    for statement in statements:
+        for match in _TABLE_PATTERN.finditer(statement):
+            name = match.group(1)
+            if name.startswith('"'):
+                name = name[1:-1].replace('""', '"')
+            tables[name] = None
+    return tuple(tables)
+
+
+def parse_command(statements: Sequence[str]) -> str:
+    """The command tag of the first statement that is not a ``SET`` or ``RESET``, such as ``ALTER TABLE``."""
+    commands = []
+    for statement in statements:
+        match = _COMMAND_PATTERN.match(statement)
+        if match:
+            commands.append(" ".join(word.upper() for word in match.groups() if word))
+    for command in commands:
+        if command not in ("SET", "RESET"):
+            return command
+    return commands[0] if commands else ""
+
+
+class _LockWaitSampler(threading.Thread):
+    """Sample the wait event of a backend from a separate connection and sum the time it waits on locks."""
+
+    def __init__(self, pid: int, interval: float):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.lock_wait = 0.0
+        self._connection = connection.get_new_connection(connection.get_connection_params())
+        self._connection.autocommit = True
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        try:
+            with self._connection.cursor() as cursor:
+                last = time.monotonic()
+                while not self._stopped.is_set():
+                    cursor.execute(SQL_GET_BACKEND_LOCK_WAIT, {"pid": self.pid})
+                    row = cursor.fetchone()
+                    now = time.monotonic()
+                    if row and row[0]:
+                        self.lock_wait += now - last
+                    last = now
+                    self._stopped.wait(self.interval)
+        except Exception:
+            logger.exception("Failed to sample the lock waits of backend %s.", self.pid)
+        finally:
+            self._connection.close()
+
+    def stop(self) -> float:
+        self._stopped.set()
+        self.join()
+        return self.lock_wait
+
+
+def _get_table_sizes(tables: Sequence[str]) -> Dict[str, int]:
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_GET_TABLE_SIZES % {"names": "%s"}, [list(tables)])
+        return {name: size for name, size, _ in cursor.fetchall() if size}
+
+
+@contextmanager
+def instrument(statements: Sequence[str]):
+    """Measure the execution of a batch of statements on the default connection and send the metrics to the
+    registered collectors. Does nothing when no collector is registered."""
+    with _collectors_lock:
+        collectors = list(_collectors)
+    if not collectors:
+        yield
+        return
+
+    intervals = [collector.lock_wait_interval for collector in collectors if collector.lock_wait_interval]
+    connection.ensure_connection()
+    sampler = _LockWaitSampler(connection.connection.get_backend_pid(), min(intervals)) if intervals else None
+    if sampler:
+        sampler.start()
+    failed = True
+    start = time.monotonic()
+    try:
+        yield
+        failed = False
+    finally:
+        duration = time.monotonic() - start
+        lock_wait = sampler.stop() if sampler else None
+        tables = parse_tables(statements)
+        # The sizes cannot be read once the transaction is aborted.
+        table_sizes = _get_table_sizes(tables) if tables and not failed else {}
+        metrics = StatementMetrics(
+            step=getattr(_local, "step", ""),
+            command=parse_command(statements),
+            tables=tables,
+            statements=len(statements),
+            duration=duration,
+            lock_wait=lock_wait,
+            table_sizes=table_sizes,
+            failed=failed,
+        )
+        for collector in collectors:
+            try:
+                collector.collect(metrics)
+            except Exception:
+                logger.exception("The collector %r failed to collect the metrics.", collector)
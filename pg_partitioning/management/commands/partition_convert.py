@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pg_partitioning.management.utils import get_partitioned_models
+from pg_partitioning.manager import _RangePartitionManagerBase
+
+
+class Command(BaseCommand):
+    help = "Convert the existing unpartitioned table of a range partitioned model into a partitioned table without taking it offline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="Label of the model, for example app_label.ModelName.")
+        parser.add_argument("--batch-size", type=int, default=10000, help="Maximum number of rows copied by a batch.")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to sleep between batches.")
+        parser.add_argument("--partitions-ahead", type=int, default=1, help="Number of partitions created beyond the maximum value of the partition key.")
+
+    def handle(self, *args, **options):
+        model = get_partitioned_models([options["model"]], _RangePartitionManagerBase)[0]
+        try:
+            rows = model.partitioning.convert_table(options["batch_size"], options["sleep"], options["partitions_ahead"])
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(f"Converted {model._meta.db_table}, {rows} rows copied.")
@@ -0,0 +1,58 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from pg_partitioning.management.utils import get_partitioned_models
+from pg_partitioning.shortcuts import try_advisory_lock
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create, detach and remove the partitions of partitioned models according to their configuration, once or periodically. "
+        "Each model is guarded by an advisory lock, so that the command can run on several nodes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*", help="Labels of the models, all partitioned models by default.")
+        parser.add_argument("--workers", type=int, default=4, help="Maximum number of models maintained in parallel.")
+        parser.add_argument("--interval", type=float, help="Run periodically with this number of seconds between the rounds instead of once.")
+
+    def handle(self, *args, **options):
+        partitioned_models = get_partitioned_models(options["models"])
+        while True:
+            failed = self.maintain(partitioned_models, options["workers"])
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
+        if failed:
+            raise CommandError(f"The maintenance of {', '.join(failed)} failed.")
+
+    def maintain(self, partitioned_models, workers):
+        """Maintain the models in a pool of threads, each with its own connection, and return the labels of the models failed."""
+
+        def work(model):
+            try:
+                with try_advisory_lock(f"pg_partitioning.maintain.{model._meta.label_lower}") as acquired:
+                    if not acquired:
+                        return "skipped, locked by another process"
+                    model.partitioning.maintain()
+                    return "maintained"
+            finally:
+                connection.close()
+
+        failed = list()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [(model, executor.submit(work, model)) for model in partitioned_models]
+            for model, future in futures:
+                try:
+                    self.stdout.write(f"{model._meta.label}: {future.result()}")
+                except Exception:
+                    logger.exception("The maintenance of %s failed.", model._meta.label)
+                    self.stderr.write(f"{model._meta.label}: failed")
+                    failed.append(model._meta.label)
+        return failed
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from pg_partitioning.management.utils import get_partitioned_models
+from pg_partitioning.manager import _RangePartitionManagerBase
+
+
+class Command(BaseCommand):
+    help = "Compare the partition logs of range partitioned models with the system catalogs and repair the drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("models", nargs="*", help="Labels of the models, all range partitioned models by default.")
+        parser.add_argument("--dry-run", action="store_true", help="Only print the drift and the SQL statements that would repair it.")
+
+    def handle(self, *args, **options):
+        for model in get_partitioned_models(options["models"], _RangePartitionManagerBase):
+            for drift in model.partitioning.reconcile(dry_run=options["dry_run"]):
+                self.stdout.write(f"{model._meta.label}: {drift.type} {drift.table_name}")
+                if options["dry_run"]:
+                    for sql in drift.sql:
+                        self.stdout.write(f"    {sql};")
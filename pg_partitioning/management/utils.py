@@ -0,0 +1,26 @@
+from typing import List, Type
+
+from django.apps import apps
+from django.core.management.base import CommandError
+from django.db import models
+
+from pg_partitioning.manager import _PartitionManagerBase, _RangePartitionManagerBase
+
+
+def get_partitioned_models(labels: List[str], manager_class: Type[_PartitionManagerBase] = _PartitionManagerBase) -> List[Type[models.Model]]:
+    """Get the partitioned models of the labels, or all partitioned models when no label is given,
+    whose partition manager is an instance of ``manager_class``."""
+
+    if not labels:
+        return [model for model in apps.get_models() if isinstance(getattr(model, "partitioning", None), manager_class)]
+
+    partitioned_models = list()
+    for label in labels:
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+        if not isinstance(getattr(model, "partitioning", None), manager_class):
+            raise CommandError(f"The model {label} is not {'range ' if issubclass(manager_class, _RangePartitionManagerBase) else ''}partitioned.")
+        partitioned_models.append(model)
+    return partitioned_models
@@ -1,27 +1,118 @@
 import datetime
-from collections import Iterable
-from typing import Optional, Type, Union
+import logging
+import os
+import re
+import time
+from bisect import bisect_right
+from collections import Iterable, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from queue import Empty, Queue
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Type, Union
 
 import pytz
 from dateutil.relativedelta import MO, relativedelta
 from django.conf import settings
-from django.db import IntegrityError, models
-from django.db.models import Q
+from django.db import IntegrityError, OperationalError, connection, models, transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.db.models.query import ModelIterable
+from django.db.models.sql.datastructures import BaseTable
+from django.db.transaction import TransactionManagementError
 from django.utils import timezone
 
-from pg_partitioning.shortcuts import double_quote, execute_sql, generate_set_indexes_tablespace_sql, single_quote
+from pg_partitioning.instrumentation import step
+from pg_partitioning.shortcuts import (
+    PartitionStats,
+    advisory_xact_lock,
+    copy_rows,
+    double_quote,
+    drop_table,
+    dump_table,
+    execute_sql,
+    file_checksum,
+    generate_drop_partition_check_sql,
+    generate_partition_check_sql,
+    generate_set_indexes_tablespace_sql,
+    generate_set_tablespace_sql,
+    get_indexes,
+    get_partition_stats,
+    get_partitions,
+    load_table,
+    lock_timeout,
+    retry_on_lock_timeout,
+    single_quote,
+    try_advisory_lock,
+)
+from pg_partitioning.signals import post_attach_partition, post_attach_partitions, post_create_partitions, post_detach_partition, post_detach_partitions
 
 from .constants import (
     DT_FORMAT,
+    DT_FORMAT_SUB_DAY,
+    SQL_ADD_CONSTRAINT,
+    SQL_APPEND_PARTITION_BY,
     SQL_APPEND_TABLESPACE,
+    SQL_ATTACH_HASH_PARTITION,
     SQL_ATTACH_LIST_PARTITION,
+    SQL_BACKFILL_ROWS,
+    SQL_CREATE_DEFAULT_PARTITION,
+    SQL_CREATE_HASH_PARTITION,
     SQL_CREATE_LIST_PARTITION,
+    SQL_CREATE_RANGE_PARTITION,
+    SQL_CREATE_SYNC_FUNCTION,
+    SQL_CREATE_SYNC_TRIGGER,
+    SQL_CREATE_TABLE_LIKE,
+    SQL_CREATE_TABLE_LIKE_WITH_INDEXES,
     SQL_DETACH_PARTITION,
-    SQL_SET_TABLE_TABLESPACE,
+    SQL_DETACH_PARTITION_CONCURRENTLY,
+    SQL_DETACH_PARTITION_FINALIZE,
+    SQL_DROP_FUNCTION,
+    SQL_DROP_TABLE,
+    SQL_GET_ATTACHED_PARTITIONS,
+    SQL_GET_FOREIGN_KEYS,
+    SQL_GET_INDEX_DEFINITIONS,
+    SQL_GET_PARTITION_DRIFT,
+    SQL_GET_PENDING_DETACH_PARTITIONS,
+    SQL_GET_REFERENCING_FOREIGN_KEYS,
+    SQL_GET_RELKIND,
+    SQL_GET_SERIAL_SEQUENCES,
+    SQL_GET_TABLE_SIZES,
+    SQL_HASH_CHECK,
+    SQL_INSERT_HASH_REMAINDER,
+    SQL_LIST_CHECK,
+    SQL_LIST_NULL_CHECK,
+    SQL_LOCK_ROWS,
+    SQL_LOCK_TABLE,
+    SQL_MOVE_ROWS,
+    SQL_RANGE_CHECK,
+    SQL_RENAME_INDEX,
+    SQL_RENAME_TABLE,
+    SQL_RESTORE_DEFAULT_TABLESPACE,
+    SQL_SELECT_BATCH_END,
+    SQL_SELECT_DISTINCT,
+    SQL_SELECT_MAX,
+    SQL_SELECT_MIN_MAX,
+    SQL_SELECT_NULL_EXISTS,
+    SQL_SET_LOCAL_DEFAULT_TABLESPACE,
+    SQL_SET_SEQUENCE_OWNER,
+    SQL_TRUNCATE_TABLE,
+    CompressionType,
+    DriftType,
     PartitioningType,
     PeriodType,
+    RetentionAction,
 )
-from .models import PartitionConfig, PartitionLog
+from .models import IntegerRangePartitionLog, PartitionConfig, PartitionLog, _RangePartitionLogBase
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionDrift(NamedTuple):
+    """A difference between a partition log and the system catalogs found by ``reconcile``."""
+
+    table_name: str
+    type: str
+    sql: List[str]
 
 
 class _PartitionManagerBase:
@@ -31,43 +122,1128 @@ class _PartitionManagerBase:
         self.model = model
         self.partition_key = partition_key
         self.options = options
+        self._partition_models = dict()
 
+    def get_partition_model(self, table_name: str) -> Type[models.Model]:
+        """Get an unmanaged model of the same fields as this model which reads and writes a partition directly.
+        The model is created on the first call and cached.
 
-class TimeRangePartitionManager(_PartitionManagerBase):
-    """Manage time-based partition APIs."""
+        Parameters:
+          table_name(str): Table name of the partition.
+        """
+        if table_name not in self._partition_models:
+            meta = self.model._meta
+            attrs = dict()
+            for field in meta.concrete_fields:
+                name, path, args, kwargs = field.deconstruct()
+                if field.is_relation:
+                    # Reverse accessors of the related models belong to this model.
+                    kwargs["related_name"] = "+"
+                attrs[field.name] = field.__class__(*args, **kwargs)
+            attrs["__module__"] = self.model.__module__
+            attrs["Meta"] = type("Meta", (), {"app_label": meta.app_label, "db_table": table_name, "managed": False, "ordering": meta.ordering})
+            name = "%sPartition_%s" % (self.model.__name__, re.sub(r"\W", "_", table_name))
+            self._partition_models[table_name] = type(name, (models.Model,), attrs)
+        return self._partition_models[table_name]
+
+    @property
+    def default_partition_table_name(self) -> Optional[str]:
+        """Table name of the default partition when the ``default_partition`` option is set."""
+        if not self.options.get("default_partition"):
+            return None
+        return f"{self.model._meta.db_table}_default"
+
+    def get_initial_partitions_sql(self) -> List[str]:
+        """Generate the SQL statements of the partitions created together with the table."""
+        if not self.options.get("default_partition"):
+            return []
+        return [SQL_CREATE_DEFAULT_PARTITION % {"parent": double_quote(self.model._meta.db_table), "child": double_quote(self.default_partition_table_name)}]
+
+    def lock(self, nowait: bool = False) -> bool:
+        """Take the advisory lock of this model until the end of the transaction. The operations changing the partitions
+        of the model take it once, so that they are serialized across processes without locking the row of the configuration,
+        and reading the configuration or the partitions is never blocked.
+
+        Parameters:
+          nowait(bool): Return False instead of waiting when another transaction holds the lock.
+
+        Returns:
+          bool: Whether the lock is acquired.
+        """
+        if not connection.in_atomic_block:
+            raise TransactionManagementError("The lock of a model can only be taken inside a transaction block.")
+        return advisory_xact_lock(self._lock_name, nowait)
+
+    @property
+    def _lock_name(self) -> str:
+        return f"pg_partitioning.{self.model._meta.label_lower}"
+
+    def maintain(self) -> None:
+        """Run the scheduled upkeep of the partitions, which is run by the ``partition_maintain`` command.
+        List and hash partitions have nothing to maintain on a schedule."""
+
+    def stats(self) -> List[PartitionStats]:
+        """Get the sizes, estimated rows, dead tuples, vacuum and analyze times, tablespace and bound of each partition
+        attached to the table, including the default partition, with a single catalog query.
+
+        Returns:
+          List[PartitionStats]: The statistics of each partition, ordered by table name.
+        """
+        return get_partition_stats(self.model._meta.db_table)
+
+    def _copy_to_partitions(self, partitions: Dict[str, List[models.Model]]) -> None:
+        """Write model instances grouped by table name with ``COPY FROM STDIN`` in the current transaction.
+        Primary keys of the instances without one are generated by the database.
+
+        The parent table is locked first, so that the partitions can't be detached until the transaction ends,
+        and the instances of partitions detached since they were grouped are written to the default partition, if any."""
+        parent = double_quote(self.model._meta.db_table)
+        execute_sql(SQL_LOCK_TABLE % {"name": "ONLY " + parent, "mode": "ACCESS SHARE"})
+        # Partitions pending a concurrent detach, which PostgreSQL 14 introduced, no longer accept rows.
+        condition = " AND NOT i.inhdetachpending" if connection.pg_version >= 140000 else ""
+        attached = {row[0] for row in execute_sql(SQL_GET_ATTACHED_PARTITIONS % {"parent": single_quote(parent), "condition": condition}, fetch=True)}
+        for table_name in [table_name for table_name in partitions if table_name not in attached]:
+            if self.default_partition_table_name not in attached:
+                raise ValueError(f"The partition {table_name} of {self.model._meta.db_table} has been detached.")
+            partitions.setdefault(self.default_partition_table_name, []).extend(partitions.pop(table_name))
+
+        for table_name, objs in partitions.items():
+            for has_pk in (True, False):
+                group = [obj for obj in objs if (obj.pk is not None) == has_pk]
+                if not group:
+                    continue
+                fields = [field for field in self.model._meta.concrete_fields if has_pk or not isinstance(field, models.AutoField)]
+                rows = ([field.get_db_prep_save(field.pre_save(obj, True), connection) for field in fields] for obj in group)
+                copy_rows(table_name, [field.column for field in fields], rows)
+
+    def _move_rows(self, source_table_name: str, table_name: str, condition: str, batch_size: int) -> int:
+        """Move the rows of the source table matching the condition to the table in batches, and return the number of rows moved."""
+        total = 0
+        while True:
+            moved = execute_sql(
+                SQL_MOVE_ROWS
+                % {"source": double_quote(source_table_name), "target": double_quote(table_name), "condition": condition, "limit": int(batch_size)},
+                fetch=True,
+            )[0][0]
+            total += moved
+            if moved < batch_size:
+                return total
+
+    def _execute_ddl(self, sql_sequence: List[str]) -> None:
+        """Execute DDL with the ``lock_timeout`` and ``lock_retries`` options of the model."""
+
+        def execute():
+            with lock_timeout(self.options.get("lock_timeout")):
+                execute_sql(sql_sequence)
+
+        if not self.options.get("lock_timeout"):
+            execute_sql(sql_sequence)
+        elif sql_sequence:
+            retry_on_lock_timeout(execute, self.options.get("lock_retries", 0))
+
+    @contextmanager
+    def validate_partitions(self, checks: Dict[str, str]):
+        """Validate the bounds of partitions to attach in the context by CHECK constraints, so that attaching them doesn't scan
+        the partitions and the default partition while holding the lock of the parent table.
+
+        The constraints are added in a transaction, which locks the tables only briefly, and validated in another one,
+        which scans the tables without blocking reads and writes, both committed before the context. The statements
+        attaching the partitions drop the constraints, they are dropped if the context fails. Inside a transaction block,
+        they are added and validated in that transaction.
+
+        Parameters:
+          checks(Dict[str, str]): The conditions equivalent to the bounds by the table names of the partitions.
+        """
+        add_sql, validate_sql, drop_sql = list(), list(), list()
+        for table_name, condition in checks.items():
+            table_add_sql, table_validate_sql = generate_partition_check_sql(table_name, condition, self.default_partition_table_name)
+            add_sql.extend(table_add_sql)
+            validate_sql.extend(table_validate_sql)
+            drop_sql.extend(generate_drop_partition_check_sql(table_name, self.default_partition_table_name))
+
+        try:
+            if checks:
+                with transaction.atomic():
+                    self._execute_ddl(add_sql)
+                with transaction.atomic():
+                    self._execute_ddl(validate_sql)
+            yield
+        except Exception:
+            if drop_sql and not connection.in_atomic_block:
+                execute_sql(drop_sql)
+            raise
+
+
+class _RangePartitionManagerBase(_PartitionManagerBase):
+    """The common APIs of range partitions whose states are recorded by logs."""
 
     type = PartitioningType.Range
+    log_model = None
 
     @property
     def config(self) -> PartitionConfig:
-        """Get the latest PartitionConfig instance of this model.
-        In order to avoid the race condition, we used **select_for_update** when querying.
+        """Get the latest PartitionConfig instance of this model, which is created with the default options when it doesn't exist.
+        The configuration is read without locking its row, the operations changing partitions take the ``lock`` of the model instead.
 
         Returns:
           PartitionConfig: The latest PartitionConfig instance of this model.
         """
         try:
-            return PartitionConfig.objects.select_for_update().get(model_label=self.model._meta.label_lower)
+            return PartitionConfig.objects.get(model_label=self.model._meta.label_lower)
         except PartitionConfig.DoesNotExist:
             try:
-                return PartitionConfig.objects.create(
-                    model_label=self.model._meta.label_lower,
-                    period=self.options.get("default_period", PeriodType.Month),
-                    interval=self.options.get("default_interval"),
-                    attach_tablespace=self.options.get("default_attach_tablespace"),
-                    detach_tablespace=self.options.get("default_detach_tablespace"),
-                )
+                config = self._new_config()
+                config.save(force_insert=True)
+                return config
             except IntegrityError:
-                return PartitionConfig.objects.select_for_update().get(model_label=self.model._meta.label_lower)
+                return PartitionConfig.objects.get(model_label=self.model._meta.label_lower)
 
     @property
-    def latest(self) -> Optional[PartitionLog]:
-        """Get the latest PartitionLog instance of this model.
+    def latest(self) -> Optional[_RangePartitionLogBase]:
+        """Get the latest partition log instance of this model.
+
+        Returns:
+          Optional[_RangePartitionLogBase]: The latest partition log instance of this model or none.
+        """
+        return self.log_model.objects.filter(config=self.config).order_by("-end").first()
+
+    def _new_config(self) -> PartitionConfig:
+        """A new PartitionConfig instance of this model with the default values of the options."""
+        return PartitionConfig(
+            model_label=self.model._meta.label_lower,
+            interval=self.options.get("default_interval"),
+            attach_tablespace=self.options.get("default_attach_tablespace"),
+            detach_tablespace=self.options.get("default_detach_tablespace"),
+            **self._get_config_defaults(),
+        )
+
+    def _get_config_defaults(self) -> dict:
+        """Default values of the fields specific to this kind of partitioning for a new PartitionConfig."""
+        raise NotImplementedError
+
+    def _get_next_bound(self, config: PartitionConfig, start) -> tuple:
+        """Get the bound of the partition following the one ending at ``start``, or of the first partition when ``start`` is None."""
+        raise NotImplementedError
+
+    def _get_initial_bound(self, config: PartitionConfig, value) -> tuple:
+        """Get the bound of the partition of the cycle containing ``value``."""
+        raise NotImplementedError
+
+    def _get_partition_table_name(self, config: PartitionConfig, start, end) -> str:
+        raise NotImplementedError
+
+    def _get_detach_partition_log(self, config: PartitionConfig) -> Iterable:
+        """Get the partitions that meet the configuration rule of detaching."""
+        raise NotImplementedError
+
+    def _get_retention_line(self, config: PartitionConfig, count: int):
+        """Get the value of the partition key ``count`` periods or widths before the current one."""
+        raise NotImplementedError
+
+    def get_subpartition_by_sql(self) -> str:
+        """Generate the ``PARTITION BY`` clause of partitions according to the sub-partition template, if any."""
+        subpartition_type = self.options.get("subpartition_type")
+        if not subpartition_type:
+            return ""
+        column = double_quote(self.model._meta.get_field(self.options["subpartition_key"]).column)
+        return SQL_APPEND_PARTITION_BY % {"type": subpartition_type, "column": column}
+
+    def get_create_subpartitions_sql(self, table_name: str, tablespace: Optional[str]) -> List[str]:
+        """Generate the SQL sequence that creates the sub-partitions of a partition according to the sub-partition template.
+
+        Parameters:
+          table_name(str): Table name of the partition.
+          tablespace(Optional[str]): Tablespace name of the sub-partitions.
+        """
+        subpartition_type = self.options.get("subpartition_type")
+        sql_sequence = list()
+        if subpartition_type == PartitioningType.List:
+            for suffix, value in self.options["subpartition_values"].items():
+                values = value if isinstance(value, (list, tuple)) else [value]
+                sql_sequence.append(
+                    SQL_CREATE_LIST_PARTITION
+                    % {"parent": double_quote(table_name), "child": double_quote(f"{table_name}_{suffix}"), "value": ", ".join(_db_value(v) for v in values)}
+                )
+        elif subpartition_type == PartitioningType.Hash:
+            modulus = self.options["subpartition_modulus"]
+            for remainder in range(modulus):
+                sql_sequence.append(
+                    SQL_CREATE_HASH_PARTITION
+                    % {
+                        "parent": double_quote(table_name),
+                        "child": double_quote(f"{table_name}_{modulus}_{remainder}"),
+                        "modulus": modulus,
+                        "remainder": remainder,
+                    }
+                )
+        if tablespace:
+            sql_sequence = [sql + SQL_APPEND_TABLESPACE % {"tablespace": tablespace} for sql in sql_sequence]
+        return sql_sequence
+
+    def iter_partitions(self, include_detached: bool = False) -> Iterator[_RangePartitionLogBase]:
+        """Iterate the partitions of this model in the order of their bounds.
+
+        Parameters:
+          include_detached(bool): Whether the detached partitions are included.
+        """
+        partition_log = self.log_model.objects.filter(config__model_label=self.model._meta.label_lower)
+        if not include_detached:
+            partition_log = partition_log.filter(is_attached=True)
+        return iter(list(partition_log.order_by("start")))
+
+    def iterate(
+        self, queryset: Optional[models.QuerySet] = None, chunk_size: int = 2000, include_detached: bool = False, keyset: Optional[str] = None
+    ) -> Iterator:
+        """Iterate the rows of a queryset partition by partition, in the order of the partition bounds.
+
+        Each partition is read on its own instead of through the parent table, so no snapshot is held across the whole scan.
+        By default a partition is read with a server-side cursor like ``QuerySet.iterator``. With ``keyset``, it is read in chunks
+        ordered by that field with a query each, so that no snapshot is held longer than a chunk; it only supports querysets of
+        model instances. Rows of the default partition are not included.
+
+        Parameters:
+          queryset(Optional[models.QuerySet]): A queryset of this model, all rows by default. ``values`` and ``values_list`` are supported.
+          chunk_size(int): Number of rows fetched at a time.
+          include_detached(bool): Whether the rows of detached partitions are included.
+          keyset(Optional[str]): Name of a unique field to paginate partitions by.
+        """
+        queryset = self.model.objects.all() if queryset is None else queryset
+        if keyset and queryset._iterable_class is not ModelIterable:
+            raise ValueError("Keyset pagination only supports querysets of model instances.")
+
+        for log in self.iter_partitions(include_detached):
+            partition_queryset = _rebase_queryset(queryset, log.table_name)
+            if not keyset:
+                yield from partition_queryset.iterator(chunk_size=chunk_size)
+                continue
+
+            partition_queryset = partition_queryset.order_by(keyset)
+            last = None
+            while True:
+                chunk = partition_queryset if last is None else partition_queryset.filter(**{f"{keyset}__gt": last})
+                rows = list(chunk[:chunk_size])
+                yield from rows
+                if len(rows) < chunk_size:
+                    break
+                last = getattr(rows[-1], keyset)
+
+    def aggregate(self, queryset: Optional[models.QuerySet] = None, max_workers: int = 4, include_detached: bool = False, **aggregates) -> dict:
+        """Aggregate a queryset on each partition concurrently and merge the results, like ``QuerySet.aggregate``.
+
+        The partitions are aggregated by a pool of ``max_workers`` threads, each of them with its own database connection,
+        which is closed when the thread runs out of partitions. Every connection reads with its own snapshot, and rows not
+        committed by the calling thread are not visible. Rows of the default partition are not included.
+
+        Parameters:
+          queryset(Optional[models.QuerySet]): A queryset of this model, all rows by default.
+          max_workers(int): Maximum number of partitions aggregated at the same time.
+          include_detached(bool): Whether the rows of detached partitions are included.
+          aggregates: ``Sum``, ``Count`` (not distinct), ``Min``, ``Max`` or ``Avg`` expressions by name.
+
+        Returns:
+          dict: The merged value of each aggregate by name.
+        """
+        queryset = self.model.objects.all() if queryset is None else queryset
+        parts = dict()
+        for name, aggregate in aggregates.items():
+            if isinstance(aggregate, Avg):
+                parts[f"{name}__sum"] = Sum(*aggregate.source_expressions, filter=aggregate.filter)
+                parts[f"{name}__count"] = Count(*aggregate.source_expressions, filter=aggregate.filter)
+            elif isinstance(aggregate, (Sum, Count, Min, Max)) and not getattr(aggregate, "distinct", False):
+                parts[name] = aggregate
+            else:
+                raise ValueError(f"The aggregate {name} can't be merged across partitions.")
+
+        partitions = Queue()
+        for log in self.iter_partitions(include_detached):
+            partitions.put(log.table_name)
+
+        def work():
+            results = list()
+            try:
+                while True:
+                    try:
+                        table_name = partitions.get_nowait()
+                    except Empty:
+                        return results
+                    results.append(_rebase_queryset(queryset, table_name).aggregate(**parts))
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(work) for _ in range(min(max_workers, partitions.qsize()))]
+            results = [result for future in futures for result in future.result()]
+
+        merged = dict()
+        for name, aggregate in aggregates.items():
+            if isinstance(aggregate, Avg):
+                total = _merge_aggregate(Sum, [result[f"{name}__sum"] for result in results])
+                count = _merge_aggregate(Count, [result[f"{name}__count"] for result in results])
+                merged[name] = total / count if count else None
+            else:
+                merged[name] = _merge_aggregate(type(aggregate), [result[name] for result in results])
+        return merged
+
+    def between(self, start, end, literal: bool = False, direct: bool = False) -> models.QuerySet:
+        """Get a queryset of the rows whose partition key is in ``[start, end)``, so that the planner can prune partitions.
+
+        Parameters:
+          start: The inclusive lower bound.
+          end: The exclusive upper bound.
+          literal(bool):
+            Write the bounds into the SQL as literals instead of parameters, so that partitions are pruned at plan time
+            even by the generic plan of a prepared statement.
+          direct(bool):
+            When an attached partition covers the whole range, read it directly through ``get_partition_model``
+            instead of the parent table, which costs a query to look up the partition.
+        """
+        queryset = self.model.objects.all()
+        if direct:
+            log = self.log_model.objects.filter(config__model_label=self.model._meta.label_lower, is_attached=True, start__lte=start, end__gte=end).first()
+            if log:
+                queryset = self.get_partition_model(log.table_name).objects.all()
+
+        if not literal:
+            return queryset.filter(**{f"{self.partition_key}__gte": start, f"{self.partition_key}__lt": end})
+        start, end = self.log_model(start=start, end=end).get_bound_sql()
+        column = "%s.%s" % (double_quote(queryset.model._meta.db_table), double_quote(self.model._meta.get_field(self.partition_key).column))
+        return queryset.extra(where=[SQL_RANGE_CHECK % {"column": column, "start": start, "end": end}])
+
+    def create_partitions(self, until=None, count: Optional[int] = None) -> List[_RangePartitionLogBase]:
+        """Create several partitions of the following cycles at once according to the configuration.
+        The bounds of all partitions are computed up front, the logs are inserted with a single query
+        and the partitions are created with a single batch of SQL statements.
+
+        Note that ``post_create_partition`` is not sent for each partition, ``post_create_partitions`` is sent once instead.
+
+        Parameters:
+          until: Create partitions until the latest partition covers this value of the partition key.
+          count(Optional[int]): Maximum number of partitions to create.
 
         Returns:
-          Optional[PartitionLog]: The latest PartitionLog instance of this model or none.
+          List[_RangePartitionLogBase]: The partition log instances created.
         """
-        return self.config.logs.order_by("-id").first()
+        if until is None and count is None:
+            raise ValueError("At least one of until and count must be specified.")
+
+        with transaction.atomic():
+            self.lock()
+            config = self.config
+            latest = self.log_model.objects.filter(config=config).order_by("-end").first()
+
+            partition_logs = []
+            end = latest.end if latest else None
+            while (count is None or len(partition_logs) < count) and (until is None or end is None or end <= until):
+                start, end = self._get_next_bound(config, end)
+                partition_logs.append(self.log_model(config=config, table_name=self._get_partition_table_name(config, start, end), start=start, end=end))
+
+            if not partition_logs:
+                return partition_logs
+
+            self.log_model.objects.bulk_create(partition_logs)
+            sql_sequence = [sql for log in partition_logs for sql in log.get_create_partition_sql(self.model)]
+            if config.attach_tablespace:
+                # The indexes of the partitions are created in the attach tablespace, except those whose parent index has a tablespace.
+                tablespace = single_quote(config.attach_tablespace)
+                sql_sequence = [SQL_SET_LOCAL_DEFAULT_TABLESPACE % {"tablespace": tablespace}] + sql_sequence + [SQL_RESTORE_DEFAULT_TABLESPACE]
+            execute_sql(sql_sequence)
+            if config.attach_tablespace:
+                indexes = get_indexes([log.table_name for log in partition_logs])
+                execute_sql([sql for log in partition_logs for sql in log.get_set_indexes_tablespace_sql(config.attach_tablespace, indexes)])
+            post_create_partitions.send(sender=self.model, partition_logs=partition_logs)
+        return partition_logs
+
+    def drain_default_partition(self, batch_size: int = 10000) -> List[_RangePartitionLogBase]:
+        """Move the rows of the default partition beyond the latest partition into the partitions of the following cycles.
+
+        Each partition is created as a standalone table in its own transaction, filled with batches of rows moved out of the
+        default partition, and then attached in the same transaction: the new table isn't scanned, but the default partition is
+        validated by a CHECK constraint while it is locked, because rows of the range can be written to it until then.
+        Rows before the latest partition, for example in the range of a detached partition, are left in the default partition.
+
+        Parameters:
+          batch_size(int): Maximum number of rows moved by a statement.
+
+        Returns:
+          List[_RangePartitionLogBase]: The partition log instances created.
+        """
+        parent = double_quote(self.model._meta.db_table)
+        column = double_quote(self.model._meta.get_field(self.partition_key).column)
+        max_value = execute_sql(SQL_SELECT_MAX % {"column": column, "name": double_quote(self.default_partition_table_name)}, fetch=True)[0][0]
+
+        partition_logs = list()
+        while max_value is not None:
+            with transaction.atomic():
+                self.lock()
+                config = self.config
+                latest = self.log_model.objects.filter(config=config).order_by("-end").first()
+                if latest and latest.end > max_value:
+                    break
+
+                start, end = self._get_next_bound(config, latest.end if latest else None)
+                log = self.log_model(config=config, table_name=self._get_partition_table_name(config, start, end), start=start, end=end)
+                create_table_sql = SQL_CREATE_TABLE_LIKE % {"name": double_quote(log.table_name), "parent": parent} + self.get_subpartition_by_sql()
+                if config.attach_tablespace:
+                    create_table_sql += SQL_APPEND_TABLESPACE % {"tablespace": config.attach_tablespace}
+                execute_sql([create_table_sql] + self.get_create_subpartitions_sql(log.table_name, config.attach_tablespace))
+
+                start, end = log.get_bound_sql()
+                self._move_rows(
+                    self.default_partition_table_name, log.table_name, SQL_RANGE_CHECK % {"column": column, "start": start, "end": end}, batch_size
+                )
+                # Rows of the range can be written to the default partition until the partition is attached, so it is checked
+                # in the same transaction.
+                add_sql, validate_sql = generate_partition_check_sql(log.table_name, log.get_check_condition(self.model), self.default_partition_table_name)
+                self._execute_ddl(add_sql + validate_sql + log.get_attach_partition_sql(self.model))
+                if config.attach_tablespace:
+                    execute_sql(log.get_set_indexes_tablespace_sql(config.attach_tablespace))
+                self.log_model.objects.bulk_create([log])
+                partition_logs.append(log)
+
+        if partition_logs:
+            post_create_partitions.send(sender=self.model, partition_logs=partition_logs)
+        return partition_logs
+
+    def bulk_ingest(self, rows: Iterable) -> int:
+        """Write model instances directly to their partitions with ``COPY FROM STDIN``, bypassing the tuple routing of the parent table.
+        Rows are grouped by the bounds of the attached partitions, the partitions of the following cycles are created for rows
+        beyond the latest partition, and rows without a partition are written to the default partition, if any.
+        Like ``bulk_create``, ``save`` is not called, and primary keys generated by the database are not set on the instances.
+        The parent table is locked, so that partitions can't be detached while the rows are written to them.
+
+        Parameters:
+          rows(Iterable): The model instances to write.
+
+        Returns:
+          int: The number of rows written.
+        """
+        rows = list(rows)
+        field = self.model._meta.get_field(self.partition_key)
+        values = [field.get_prep_value(getattr(obj, field.attname)) for obj in rows]
+        if not rows:
+            return 0
+        if None in values:
+            raise ValueError("The partition key of all rows must be set.")
+
+        with transaction.atomic():
+            config = self.config
+            latest = self.log_model.objects.filter(config=config).order_by("-end").first()
+            if latest is None or max(values) >= latest.end:
+                self.create_partitions(until=max(values))
+            logs = list(self.log_model.objects.filter(config=config, is_attached=True).order_by("start").values_list("start", "end", "table_name"))
+            starts = [start for start, _, _ in logs]
+
+            partitions = defaultdict(list)
+            for obj, value in zip(rows, values):
+                index = bisect_right(starts, value) - 1
+                if index >= 0 and value < logs[index][1]:
+                    partitions[logs[index][2]].append(obj)
+                elif self.default_partition_table_name:
+                    partitions[self.default_partition_table_name].append(obj)
+                else:
+                    raise ValueError(f"No partition of {self.model._meta.db_table} found for {value}.")
+            self._copy_to_partitions(partitions)
+        return len(rows)
+
+    def _set_attached(self, config: PartitionConfig, partition_log: Iterable, is_attached: bool, detach_time: Optional[datetime.datetime]) -> None:
+        """Attach or detach partitions in bulk: the logs are locked with one query, the SQL statements of all partitions
+        whose state changes are executed as one batch and the logs are updated with one query."""
+        partition_log = list(partition_log)
+        pks = [log.pk for log in partition_log]
+        locked_logs = self.log_model.objects.select_for_update().filter(config=config, pk__in=pks).order_by("start")
+
+        changed_logs = list()
+        for log in locked_logs:
+            if log.archive_path:
+                raise ValueError(f"The partition {log.table_name} is archived, restore it first.")
+            if log.is_attached != is_attached:
+                log.config = config
+                log.is_attached = is_attached
+                log.detach_time = detach_time
+                changed_logs.append(log)
+
+        sql_sequence = list()
+        if changed_logs:
+            indexes = get_indexes([log.table_name for log in changed_logs])
+            for log in changed_logs:
+                sql_sequence.extend(log.get_attach_partition_sql(self.model, indexes) if is_attached else log.get_detach_partition_sql(self.model, indexes))
+
+        self.log_model.objects.filter(config=config, pk__in=pks).update(is_attached=is_attached, detach_time=detach_time)
+        self._execute_ddl(sql_sequence)
+        for log in partition_log:
+            log.is_attached = is_attached
+            log.detach_time = detach_time
+
+        if changed_logs:
+            log_signal, signal = (post_attach_partition, post_attach_partitions) if is_attached else (post_detach_partition, post_detach_partitions)
+            for log in changed_logs:
+                log_signal.send(sender=self.model, partition_log=log)
+            signal.send(sender=self.model, partition_logs=changed_logs)
+
+    def attach_partition(self, partition_log: Optional[Iterable] = None, detach_time: Optional[datetime.datetime] = None) -> None:
+        """Attach partitions.
+        All partitions are attached in a single batch, ``post_attach_partition`` is sent for each partition attached
+        and then ``post_attach_partitions`` once for all of them.
+        Their bounds are validated beforehand by ``validate_partitions``.
+
+        Parameters:
+          partition_log(Optional[Iterable]):
+            All partitions are attached when you don't specify partitions to attach.
+          detach_time(Optional[datetime.datetime]):
+            When the partition specifies the archive time, it will **not** be automatically archived until that time.
+        """
+        partition_log = list(partition_log or [])
+        logs = self.log_model.objects.filter(config=self.config, is_attached=False, archive_path=None)
+        if partition_log:
+            logs = logs.filter(pk__in=[log.pk for log in partition_log])
+        logs = list(logs)
+        with self.validate_partitions({log.table_name: log.get_check_condition(self.model) for log in logs}), transaction.atomic():
+            self.lock()
+            config = self.config
+            self._set_attached(config, partition_log or logs, True, detach_time)
+
+    def detach_partition(self, partition_log: Optional[Iterable] = None, concurrently: bool = False) -> None:
+        """Detach partitions.
+        All partitions are detached in a single batch, ``post_detach_partition`` is sent for each partition detached
+        and then ``post_detach_partitions`` once for all of them.
+
+        Parameters:
+          partition_log(Optional[Iterable]):
+            Specify a partition to archive. When you don't specify a partition to archive, all partitions that meet the configuration rule are archived.
+          concurrently(bool):
+            Detach partitions one by one with ``DETACH PARTITION ... CONCURRENTLY`` (PostgreSQL 14+), which doesn't block
+            queries on the parent table. It can't be used inside a transaction block. Partitions whose previous concurrent
+            detaching was interrupted are finalized first. The lock of the model is held by the session until all partitions
+            are detached, ``OperationalError`` is raised when another transaction holds it.
+        """
+        if concurrently:
+            if connection.in_atomic_block:
+                raise TransactionManagementError("Detaching partitions concurrently can't be executed inside a transaction block.")
+            # The partitions are detached in transactions of their own, so the lock of the model is held by the session instead.
+            with try_advisory_lock(self._lock_name) as acquired:
+                if not acquired:
+                    raise OperationalError(f"The lock of {self.model._meta.label} is held by another transaction.")
+                config = self.config
+                partition_log = list(partition_log or self._get_detach_partition_log(config))
+                self._detach_partition_concurrently(config, partition_log)
+            return
+
+        with transaction.atomic():
+            self.lock()
+            config = self.config
+            if not partition_log:
+                partition_log = self._get_detach_partition_log(config)
+            self._set_attached(config, partition_log, False, None)
+
+    def _detach_partition_concurrently(self, config: PartitionConfig, partition_log: List[_RangePartitionLogBase]) -> None:
+        parent = double_quote(self.model._meta.db_table)
+
+        def get_pending_detach_partitions():
+            return {row[0] for row in execute_sql(SQL_GET_PENDING_DETACH_PARTITIONS % {"parent": single_quote(parent)}, fetch=True)}
+
+        def detach(table_name):
+            # A pending partition can't be detached again, it can only be finalized.
+            sql = SQL_DETACH_PARTITION_FINALIZE if table_name in get_pending_detach_partitions() else SQL_DETACH_PARTITION_CONCURRENTLY
+            with lock_timeout(self.options.get("lock_timeout")):
+                execute_sql(sql % {"parent": parent, "child": double_quote(table_name)})
+
+        partition_log = list(partition_log)
+        pending = get_pending_detach_partitions()
+        # Partitions left pending by an interrupted detaching are finalized along with the requested ones.
+        detach_logs = self.log_model.objects.filter(config=config).filter(
+            Q(pk__in=[log.pk for log in partition_log], is_attached=True) | Q(table_name__in=pending)
+        )
+
+        detached_logs = list()
+        try:
+            for log in detach_logs.order_by("start"):
+                retry_on_lock_timeout(partial(detach, log.table_name), self.options.get("lock_retries", 0))
+                with transaction.atomic():
+                    log.config = config
+                    log.is_attached = False
+                    log.detach_time = None
+                    self.log_model.objects.filter(pk=log.pk).update(is_attached=False, detach_time=None)
+                    self._execute_ddl(log.get_set_tablespace_sql(config.detach_tablespace))
+                detached_logs.append(log)
+        finally:
+            detached_pks = {log.pk for log in detached_logs}
+            for log in partition_log:
+                if log.pk in detached_pks:
+                    log.is_attached = False
+                    log.detach_time = None
+            for log in detached_logs:
+                post_detach_partition.send(sender=self.model, partition_log=log)
+            if detached_logs:
+                post_detach_partitions.send(sender=self.model, partition_logs=detached_logs)
+
+    def archive_partition(self, partition_log: Iterable, directory: str, compression: str = CompressionType.Gzip) -> None:
+        """Archive detached partitions to compressed files in a directory and drop their tables.
+
+        Each partition is locked against writes, streamed out with ``COPY ... TO STDOUT (FORMAT binary)`` to
+        ``<directory>/<table_name>.copy.gz`` (or ``.zst``), and dropped in its own transaction. The path, SHA-256 checksum
+        and number of rows of the file are recorded on the log. Partitions already archived are skipped.
+
+        Parameters:
+          partition_log(Iterable): The detached partitions to archive.
+          directory(str): The directory to write the files to.
+          compression(str): ``CompressionType.Gzip``, or ``CompressionType.Zstd`` which requires the ``zstandard`` package.
+        """
+        extension = {CompressionType.Gzip: "gz", CompressionType.Zstd: "zst"}[compression]
+        for log in partition_log:
+            if log.is_attached:
+                raise ValueError(f"The partition {log.table_name} must be detached before archiving.")
+            if log.archive_path:
+                continue
+
+            path = os.path.join(directory, f"{log.table_name}.copy.{extension}")
+            with transaction.atomic():
+                execute_sql(SQL_LOCK_TABLE % {"name": double_quote(log.table_name), "mode": "SHARE"})
+                rows, checksum = dump_table(log.table_name, path, compression)
+                self.log_model.objects.filter(pk=log.pk).update(archive_path=path, archive_checksum=checksum, archive_rows=rows)
+                drop_table(log.table_name)
+            log.archive_path, log.archive_checksum, log.archive_rows = path, checksum, rows
+
+    def restore_partition(self, partition_log: Iterable, attach: bool = False) -> None:
+        """Restore archived partitions from their files.
+
+        The checksum of each file is verified, the table is re-created like the parent table in the detach tablespace and
+        the rows are copied back. The files are deleted once the transaction is committed.
+
+        Parameters:
+          partition_log(Iterable): The archived partitions to restore.
+          attach(bool): Whether the restored partitions are attached.
+        """
+        with transaction.atomic():
+            self.lock()
+            config = self.config
+            restored_logs = list()
+            for log in partition_log:
+                if not log.archive_path:
+                    continue
+                compression = CompressionType.Zstd if log.archive_path.endswith(".zst") else CompressionType.Gzip
+                if file_checksum(log.archive_path) != log.archive_checksum:
+                    raise ValueError(f"The checksum of {log.archive_path} doesn't match.")
+
+                create_table_sql = SQL_CREATE_TABLE_LIKE_WITH_INDEXES % {
+                    "name": double_quote(log.table_name),
+                    "parent": double_quote(self.model._meta.db_table),
+                }
+                create_table_sql += self.get_subpartition_by_sql()
+                execute_sql([create_table_sql] + self.get_create_subpartitions_sql(log.table_name, None))
+                if load_table(log.table_name, log.archive_path, compression) != log.archive_rows:
+                    raise ValueError(f"The number of rows in {log.archive_path} doesn't match.")
+                log.config = config
+                execute_sql(log.get_set_tablespace_sql(config.detach_tablespace))
+
+                self.log_model.objects.filter(pk=log.pk).update(archive_path=None, archive_checksum=None, archive_rows=None)
+                transaction.on_commit(partial(os.remove, log.archive_path))
+                log.archive_path, log.archive_checksum, log.archive_rows = None, None, None
+                restored_logs.append(log)
+
+            if attach and restored_logs:
+                with self.validate_partitions({log.table_name: log.get_check_condition(self.model) for log in restored_logs}):
+                    self._set_attached(config, restored_logs, True, None)
+
+    def convert_table(self, batch_size: int = 10000, sleep: float = 0.0, partitions_ahead: int = 1) -> int:
+        """Convert the existing unpartitioned table of this model into a partitioned table without taking it offline.
+
+        1. A partitioned shadow table ``<table>_shadow`` is created like the table, with its indexes and foreign keys,
+           and the partitions covering the values of the partition key in the table and ``partitions_ahead`` more cycles.
+           From then on a trigger on the table replays its writes to the shadow table.
+        2. The rows are copied in batches ordered by the partition key, each in its own transaction. The rows of a batch are
+           locked against concurrent updates while they are copied, and rows already replayed by the trigger are skipped.
+        3. The trigger is dropped and the shadow table takes the name of the table, which is renamed to ``<table>_legacy``
+           and kept until you drop it, in a transaction holding the lock of the table only for a few statements.
+
+        The conversion continues with the second step when the shadow table exists already. It must not run in a transaction,
+        and ``create_partition`` of the model must not run before it completes, so plan ``partitions_ahead`` accordingly.
+        Unique indexes not covering the partition key are created without the uniqueness, and tables referenced by foreign
+        keys of other tables can't be converted. Rows whose partition key is NULL are copied to the default partition last,
+        tables without the ``default_partition`` option can't be converted when they have such rows.
+
+        Parameters:
+          batch_size(int): Maximum number of rows copied by a batch, more when rows share the value of the partition key.
+          sleep(float): Seconds to sleep between batches.
+          partitions_ahead(int): Number of partitions created beyond the current maximum value of the partition key.
+
+        Returns:
+          int: The number of rows copied by the batches.
+        """
+        table_name = self.model._meta.db_table
+        relkind = execute_sql(SQL_GET_RELKIND % {"name": single_quote(double_quote(table_name))}, fetch=True)
+        if not relkind or relkind[0][0] != "r":
+            raise ValueError(f"The table {table_name} doesn't exist or is partitioned already.")
+        if execute_sql(SQL_GET_REFERENCING_FOREIGN_KEYS % {"name": single_quote(double_quote(table_name))}, fetch=True):
+            raise ValueError(f"The table {table_name} is referenced by foreign keys.")
+        column = double_quote(self.model._meta.get_field(self.partition_key).column)
+        if (
+            not self.default_partition_table_name
+            and execute_sql(SQL_SELECT_NULL_EXISTS % {"column": column, "name": double_quote(table_name)}, fetch=True)[0][0]
+        ):
+            raise ValueError(f"The table {table_name} has rows without a value of the partition key, which only a default partition can hold.")
+
+        shadow_table_name = _suffix_name(table_name, "_shadow")
+        if not execute_sql(SQL_GET_RELKIND % {"name": single_quote(double_quote(shadow_table_name))}, fetch=True):
+            self._create_shadow_table(shadow_table_name, partitions_ahead)
+        rows = self._backfill_shadow_table(shadow_table_name, batch_size, sleep)
+        self._swap_shadow_table(shadow_table_name)
+        return rows
+
+    def _create_shadow_table(self, shadow_table_name: str, partitions_ahead: int) -> None:
+        """Create the partitioned shadow table, its partitions and the trigger replaying the writes to the table."""
+        table_name = self.model._meta.db_table
+        parent, shadow = double_quote(table_name), double_quote(shadow_table_name)
+        column = double_quote(self.model._meta.get_field(self.partition_key).column)
+
+        sql_sequence = [SQL_CREATE_TABLE_LIKE % {"name": shadow, "parent": parent} + SQL_APPEND_PARTITION_BY % {"type": self.type, "column": column}]
+        for index_name, definition, is_unique, is_primary, columns in execute_sql(SQL_GET_INDEX_DEFINITIONS % {"name": single_quote(parent)}, fetch=True):
+            shadow_index_name = double_quote(_suffix_name(index_name, "_shadow"))
+            covered = self.model._meta.get_field(self.partition_key).column in columns
+            if is_unique and not covered:
+                logger.warning("The unique index %s doesn't cover the partition key, it is created without the uniqueness.", index_name)
+            if is_primary and covered:
+                columns = ", ".join(double_quote(name) for name in columns)
+                sql_sequence.append(SQL_ADD_CONSTRAINT % {"name": shadow, "constraint": shadow_index_name, "definition": f"PRIMARY KEY ({columns})"})
+            else:
+                definition = re.sub(r"^CREATE (UNIQUE )?INDEX \S+ ON (ONLY )?\S+ ", "", definition)
+                sql_sequence.append(f"CREATE {'UNIQUE ' if is_unique and covered else ''}INDEX {shadow_index_name} ON {shadow} {definition}")
+        for constraint_name, definition in execute_sql(SQL_GET_FOREIGN_KEYS % {"name": single_quote(parent)}, fetch=True):
+            sql_sequence.append(SQL_ADD_CONSTRAINT % {"name": shadow, "constraint": double_quote(constraint_name), "definition": definition})
+
+        with transaction.atomic():
+            # The first partition created together with a new configuration would be a partition of the table,
+            # so the configuration is inserted without PartitionConfig.save.
+            if not PartitionConfig.objects.filter(model_label=self.model._meta.label_lower).exists():
+                try:
+                    with transaction.atomic():
+                        super(PartitionConfig, self._new_config()).save(force_insert=True)
+                except IntegrityError:
+                    pass
+            self.lock()
+            config = self.config
+            if self.log_model.objects.filter(config=config).exists():
+                raise ValueError(f"The partitions of {table_name} exist already.")
+            min_value, max_value = execute_sql(SQL_SELECT_MIN_MAX % {"column": column, "name": parent}, fetch=True)[0]
+            start, end = self._get_next_bound(config, None) if min_value is None else self._get_initial_bound(config, min_value)
+            bounds = list()
+            while max_value is not None and start <= max_value:
+                bounds.append((start, end))
+                start, end = self._get_next_bound(config, end)
+            for _ in range(partitions_ahead if bounds else partitions_ahead + 1):
+                bounds.append((start, end))
+                start, end = self._get_next_bound(config, end)
+            partition_logs = [
+                self.log_model(config=config, table_name=self._get_partition_table_name(config, *bound), start=bound[0], end=bound[1]) for bound in bounds
+            ]
+            self.log_model.objects.bulk_create(partition_logs)
+
+            for log in partition_logs:
+                start, end = log.get_bound_sql()
+                create_partition_sql = SQL_CREATE_RANGE_PARTITION % {"parent": shadow, "child": double_quote(log.table_name), "start": start, "end": end}
+                create_partition_sql += self.get_subpartition_by_sql()
+                if config.attach_tablespace:
+                    create_partition_sql += SQL_APPEND_TABLESPACE % {"tablespace": config.attach_tablespace}
+                sql_sequence.append(create_partition_sql)
+                sql_sequence.extend(self.get_create_subpartitions_sql(log.table_name, config.attach_tablespace))
+            if self.default_partition_table_name:
+                sql_sequence.append(SQL_CREATE_DEFAULT_PARTITION % {"parent": shadow, "child": double_quote(self.default_partition_table_name)})
+
+            function = double_quote(_suffix_name(table_name, "_sync"))
+            pk = double_quote(self.model._meta.pk.column)
+            sql_sequence.append(SQL_CREATE_SYNC_FUNCTION % {"function": function, "target": shadow, "pk": pk, "column": column})
+            sql_sequence.append(SQL_CREATE_SYNC_TRIGGER % {"trigger": function, "name": parent, "function": function})
+            execute_sql(sql_sequence)
+            if config.attach_tablespace:
+                indexes = get_indexes([log.table_name for log in partition_logs])
+                execute_sql([sql for log in partition_logs for sql in log.get_set_indexes_tablespace_sql(config.attach_tablespace, indexes)])
+
+    def _backfill_shadow_table(self, shadow_table_name: str, batch_size: int, sleep: float) -> int:
+        """Copy the rows of the table to the shadow table in batches ordered by the partition key,
+        and the rows without a value of the partition key to the default partition in a last batch."""
+        table_name = double_quote(self.model._meta.db_table)
+        column = double_quote(self.model._meta.get_field(self.partition_key).column)
+        pk = double_quote(self.model._meta.pk.column)
+
+        def backfill(cursor, condition, params):
+            cursor.execute(SQL_LOCK_ROWS % {"name": table_name, "condition": condition}, params)
+            # A new snapshot sees the rows replayed by the trigger before the rows were locked.
+            cursor.execute(
+                SQL_BACKFILL_ROWS % {"target": double_quote(shadow_table_name), "source": table_name, "condition": condition, "pk": pk, "column": column},
+                params,
+            )
+            return cursor.rowcount
+
+        total = 0
+        last_value = None
+        while True:
+            condition, params = (f"{column} IS NOT NULL", []) if last_value is None else (f"{column} > %s", [last_value])
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(SQL_SELECT_BATCH_END % {"column": column, "name": table_name, "condition": condition, "offset": int(batch_size) - 1}, params)
+                row = cursor.fetchone()
+                if row is not None:
+                    condition, params = f"{condition} AND {column} <= %s", params + [row[0]]
+                total += backfill(cursor, condition, params)
+            if row is None:
+                break
+            last_value = row[0]
+            if sleep:
+                time.sleep(sleep)
+
+        if self.default_partition_table_name:
+            with transaction.atomic(), connection.cursor() as cursor:
+                total += backfill(cursor, f"{column} IS NULL", [])
+        return total
+
+    def _swap_shadow_table(self, shadow_table_name: str) -> None:
+        """Drop the trigger and give the name of the table to the shadow table, together with the names of the indexes."""
+        table_name = self.model._meta.db_table
+        parent, shadow = double_quote(table_name), double_quote(shadow_table_name)
+        legacy = double_quote(_suffix_name(table_name, "_legacy"))
+
+        sql_sequence = [
+            SQL_LOCK_TABLE % {"name": parent, "mode": "ACCESS EXCLUSIVE"},
+            SQL_DROP_FUNCTION % {"function": double_quote(_suffix_name(table_name, "_sync"))},
+        ]
+        for index_name, _, _, _, _ in execute_sql(SQL_GET_INDEX_DEFINITIONS % {"name": single_quote(parent)}, fetch=True):
+            sql_sequence.append(SQL_RENAME_INDEX % {"name": double_quote(index_name), "new_name": double_quote(_suffix_name(index_name, "_legacy"))})
+            sql_sequence.append(SQL_RENAME_INDEX % {"name": double_quote(_suffix_name(index_name, "_shadow")), "new_name": double_quote(index_name)})
+        sql_sequence.append(SQL_RENAME_TABLE % {"name": parent, "new_name": legacy})
+        sql_sequence.append(SQL_RENAME_TABLE % {"name": shadow, "new_name": parent})
+        for column, sequence in execute_sql(SQL_GET_SERIAL_SEQUENCES % {"name": single_quote(parent)}, fetch=True):
+            sql_sequence.append(SQL_SET_SEQUENCE_OWNER % {"sequence": sequence, "name": parent, "column": double_quote(column)})
+
+        with transaction.atomic():
+            self._execute_ddl(sql_sequence)
+
+    def maintain(self) -> None:
+        """Create the partitions of the following cycles, detach partitions according to the interval
+        and apply the retention policy of the configuration, each with the default parameters."""
+        with step("create_partition"):
+            self.create_partition()
+        with step("detach_partition"):
+            self.detach_partition()
+        with step("apply_retention"):
+            self.apply_retention()
+
+    def apply_retention(self) -> Tuple[List[_RangePartitionLogBase], List[_RangePartitionLogBase]]:
+        """Apply the retention policy of the configuration. The partitions, except archived ones, are evaluated against
+        ``max_partitions``, ``drop_after`` and ``max_size`` with the sizes read in a single catalog query, then the partitions
+        beyond ``max_partitions`` are detached in a single batch and the partitions to remove are dropped or truncated
+        according to ``retention_action`` in a single batch. ``max_size`` only removes partitions that end before the current
+        time or the current maximum value of the partition key.
+
+        Returns:
+          Tuple[List[_RangePartitionLogBase], List[_RangePartitionLogBase]]: The partition log instances detached and removed.
+        """
+        with transaction.atomic():
+            self.lock()
+            config = self.config
+            if config.max_partitions is None and config.drop_after is None and config.max_size is None:
+                return [], []
+            truncate = config.retention_action == RetentionAction.Truncate
+            partition_log = list(self.log_model.objects.filter(config=config, archive_path=None).order_by("start"))
+            names = "ARRAY[%s]" % ", ".join(single_quote(log.table_name) for log in partition_log)
+            sizes = {name: (total_size, size) for name, total_size, size in execute_sql(SQL_GET_TABLE_SIZES % {"names": names}, fetch=True)}
+            # Truncated partitions are not removed again.
+            candidates = [log for log in partition_log[:-1] if not truncate or sizes[log.table_name][1]]
+
+            remove_logs = list()
+            if config.drop_after is not None:
+                line = self._get_retention_line(config, (config.interval or 0) + config.drop_after)
+                remove_logs.extend(log for log in candidates if not log.is_attached and log.end <= line)
+            if config.max_size is not None:
+                total_size = sum(total_size for total_size, _ in sizes.values()) - sum(sizes[log.table_name][0] for log in remove_logs)
+                # The partitions of the current period or width, and the following ones, are never removed for their size.
+                line = self._get_retention_line(config, 0)
+                for log in (log for log in candidates if log.end <= line):
+                    if total_size <= config.max_size:
+                        break
+                    if log not in remove_logs:
+                        remove_logs.append(log)
+                        total_size -= sizes[log.table_name][0]
+
+            detach_logs = list()
+            if config.max_partitions is not None:
+                now = timezone.now()
+                attached_logs = [log for log in partition_log if log.is_attached]
+                for log in attached_logs[: max(len(attached_logs) - config.max_partitions, 0)]:
+                    if (log not in remove_logs or truncate) and (log.detach_time is None or log.detach_time < now):
+                        detach_logs.append(log)
+
+            self._set_attached(config, detach_logs, False, None)
+            if truncate:
+                if remove_logs:
+                    self._execute_ddl([SQL_TRUNCATE_TABLE % {"name": ", ".join(double_quote(log.table_name) for log in remove_logs)}])
+            else:
+                self._execute_ddl([SQL_DROP_TABLE % {"name": double_quote(log.table_name)} for log in remove_logs])
+                self.log_model.objects.filter(pk__in=[log.pk for log in remove_logs]).delete()
+        return detach_logs, remove_logs
+
+    def reconcile(self, dry_run: bool = False) -> List[PartitionDrift]:
+        """Compare the partition logs with the partitions in the system catalogs in a single query, and repair the drift in bulk.
+
+        - Missing: the table of a log doesn't exist. The partition is created again when the log is attached, otherwise the log is deleted.
+        - Orphaned: a partition attached to the table has no log. A log is created from its bound.
+        - Wrongly attached: the partition is attached while the log is detached, or the other way around, or attached with another bound.
+          The partition is attached or detached according to the log.
+        - Wrong tablespace: the partition is not in the attach or detach tablespace of the configuration. It is moved there.
+
+        Archived partitions and the default partition are not compared. The SQL statements are executed in a single batch.
+
+        Parameters:
+          dry_run(bool): Only report the drift and the SQL statements that would repair it.
+
+        Returns:
+          List[PartitionDrift]: The drift found, with the SQL statements repairing it.
+        """
+        field = self.model._meta.get_field(self.partition_key)
+        with transaction.atomic():
+            if not dry_run:
+                self.lock()
+            config = self.config
+            logs = {log.table_name: log for log in self.log_model.objects.filter(config=config, archive_path=None)}
+            names = "ARRAY[%s]" % ", ".join(single_quote(table_name) for table_name in logs)
+            rows = execute_sql(SQL_GET_PARTITION_DRIFT % {"parent": single_quote(double_quote(self.model._meta.db_table)), "names": names}, fetch=True)
+
+            indexes = get_indexes([table_name for table_name, exists, _, _, _ in rows if exists])
+
+            drifts, new_logs, deleted_logs = list(), list(), list()
+            for table_name, exists, is_attached, bound, tablespace in sorted(rows):
+                log = logs.get(table_name)
+                if table_name == self.default_partition_table_name:
+                    continue
+                if log is None:
+                    drifts.append(PartitionDrift(table_name, DriftType.Orphaned, []))
+                    start_end = _parse_range_bound(field, bound)
+                    if not start_end or None in start_end:
+                        continue
+                    # The partition adopted is checked like the others.
+                    log = self.log_model(table_name=table_name, start=start_end[0], end=start_end[1])
+                    new_logs.append(log)
+
+                log.config = config
+                if not exists:
+                    drifts.append(PartitionDrift(table_name, DriftType.Missing, log.get_create_partition_sql(self.model) if log.is_attached else []))
+                    if not log.is_attached:
+                        deleted_logs.append(log)
+                elif log.is_attached and (not is_attached or _parse_range_bound(field, bound) != (log.start, log.end)):
+                    sql_sequence = (
+                        [SQL_DETACH_PARTITION % {"parent": double_quote(self.model._meta.db_table), "child": double_quote(table_name)}]
+                        if is_attached
+                        else []
+                    )
+                    add_sql, validate_sql = generate_partition_check_sql(table_name, log.get_check_condition(self.model), self.default_partition_table_name)
+                    sql_sequence += add_sql + validate_sql + log.get_attach_partition_sql(self.model, indexes)
+                    drifts.append(PartitionDrift(table_name, DriftType.WronglyAttached, sql_sequence))
+                elif not log.is_attached and is_attached:
+                    drifts.append(PartitionDrift(table_name, DriftType.WronglyAttached, log.get_detach_partition_sql(self.model, indexes)))
+                else:
+                    expected = config.attach_tablespace if log.is_attached else config.detach_tablespace
+                    if expected and tablespace != expected:
+                        drifts.append(PartitionDrift(table_name, DriftType.WrongTablespace, log.get_set_tablespace_sql(expected, indexes)))
+
+            if not dry_run:
+                self.log_model.objects.bulk_create(new_logs)
+                self.log_model.objects.filter(pk__in=[log.pk for log in deleted_logs]).delete()
+                self._execute_ddl([sql for drift in drifts for sql in drift.sql])
+        return drifts
+
+    def merge_partitions(self, partition_log: Iterable, batch_size: int = 10000) -> _RangePartitionLogBase:
+        """Merge contiguous partitions into one partition, for example old daily partitions into a monthly partition.
+        The partitions are detached, their rows are moved into the new partition in batches, which is attached afterwards,
+        and they are dropped. The rows of the partitions are not visible until the new partition is attached.
+
+        Parameters:
+          partition_log(Iterable): The contiguous partitions to merge, all attached or all detached.
+          batch_size(int): Maximum number of rows moved by a statement.
+
+        Returns:
+          _RangePartitionLogBase: The partition log instance of the new partition.
+        """
+        partition_log = sorted(partition_log, key=lambda log: log.start)
+        if len(partition_log) < 2:
+            raise ValueError("At least two partitions must be merged.")
+        start, end = partition_log[0].start, partition_log[-1].end
+        return self._replace_partitions(partition_log, [(start, end, self._get_partition_table_name(partition_log[0].config, start, end))], batch_size)[0]
+
+    def _replace_partitions(self, partition_log: List[_RangePartitionLogBase], partitions: List[tuple], batch_size: int) -> List[_RangePartitionLogBase]:
+        """Replace contiguous partitions by new partitions ``(start, end, table_name)`` of the same range.
+
+        The new partitions are created as standalone tables with the indexes of the parent table, the old partitions are detached without moving them between
+        tablespaces, and each new partition is attached as soon as the rows of its range are moved into it in batches.
+        The old partitions are dropped at last.
+        """
+        partition_log = sorted(partition_log, key=lambda log: log.start)
+        if any(log.archive_path for log in partition_log):
+            raise ValueError("Archived partitions must be restored first.")
+        if any(prev.end != log.start for prev, log in zip(partition_log, partition_log[1:])):
+            raise ValueError("The partitions must be contiguous.")
+        if len({log.is_attached for log in partition_log}) != 1:
+            raise ValueError("The partitions must be all attached or all detached.")
+        is_attached = partition_log[0].is_attached
+        parent = double_quote(self.model._meta.db_table)
+        column = double_quote(self.model._meta.get_field(self.partition_key).column)
+
+        with transaction.atomic():
+            self.lock()
+            config = self.config
+            tablespace = config.attach_tablespace if is_attached else config.detach_tablespace
+            new_logs = [
+                self.log_model(config=config, table_name=table_name, start=start, end=end, is_attached=False) for start, end, table_name in partitions
+            ]
+            self.log_model.objects.bulk_create(new_logs)
+            sql_sequence = list()
+            for log in new_logs:
+                create_table_sql = SQL_CREATE_TABLE_LIKE_WITH_INDEXES % {"name": double_quote(log.table_name), "parent": parent}
+                create_table_sql += self.get_subpartition_by_sql()
+                if tablespace:
+                    create_table_sql += SQL_APPEND_TABLESPACE % {"tablespace": tablespace}
+                sql_sequence.append(create_table_sql)
+                sql_sequence.extend(self.get_create_subpartitions_sql(log.table_name, tablespace))
+            execute_sql(sql_sequence)
+            if tablespace:
+                indexes = get_indexes([log.table_name for log in new_logs])
+                execute_sql([sql for log in new_logs for sql in log.get_set_indexes_tablespace_sql(tablespace, indexes)])
+            if is_attached:
+                self.log_model.objects.filter(pk__in=[log.pk for log in partition_log]).update(is_attached=False)
+                self._execute_ddl([SQL_DETACH_PARTITION % {"parent": parent, "child": double_quote(log.table_name)} for log in partition_log])
+
+        for log in new_logs:
+            start, end = log.get_bound_sql()
+            for old_log in partition_log:
+                if old_log.start < log.end and log.start < old_log.end:
+                    # Rows are moved from the leaves, ctid is not unique across sub-partitions.
+                    old_log.config = config
+                    table_names = old_log._get_table_names()
+                    for table_name in table_names[1:] or table_names:
+                        self._move_rows(table_name, log.table_name, SQL_RANGE_CHECK % {"column": column, "start": start, "end": end}, batch_size)
+            if is_attached:
+                with self.validate_partitions({log.table_name: log.get_check_condition(self.model)}), transaction.atomic():
+                    self.lock()
+                    self._set_attached(self.config, [log], True, None)
+
+        with transaction.atomic():
+            self.delete_partition(partition_log)
+        return new_logs
+
+    def delete_partition(self, partition_log: Iterable) -> None:
+        """Delete partitions. The files of archived partitions are kept.
+
+        Parameters:
+          partition_log(Iterable): The partitions to be deleted.
+        """
+        for log in partition_log:
+            if log.config == self.config:
+                log.delete()
+
+
+class TimeRangePartitionManager(_RangePartitionManagerBase):
+    """Manage time-based partition APIs."""
+
+    log_model = PartitionLog
+
+    def _get_config_defaults(self) -> dict:
+        return {"period": self.options.get("default_period", PeriodType.Month)}
 
     @classmethod
     def _get_period_bound(cls, date_start, initial, addition_zeros=None, is_week=False, **kwargs):
@@ -87,6 +1263,64 @@ class TimeRangePartitionManager(_PartitionManagerBase):
 
         return func
 
+    def _get_next_bound(self, config: PartitionConfig, date_start: Optional[datetime.datetime]) -> Tuple[datetime.datetime, datetime.datetime]:
+        """Get the bound of the partition following the one ending at ``date_start``,
+        or the bound of the current period when ``date_start`` is None."""
+        return self._get_bound(config.period, date_start, date_start is None)
+
+    def _get_initial_bound(self, config: PartitionConfig, value: datetime.datetime) -> Tuple[datetime.datetime, datetime.datetime]:
+        return self._get_bound(config.period, value, True)
+
+    def _get_bound(self, period: str, date_start: Optional[datetime.datetime], initial: bool) -> Tuple[datetime.datetime, datetime.datetime]:
+        partition_timezone = getattr(settings, "PARTITION_TIMEZONE", None)
+        if partition_timezone:
+            partition_timezone = pytz.timezone(partition_timezone)
+        date_start = timezone.localtime(date_start, timezone=partition_timezone)
+
+        count, unit = PeriodType.parse(period)
+        if unit in (PeriodType.Minute, PeriodType.Hour):
+            return self._get_sub_day_period_bound(date_start, initial, count * (60 if unit == PeriodType.Hour else 1))
+        return {
+            PeriodType.Day: self._get_period_bound(date_start, initial, days=+1),
+            PeriodType.Week: self._get_period_bound(date_start, initial, is_week=True, days=+1, weekday=MO),
+            PeriodType.Month: self._get_period_bound(date_start, initial, addition_zeros=dict(day=1), months=+1),
+            PeriodType.Year: self._get_period_bound(date_start, initial, addition_zeros=dict(month=1, day=1), years=+1),
+        }[period]()
+
+    @classmethod
+    def _get_sub_day_period_bound(cls, date_start: datetime.datetime, initial: bool, minutes: int) -> Tuple[datetime.datetime, datetime.datetime]:
+        """Sub-day partitions have a fixed length in absolute time, so that they stay contiguous across DST transitions.
+        The first partition is aligned to a multiple of the period since the local midnight."""
+        if initial:
+            local_start = date_start.replace(tzinfo=None)
+            offset = (local_start.hour * 60 + local_start.minute) // minutes * minutes
+            local_start = local_start.replace(hour=0, minute=0, second=0, microsecond=0) + datetime.timedelta(minutes=offset)
+            date_start = timezone.make_aware(local_start, date_start.tzinfo, is_dst=False)
+        date_end = timezone.localtime(date_start + datetime.timedelta(minutes=minutes), timezone=date_start.tzinfo)
+        return date_start, date_end
+
+    @classmethod
+    def _get_period_delta(cls, period: str) -> relativedelta:
+        count, unit = PeriodType.parse(period)
+        # fmt: off
+        delta = {PeriodType.Minute: {"minutes": count},
+                 PeriodType.Hour: {"hours": count},
+                 PeriodType.Day: {"days": 1},
+                 PeriodType.Week: {"weeks": 1},
+                 PeriodType.Month: {"months": 1},
+                 PeriodType.Year: {"years": 1}}[unit]
+        # fmt: on
+        return relativedelta(**delta)
+
+    def _get_partition_table_name(self, config: PartitionConfig, date_start: datetime.datetime, date_end: datetime.datetime) -> str:
+        return self._get_period_table_name(config.period, date_start, date_end)
+
+    def _get_period_table_name(self, period: str, date_start: datetime.datetime, date_end: datetime.datetime) -> str:
+        if PeriodType.parse(period)[1] in (PeriodType.Minute, PeriodType.Hour):
+            date_start, date_end = date_start.astimezone(pytz.utc), date_end.astimezone(pytz.utc)
+            return "_".join((self.model._meta.db_table, date_start.strftime(DT_FORMAT_SUB_DAY), date_end.strftime(DT_FORMAT_SUB_DAY)))
+        return "_".join((self.model._meta.db_table, date_start.strftime(DT_FORMAT), date_end.strftime(DT_FORMAT)))
+
     def create_partition(self, max_days_to_next_partition: int = 1) -> None:
         """The partition of the next cycle is created according to the configuration.
         After modifying the period field, the new period will take effect the next time.
@@ -97,91 +1331,217 @@ class TimeRangePartitionManager(_PartitionManagerBase):
         the current time is June 5, 2018, and the archiving period is one year,
         then the start time of the first partition is 00:00:00 on January 1, 2018.
 
+        The configuration and the latest partition are locked and read only once per call,
+        subsequent partitions are computed in memory from the partition created last.
+
         Parameters:
           max_days_to_next_partition(int):
             If numbers of days remained in current partition is greater than ``max_days_to_next_partition``, no new partitions will be created.
         """
-        while True:
-            if max_days_to_next_partition > 0 and self.latest and timezone.now() < (self.latest.end - relativedelta(days=max_days_to_next_partition)):
-                return
-
-            partition_timezone = getattr(settings, "PARTITION_TIMEZONE", None)
-            if partition_timezone:
-                partition_timezone = pytz.timezone(partition_timezone)
-            date_start = timezone.localtime(self.latest.end if self.latest else None, timezone=partition_timezone)
-            initial = not bool(self.latest)
-            date_start, date_end = {
-                PeriodType.Day: self._get_period_bound(date_start, initial, days=+1),
-                PeriodType.Week: self._get_period_bound(date_start, initial, is_week=True, days=+1, weekday=MO),
-                PeriodType.Month: self._get_period_bound(date_start, initial, addition_zeros=dict(day=1), months=+1),
-                PeriodType.Year: self._get_period_bound(date_start, initial, addition_zeros=dict(month=1, day=1), years=+1),
-            }[self.config.period]()
-
-            partition_table_name = "_".join((self.model._meta.db_table, date_start.strftime(DT_FORMAT), date_end.strftime(DT_FORMAT)))
-            PartitionLog.objects.create(config=self.config, table_name=partition_table_name, start=date_start, end=date_end)
-
-            if not max_days_to_next_partition > 0:
-                return
+        with transaction.atomic():
+            # Lock the model and read the configuration once, then advance the latest partition in memory.
+            self.lock()
+            config = self.config
+            latest = config.logs.order_by("-end").first()
 
-    def attach_partition(self, partition_log: Optional[Iterable] = None, detach_time: Optional[datetime.datetime] = None) -> None:
-        """Attach partitions.
+            while True:
+                if max_days_to_next_partition > 0 and latest and timezone.now() < (latest.end - relativedelta(days=max_days_to_next_partition)):
+                    return
+
+                date_start, date_end = self._get_next_bound(config, latest.end if latest else None)
+                latest = PartitionLog.objects.create(
+                    config=config, table_name=self._get_partition_table_name(config, date_start, date_end), start=date_start, end=date_end
+                )
+
+                if not max_days_to_next_partition > 0:
+                    return
+
+    def split_partition(self, partition_log: PartitionLog, period: str, batch_size: int = 10000) -> List[PartitionLog]:
+        """Split a partition into partitions of a shorter period, for example a monthly partition into daily partitions.
+        The partition is detached, and each new partition is attached as soon as the rows of its range are moved into it in batches.
+        The rows of a new partition are not visible until it is attached.
 
         Parameters:
-          partition_log(Optional[Iterable]):
-            All partitions are attached when you don't specify partitions to attach.
-          detach_time(Optional[datetime.datetime]):
-            When the partition specifies the archive time, it will **not** be automatically archived until that time.
+          partition_log(PartitionLog): The partition to split.
+          period(PeriodType): The period of the new partitions, which must divide the partition.
+          batch_size(int): Maximum number of rows moved by a statement.
+
+        Returns:
+          List[PartitionLog]: The partition log instances of the new partitions.
         """
-        if not partition_log:
-            partition_log = PartitionLog.objects.filter(config=self.config, is_attached=False)
+        start, end = self._get_bound(period, partition_log.start, True)
+        if start != partition_log.start:
+            raise ValueError(f"The partition {partition_log.table_name} doesn't start at the beginning of a period.")
+        partitions = list()
+        while end < partition_log.end:
+            partitions.append((start, end, self._get_period_table_name(period, start, end)))
+            start, end = self._get_bound(period, end, False)
+        if end != partition_log.end or not partitions:
+            raise ValueError(f"The partition {partition_log.table_name} can't be split by the period.")
+        partitions.append((start, end, self._get_period_table_name(period, start, end)))
+        return self._replace_partitions([partition_log], partitions, batch_size)
 
-        for log in partition_log:
-            log.is_attached = True
-            log.detach_time = detach_time
-            log.save()
+    def _get_retention_line(self, config: PartitionConfig, count: int) -> datetime.datetime:
+        return timezone.now() - count * self._get_period_delta(config.period)
 
-    def detach_partition(self, partition_log: Optional[Iterable] = None) -> None:
-        """Detach partitions.
+    def _get_detach_partition_log(self, config: PartitionConfig) -> Iterable:
+        if not config.interval:
+            return []
+
+        now = timezone.now()
+        detach_timeline = now - config.interval * self._get_period_delta(config.period)
+        partition_log = PartitionLog.objects.filter(config=config, end__lt=detach_timeline, is_attached=True)
+        return partition_log.filter(Q(detach_time=None) | Q(detach_time__lt=now))
+
+
+class IntegerRangePartitionManager(_RangePartitionManagerBase):
+    """Manage integer-based partition APIs, typically partitioned by an auto-increment primary key."""
+
+    log_model = IntegerRangePartitionLog
+
+    def _get_config_defaults(self) -> dict:
+        return {"width": self.options.get("default_width", 1000000)}
+
+    def _get_max_value(self) -> int:
+        """Get the current maximum value of the partition key, or 0 when the table is empty."""
+        return self.model.objects.aggregate(max_value=Max(self.partition_key))["max_value"] or 0
+
+    def _get_next_bound(self, config: PartitionConfig, start: Optional[int]) -> Tuple[int, int]:
+        """Get the bound of the partition following the one ending at ``start``,
+        or the bound of the width containing the current maximum value when ``start`` is None."""
+        if start is None:
+            return self._get_initial_bound(config, self._get_max_value())
+        return start, start + config.width
+
+    def _get_initial_bound(self, config: PartitionConfig, value: int) -> Tuple[int, int]:
+        start = value // config.width * config.width
+        return start, start + config.width
+
+    def _get_partition_table_name(self, config: PartitionConfig, start: int, end: int) -> str:
+        return "_".join((self.model._meta.db_table, str(start), str(end)))
+
+    def create_partition(self, partitions_ahead: int = 1) -> None:
+        """Partitions are created according to the configuration until at least ``partitions_ahead`` partitions are ahead of the
+        current maximum value of the partition key. After modifying the width field, the new width will take effect the next time.
+        The start of the new partition is the end of the previous partition,
+        or the multiple of the width below the current maximum value when no partition exists.
+
+        For example:
+        the maximum id is 1234567 and the width is one million, then the first partition is [1000000, 2000000).
 
         Parameters:
-          partition_log(Optional[Iterable]):
-            Specify a partition to archive. When you don't specify a partition to archive, all partitions that meet the configuration rule are archived.
+          partitions_ahead(int):
+            If the partitions remained above the current maximum value are more than ``partitions_ahead``, no new partitions will be created.
+            When it is 0, exactly one partition is created.
         """
-        if not partition_log:
-            if self.config.interval:
-                # fmt: off
-                period = {PeriodType.Day: {"days": 1},
-                          PeriodType.Week: {"weeks": 1},
-                          PeriodType.Month: {"months": 1},
-                          PeriodType.Year: {"years": 1}}[self.config.period]
-                # fmt: on
-                now = timezone.now()
-                detach_timeline = now - self.config.interval * relativedelta(**period)
-                partition_log = PartitionLog.objects.filter(config=self.config, end__lt=detach_timeline, is_attached=True)
-                partition_log = partition_log.filter(Q(detach_time=None) | Q(detach_time__lt=now))
-            else:
-                return
+        with transaction.atomic():
+            self.lock()
+            config = self.config
+            latest = IntegerRangePartitionLog.objects.filter(config=config).order_by("-end").first()
+            max_value = self._get_max_value()
 
-        for log in partition_log:
-            log.is_attached = False
-            log.detach_time = None
-            log.save()
+            while True:
+                if partitions_ahead > 0 and latest and max_value < latest.end - partitions_ahead * config.width:
+                    return
 
-    def delete_partition(self, partition_log: Iterable) -> None:
-        """Delete partitions.
+                start, end = self._get_next_bound(config, latest.end if latest else None)
+                latest = IntegerRangePartitionLog.objects.create(
+                    config=config, table_name=self._get_partition_table_name(config, start, end), start=start, end=end
+                )
+
+                if not partitions_ahead > 0:
+                    return
+
+    def split_partition(self, partition_log: IntegerRangePartitionLog, width: int, batch_size: int = 10000) -> List[IntegerRangePartitionLog]:
+        """Split a partition into partitions of a smaller width.
+        The partition is detached, and each new partition is attached as soon as the rows of its range are moved into it in batches.
+        The rows of a new partition are not visible until it is attached.
 
         Parameters:
-          partition_log(Iterable): The partitions to be deleted.
+          partition_log(IntegerRangePartitionLog): The partition to split.
+          width(int): The width of the new partitions, which must divide the width of the partition.
+          batch_size(int): Maximum number of rows moved by a statement.
+
+        Returns:
+          List[IntegerRangePartitionLog]: The partition log instances of the new partitions.
         """
-        for log in partition_log:
-            if log.config == self.config:
-                log.delete()
+        if width <= 0 or (partition_log.end - partition_log.start) % width or partition_log.end - partition_log.start == width:
+            raise ValueError(f"The partition {partition_log.table_name} can't be split by the width.")
+        partitions = [
+            (start, start + width, self._get_partition_table_name(partition_log.config, start, start + width))
+            for start in range(partition_log.start, partition_log.end, width)
+        ]
+        return self._replace_partitions([partition_log], partitions, batch_size)
+
+    def _get_retention_line(self, config: PartitionConfig, count: int) -> int:
+        return self._get_max_value() - count * config.width
+
+    def _get_detach_partition_log(self, config: PartitionConfig) -> Iterable:
+        if not config.interval:
+            return []
+
+        detach_line = self._get_max_value() - config.interval * config.width
+        partition_log = IntegerRangePartitionLog.objects.filter(config=config, end__lte=detach_line, is_attached=True)
+        return partition_log.filter(Q(detach_time=None) | Q(detach_time__lt=timezone.now()))
+
+
+def _merge_aggregate(aggregate_class: type, values: list):
+    """Merge the values of an aggregate on several partitions."""
+    if issubclass(aggregate_class, Count):
+        return sum(values)
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return {Sum: sum, Min: min, Max: max}[aggregate_class](values)
+
+
+def _rebase_queryset(queryset: models.QuerySet, table_name: str) -> models.QuerySet:
+    """Read a table of the same columns instead of the table of the queryset, which keeps its alias in the SQL."""
+    queryset = queryset.all()
+    alias = queryset.query.get_initial_alias()
+    queryset.query.alias_map[alias] = BaseTable(table_name, alias)
+    return queryset
+
+
+def _suffix_name(name: str, suffix: str) -> str:
+    """Append the suffix to the identifier, truncating it to the maximum length of identifiers."""
+    return name[: 63 - len(suffix)] + suffix
 
 
 def _db_value(value: Union[str, int, bool, None]) -> str:
     if value is None:
         return "null"
-    return single_quote(value) if isinstance(value, str) else str(value)
+    return "'%s'" % value.replace("'", "''") if isinstance(value, str) else str(value)
+
+
+def _parse_range_bound(field: models.Field, bound: str) -> Optional[tuple]:
+    """Parse the start and the end of a range partition bound in the system catalogs, or return None for other bounds.
+    Literals are quoted except those of ``int4`` keys, and an unbounded ``MINVALUE`` or ``MAXVALUE`` end is parsed as None."""
+    value = r"('(?:[^']|'')*'|[^'()\s,]+)"
+    match = re.fullmatch(r"FOR VALUES FROM \(%s\) TO \(%s\)" % (value, value), bound or "")
+    if not match:
+        return None
+    literals = match.groups()
+    return tuple(
+        None if literal in ("MINVALUE", "MAXVALUE") else field.to_python(literal[1:-1].replace("''", "'") if literal.startswith("'") else literal)
+        for literal in literals
+    )
+
+
+def _parse_list_bound(field: models.Field, bound: str) -> Optional[list]:
+    """Parse the values of a list partition bound in the system catalogs, or return None for the default partition."""
+    prefix, _, bound = bound.partition("FOR VALUES IN")
+    if prefix or not bound:
+        return None
+    values = list()
+    for literal, word in re.findall(r"'((?:[^']|'')*)'|([^,\s()]+)", bound):
+        if not word:
+            values.append(field.to_python(literal.replace("''", "'")))
+        elif word in ("NULL", "true", "false"):
+            values.append({"NULL": None, "true": True, "false": False}[word])
+        else:
+            values.append(field.to_python(word))
+    return values
 
 
 class ListPartitionManager(_PartitionManagerBase):
@@ -210,6 +1570,7 @@ class ListPartitionManager(_PartitionManagerBase):
 
     def attach_partition(self, partition_name: str, value: Union[str, int, bool, None], tablespace: str = None) -> None:
         """Attach partitions.
+        The value is validated beforehand by ``validate_partitions``, so that attaching doesn't scan the partition.
 
         Parameters:
           partition_name(str): Partition name.
@@ -217,14 +1578,94 @@ class ListPartitionManager(_PartitionManagerBase):
           tablespace(str): Partition tablespace name.
         """
 
-        sql_sequence = list()
-        if tablespace:
-            sql_sequence.append(SQL_SET_TABLE_TABLESPACE % {"name": double_quote(partition_name), "tablespace": tablespace})
-            sql_sequence.extend(generate_set_indexes_tablespace_sql(partition_name, tablespace))
+        sql_sequence = generate_set_tablespace_sql(partition_name, tablespace) if tablespace else list()
         sql_sequence.append(
             SQL_ATTACH_LIST_PARTITION % {"parent": double_quote(self.model._meta.db_table), "child": double_quote(partition_name), "value": _db_value(value)}
         )
-        execute_sql(sql_sequence)
+        sql_sequence.extend(generate_drop_partition_check_sql(partition_name, self.default_partition_table_name))
+        with self.validate_partitions({partition_name: self._get_condition(value)}):
+            self._execute_ddl(sql_sequence)
+
+    def bulk_ingest(self, rows: Iterable, get_partition_name: Optional[Callable] = None, tablespace: str = None) -> int:
+        """Write model instances directly to their partitions with ``COPY FROM STDIN``, bypassing the tuple routing of the parent table.
+        Rows are grouped by the values of the partitions in the system catalogs. Rows of other values are written to new partitions
+        when ``get_partition_name`` is specified, otherwise to the default partition, if any.
+        Like ``bulk_create``, ``save`` is not called, and primary keys generated by the database are not set on the instances.
+        The parent table is locked, so that partitions can't be detached while the rows are written to them.
+
+        Parameters:
+          rows(Iterable): The model instances to write.
+          get_partition_name(Optional[Callable]): Called with a value of the partition key to get the name of its new partition.
+          tablespace(str): Tablespace name of new partitions.
+
+        Returns:
+          int: The number of rows written.
+        """
+        rows = list(rows)
+        field = self.model._meta.get_field(self.partition_key)
+        tables = dict()
+        default_table_name = None
+        for table_name, bound in get_partitions(self.model._meta.db_table):
+            values = _parse_list_bound(field, bound)
+            if values is None:
+                default_table_name = table_name
+            for value in values or []:
+                tables[value] = table_name
+
+        with transaction.atomic():
+            partitions = defaultdict(list)
+            for obj in rows:
+                value = field.to_python(getattr(obj, field.attname))
+                if value not in tables and get_partition_name:
+                    tables[value] = get_partition_name(value)
+                    self.create_partition(tables[value], value, tablespace)
+                if value in tables:
+                    partitions[tables[value]].append(obj)
+                elif default_table_name:
+                    partitions[default_table_name].append(obj)
+                else:
+                    raise ValueError(f"No partition of {self.model._meta.db_table} found for {value}.")
+            self._copy_to_partitions(partitions)
+        return len(rows)
+
+    def _get_condition(self, value: Union[str, int, bool, None]) -> str:
+        column = double_quote(self.model._meta.get_field(self.partition_key).column)
+        if value is None:
+            return SQL_LIST_NULL_CHECK % {"column": column}
+        return SQL_LIST_CHECK % {"column": column, "value": _db_value(value)}
+
+    def drain_default_partition(self, get_partition_name: Callable, tablespace: str = None, batch_size: int = 10000) -> List[str]:
+        """Move the rows of the default partition into new partitions of their values.
+
+        Each partition is created as a standalone table in its own transaction, filled with batches of rows moved out of the
+        default partition, and then attached in the same transaction: the new table isn't scanned, but the default partition is
+        validated by a CHECK constraint while it is locked, because rows of the range can be written to it until then.
+
+        Parameters:
+          get_partition_name(Callable): Called with a value of the partition key to get the name of its partition.
+          tablespace(str): Partition tablespace name.
+          batch_size(int): Maximum number of rows moved by a statement.
+
+        Returns:
+          List[str]: The names of the partitions created.
+        """
+        column = double_quote(self.model._meta.get_field(self.partition_key).column)
+        values = execute_sql(SQL_SELECT_DISTINCT % {"column": column, "name": double_quote(self.default_partition_table_name)}, fetch=True)
+
+        partition_names = list()
+        for (value,) in values:
+            partition_name = get_partition_name(value)
+            with transaction.atomic():
+                create_table_sql = SQL_CREATE_TABLE_LIKE % {"name": double_quote(partition_name), "parent": double_quote(self.model._meta.db_table)}
+                if tablespace:
+                    create_table_sql += SQL_APPEND_TABLESPACE % {"tablespace": tablespace}
+                execute_sql(create_table_sql)
+                self._move_rows(self.default_partition_table_name, partition_name, self._get_condition(value), batch_size)
+                self.attach_partition(partition_name, value)
+                if tablespace:
+                    execute_sql(generate_set_indexes_tablespace_sql(partition_name, tablespace))
+            partition_names.append(partition_name)
+        return partition_names
 
     def detach_partition(self, partition_name: str, tablespace: str = None) -> None:
         """Detach partitions.
@@ -235,6 +1676,148 @@ class ListPartitionManager(_PartitionManagerBase):
         """
         sql_sequence = [SQL_DETACH_PARTITION % {"parent": double_quote(self.model._meta.db_table), "child": double_quote(partition_name)}]
         if tablespace:
-            sql_sequence.append(SQL_SET_TABLE_TABLESPACE % {"name": double_quote(partition_name), "tablespace": tablespace})
-            sql_sequence.extend(generate_set_indexes_tablespace_sql(partition_name, tablespace))
-        execute_sql(sql_sequence)
+            sql_sequence.extend(generate_set_tablespace_sql(partition_name, tablespace))
+        self._execute_ddl(sql_sequence)
+
+
+class HashPartitionManager(_PartitionManagerBase):
+    """Manage hash-based partition APIs."""
+
+    type = PartitioningType.Hash
+
+    @property
+    def partitions(self) -> List[Tuple[str, int, int]]:
+        """Get the current layout of the partitions from the system catalogs, partitions without a hash bound are skipped.
+
+        Returns:
+          List[Tuple[str, int, int]]: The table name, modulus and remainder of each partition, ordered by modulus and remainder.
+        """
+        partitions = list()
+        for table_name, bound in get_partitions(self.model._meta.db_table):
+            match = re.search(r"modulus (\d+), remainder (\d+)", bound or "")
+            if not match:
+                continue
+            partitions.append((table_name, int(match.group(1)), int(match.group(2))))
+        return sorted(partitions, key=lambda item: item[1:])
+
+    def _get_partition_table_name(self, modulus: int, remainder: int) -> str:
+        return "_".join((self.model._meta.db_table, str(modulus), str(remainder)))
+
+    def get_initial_partitions_sql(self) -> List[str]:
+        return self.get_create_partitions_sql()
+
+    def get_create_partitions_sql(self, modulus: Optional[int] = None, tablespace: Optional[str] = None) -> List[str]:
+        """Generate the SQL statements that create all partitions of the given modulus.
+
+        Parameters:
+          modulus(Optional[int]): Number of partitions, defaults to the ``modulus`` option.
+          tablespace(Optional[str]): Partition tablespace name, defaults to the ``tablespace`` option.
+        """
+        modulus = modulus or self.options.get("modulus", 8)
+        tablespace = tablespace or self.options.get("tablespace")
+        sql_sequence = list()
+        for remainder in range(modulus):
+            create_partition_sql = SQL_CREATE_HASH_PARTITION % {
+                "parent": double_quote(self.model._meta.db_table),
+                "child": double_quote(self._get_partition_table_name(modulus, remainder)),
+                "modulus": modulus,
+                "remainder": remainder,
+            }
+            if tablespace:
+                create_partition_sql += SQL_APPEND_TABLESPACE % {"tablespace": tablespace}
+            sql_sequence.append(create_partition_sql)
+        return sql_sequence
+
+    def create_partitions(self, modulus: Optional[int] = None, tablespace: Optional[str] = None) -> None:
+        """Create all ``MODULUS modulus REMAINDER r`` partitions at once. They are created together with the table,
+        so you only need to call it when the partitions have been dropped.
+
+        Parameters:
+          modulus(Optional[int]): Number of partitions, defaults to the ``modulus`` option.
+          tablespace(Optional[str]): Partition tablespace name, defaults to the ``tablespace`` option.
+        """
+        modulus = modulus or self.options.get("modulus", 8)
+        tablespace = tablespace or self.options.get("tablespace")
+        with transaction.atomic():
+            execute_sql(self.get_create_partitions_sql(modulus, tablespace))
+            if tablespace:
+                table_names = [self._get_partition_table_name(modulus, remainder) for remainder in range(modulus)]
+                indexes = get_indexes(table_names)
+                execute_sql([sql for table_name in table_names for sql in generate_set_indexes_tablespace_sql(table_name, tablespace, indexes)])
+
+    def split_partitions(self, tablespace: Optional[str] = None) -> None:
+        """Split each partition of modulus ``n`` into the two partitions of modulus ``2n``.
+
+        Partitions are split one by one, each in its own transaction: rows of the partition are copied into two new tables,
+        created with the indexes of the table and a validated CHECK constraint of their bound, while only writes to that
+        partition are blocked. Then the partition is detached, the new tables are attached without being scanned and the
+        partition is dropped under the ACCESS EXCLUSIVE lock of the parent table, which is subject to the ``lock_timeout``
+        and ``lock_retries`` options and is held until the end of the transaction of the partition. An interrupted split
+        can be resumed by calling it again, because PostgreSQL accepts partitions of both moduli at the same time.
+        ``ValueError`` is raised when the table has no hash partitions.
+
+        Parameters:
+          tablespace(Optional[str]): Tablespace name of the new partitions, defaults to the ``tablespace`` option.
+        """
+        if connection.in_atomic_block:
+            raise TransactionManagementError("Splitting partitions can't be executed inside a transaction block.")
+
+        tablespace = tablespace or self.options.get("tablespace")
+        partitions = self.partitions
+        if not partitions:
+            raise ValueError(f"The table {self.model._meta.db_table} has no hash partitions to split.")
+        moduli = {modulus for _, modulus, _ in partitions}
+        target = max(moduli) if len(moduli) > 1 else max(moduli) * 2
+        for table_name, modulus, remainder in partitions:
+            if modulus < target:
+                remainders = range(remainder, target, modulus)
+                retry_on_lock_timeout(partial(self._split_partition, table_name, target, remainders, tablespace), self.options.get("lock_retries", 0))
+
+    def _split_partition(self, table_name: str, modulus: int, remainders: Iterable, tablespace: Optional[str]) -> None:
+        parent = double_quote(self.model._meta.db_table)
+        column = double_quote(self.model._meta.get_field(self.partition_key).column)
+        table_names = [self._get_partition_table_name(modulus, remainder) for remainder in remainders]
+        with transaction.atomic():
+            sql_sequence = [SQL_LOCK_TABLE % {"name": double_quote(table_name), "mode": "EXCLUSIVE"}]
+            if tablespace:
+                sql_sequence.append(SQL_SET_LOCAL_DEFAULT_TABLESPACE % {"tablespace": single_quote(tablespace)})
+            for child_name, remainder in zip(table_names, remainders):
+                child = double_quote(child_name)
+                create_table_sql = SQL_CREATE_TABLE_LIKE_WITH_INDEXES % {"name": child, "parent": parent}
+                if tablespace:
+                    create_table_sql += SQL_APPEND_TABLESPACE % {"tablespace": tablespace}
+                sql_sequence.append(create_table_sql)
+                sql_sequence.append(
+                    SQL_INSERT_HASH_REMAINDER
+                    % {
+                        "child": child,
+                        "source": double_quote(table_name),
+                        "parent": single_quote(parent),
+                        "modulus": modulus,
+                        "remainder": remainder,
+                        "column": column,
+                    }
+                )
+                # The new tables are checked against their bound, so that attaching them doesn't scan them again.
+                condition = SQL_HASH_CHECK % {"parent": single_quote(parent), "modulus": modulus, "remainder": remainder, "column": column}
+                add_sql, validate_sql = generate_partition_check_sql(child_name, condition)
+                sql_sequence.extend(add_sql + validate_sql)
+            if tablespace:
+                sql_sequence.append(SQL_RESTORE_DEFAULT_TABLESPACE)
+            execute_sql(sql_sequence)
+
+            # Only catalog changes are left under the lock of the parent table.
+            sql_sequence = [SQL_DETACH_PARTITION % {"parent": parent, "child": double_quote(table_name)}]
+            for child_name, remainder in zip(table_names, remainders):
+                sql_sequence.append(
+                    SQL_ATTACH_HASH_PARTITION % {"parent": parent, "child": double_quote(child_name), "modulus": modulus, "remainder": remainder}
+                )
+            sql_sequence.append(SQL_DROP_TABLE % {"name": double_quote(table_name)})
+            with lock_timeout(self.options.get("lock_timeout")):
+                execute_sql(sql_sequence)
+
+            sql_sequence = [sql for child_name in table_names for sql in generate_drop_partition_check_sql(child_name)]
+            if tablespace:
+                indexes = get_indexes(table_names)
+                sql_sequence.extend(sql for child_name in table_names for sql in generate_set_indexes_tablespace_sql(child_name, tablespace, indexes))
+            execute_sql(sql_sequence)
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pg_partitioning', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partitionconfig',
+            name='width',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.CreateModel(
+            name='IntegerRangePartitionLog',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.TextField(unique=True)),
+                ('is_attached', models.BooleanField(default=True)),
+                ('detach_time', models.DateTimeField(null=True)),
+                ('start', models.BigIntegerField()),
+                ('end', models.BigIntegerField()),
+                ('config', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='integer_logs', to='pg_partitioning.PartitionConfig')),
+            ],
+            options={
+                'ordering': ('-id',),
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pg_partitioning', '0002_integer_range_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partitionlog',
+            name='archive_path',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='partitionlog',
+            name='archive_checksum',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='partitionlog',
+            name='archive_rows',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='integerrangepartitionlog',
+            name='archive_path',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='integerrangepartitionlog',
+            name='archive_checksum',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='integerrangepartitionlog',
+            name='archive_rows',
+            field=models.BigIntegerField(null=True),
+        ),
+    ]
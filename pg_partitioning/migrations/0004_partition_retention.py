@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pg_partitioning', '0003_partition_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partitionconfig',
+            name='max_size',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='partitionconfig',
+            name='max_partitions',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='partitionconfig',
+            name='drop_after',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='partitionconfig',
+            name='retention_action',
+            field=models.TextField(default='drop'),
+        ),
+    ]
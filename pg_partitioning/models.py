@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional, Tuple, Type
+
 from django.apps import apps
 from django.db import models, transaction
 
@@ -5,13 +7,24 @@ from pg_partitioning.signals import post_attach_partition, post_create_partition
 
 from .constants import (
     SQL_APPEND_TABLESPACE,
-    SQL_ATTACH_TIME_RANGE_PARTITION,
-    SQL_CREATE_TIME_RANGE_PARTITION,
+    SQL_ATTACH_RANGE_PARTITION,
+    SQL_CREATE_RANGE_PARTITION,
     SQL_DETACH_PARTITION,
-    SQL_SET_TABLE_TABLESPACE,
+    SQL_RANGE_CHECK,
     PeriodType,
+    RetentionAction,
+)
+from .shortcuts import (
+    double_quote,
+    drop_table,
+    execute_sql,
+    generate_drop_partition_check_sql,
+    generate_set_indexes_tablespace_sql,
+    generate_set_tablespace_sql,
+    get_indexes,
+    get_partitions,
+    single_quote,
 )
-from .shortcuts import double_quote, drop_table, execute_sql, generate_set_indexes_tablespace_sql, single_quote
 
 
 class PartitionConfig(models.Model):
@@ -21,7 +34,7 @@ class PartitionConfig(models.Model):
 
     model_label = models.TextField(unique=True)
     period = models.TextField(default=PeriodType.Month)
-    """Partition period. you can only set options in the `PeriodType`.
+    """Partition period. you can only set options in the `PeriodType`, or several minutes or hours by ``PeriodType.multiple``.
     The default value is ``PeriodType.Month``. Changing this value will trigger the ``detach_partition`` method."""
     interval = models.PositiveIntegerField(null=True)
     """Detaching period. The ``detach_partition`` method defaults to detach partitions before the interval * period.
@@ -32,6 +45,20 @@ class PartitionConfig(models.Model):
     detach_tablespace = models.TextField(null=True)
     """The name of the tablespace specified when detaching a partition. Modifying this field will only affect subsequent operations.
     A table migration may occur at this time."""
+    width = models.BigIntegerField(null=True)
+    """Width of integer range partitions, only used by ``IntegerRangePartitioning``. Modifying this field will only affect subsequent
+    partitions. Changing this value will trigger the ``detach_partition`` method."""
+    max_size = models.BigIntegerField(null=True)
+    """Retention by size. ``apply_retention`` removes the oldest partitions except the latest one while the total size of the partitions
+    in bytes, including their indexes and TOAST tables, is above this value. The default is None, ie no limit."""
+    max_partitions = models.PositiveIntegerField(null=True)
+    """Retention by count. ``apply_retention`` detaches the oldest attached partitions beyond this number. The default is None, ie no limit."""
+    drop_after = models.PositiveIntegerField(null=True)
+    """Retention by age. ``apply_retention`` removes the detached partitions older than ``interval`` plus this number of periods or widths.
+    The default is None, ie detached partitions are kept."""
+    retention_action = models.TextField(default=RetentionAction.Drop)
+    """How ``apply_retention`` removes partitions, ``RetentionAction.Drop`` drops them together with their logs,
+    ``RetentionAction.Truncate`` empties them and keeps them."""
 
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
         """This setting will take effect immediately when you modify the value of
@@ -51,23 +78,30 @@ class PartitionConfig(models.Model):
                 model.partitioning.create_partition(0)
 
         if not adding:
-            # Period or interval changed.
-            if prev.period != self.period or (prev.interval != self.interval):
+            # Period, width or interval changed.
+            if prev.period != self.period or prev.width != self.width or (prev.interval != self.interval):
                 model.partitioning.detach_partition()
 
 
-class PartitionLog(models.Model):
-    """You can only edit the following fields via the object's ``save`` method:"""
+class _RangePartitionLogBase(models.Model):
+    """The common part of logs of range partitions, subclasses define the ``config``, ``start`` and ``end`` fields."""
 
-    config = models.ForeignKey(PartitionConfig, on_delete=models.CASCADE, related_name="logs")
     table_name = models.TextField(unique=True)
-    # range bound: [start, end)
-    start = models.DateTimeField()
-    end = models.DateTimeField()
     is_attached = models.BooleanField(default=True)
     """Whether the partition is a attached partition. changing the value will trigger an attaching or detaching operation."""
     detach_time = models.DateTimeField(null=True)
     """When the value is not `None`, the partition will not be automatically detached before this time. The default is `None`."""
+    archive_path = models.TextField(null=True)
+    """Path of the file the partition is archived to by ``archive_partition``, its table doesn't exist while it is set."""
+    archive_checksum = models.TextField(null=True)
+    """SHA-256 checksum of the archive file."""
+    archive_rows = models.BigIntegerField(null=True)
+    """Number of rows in the archive file."""
+
+    def get_bound_sql(self) -> Tuple[str, str]:
+        """Represent the range bound ``[start, end)`` of the partition in SQL."""
+
+        raise NotImplementedError
 
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
         """This setting will take effect immediately when you modify the value of
@@ -76,51 +110,29 @@ class PartitionLog(models.Model):
 
         model = apps.get_model(self.config.model_label)
         if self._state.adding:
-            create_partition_sql = SQL_CREATE_TIME_RANGE_PARTITION % {
-                "parent": double_quote(model._meta.db_table),
-                "child": double_quote(self.table_name),
-                "date_start": single_quote(self.start.isoformat()),
-                "date_end": single_quote(self.end.isoformat()),
-            }
-
-            if self.config.attach_tablespace:
-                create_partition_sql += SQL_APPEND_TABLESPACE % {"tablespace": self.config.attach_tablespace}
+            create_partition_sql = self.get_create_partition_sql(model)
 
             with transaction.atomic():
                 super().save(force_insert, force_update, using, update_fields)
                 execute_sql(create_partition_sql)
-                execute_sql(generate_set_indexes_tablespace_sql(self.table_name, self.config.attach_tablespace))
+                execute_sql(self.get_set_indexes_tablespace_sql(self.config.attach_tablespace))
                 post_create_partition.send(sender=model, partition_log=self)
         else:
-            with transaction.atomic():
+            # The bound of a partition to attach is validated before the transaction attaching it.
+            checks = dict()
+            if self.is_attached and not self.__class__.objects.filter(pk=self.pk, is_attached=True).exists():
+                checks[self.table_name] = self.get_check_condition(model)
+            with model.partitioning.validate_partitions(checks), transaction.atomic():
                 prev = self.__class__.objects.select_for_update().get(pk=self.pk)
                 # Detach partition.
                 if prev.is_attached and (not self.is_attached):
-                    sql_sequence = [SQL_DETACH_PARTITION % {"parent": double_quote(model._meta.db_table), "child": double_quote(self.table_name)}]
-                    if self.config.detach_tablespace:
-                        sql_sequence.append(SQL_SET_TABLE_TABLESPACE % {"name": double_quote(self.table_name), "tablespace": self.config.detach_tablespace})
-                        sql_sequence.extend(generate_set_indexes_tablespace_sql(self.table_name, self.config.detach_tablespace))
-
+                    sql_sequence = self.get_detach_partition_sql(model)
                     super().save(force_insert, force_update, using, update_fields)
                     execute_sql(sql_sequence)
                     post_detach_partition.send(sender=model, partition_log=self)
                 # Attach partition.
                 elif (not prev.is_attached) and self.is_attached:
-                    sql_sequence = list()
-                    if self.config.attach_tablespace:
-                        sql_sequence.append(SQL_SET_TABLE_TABLESPACE % {"name": double_quote(self.table_name), "tablespace": self.config.attach_tablespace})
-                        sql_sequence.extend(generate_set_indexes_tablespace_sql(self.table_name, self.config.attach_tablespace))
-
-                    sql_sequence.append(
-                        SQL_ATTACH_TIME_RANGE_PARTITION
-                        % {
-                            "parent": double_quote(model._meta.db_table),
-                            "child": double_quote(self.table_name),
-                            "date_start": single_quote(self.start.isoformat()),
-                            "date_end": single_quote(self.end.isoformat()),
-                        }
-                    )
-
+                    sql_sequence = self.get_attach_partition_sql(model)
                     super().save(force_insert, force_update, using, update_fields)
                     execute_sql(sql_sequence)
                     post_attach_partition.send(sender=model, partition_log=self)
@@ -128,6 +140,79 @@ class PartitionLog(models.Model):
                 else:
                     super().save(force_insert, force_update, using, update_fields)
 
+    def get_create_partition_sql(self, model: Type[models.Model]) -> List[str]:
+        """Generate the SQL sequence that creates the partition of this log and its sub-partitions, if any."""
+
+        start, end = self.get_bound_sql()
+        create_partition_sql = SQL_CREATE_RANGE_PARTITION % {
+            "parent": double_quote(model._meta.db_table),
+            "child": double_quote(self.table_name),
+            "start": start,
+            "end": end,
+        }
+        create_partition_sql += model.partitioning.get_subpartition_by_sql()
+        if self.config.attach_tablespace:
+            create_partition_sql += SQL_APPEND_TABLESPACE % {"tablespace": self.config.attach_tablespace}
+        return [create_partition_sql] + model.partitioning.get_create_subpartitions_sql(self.table_name, self.config.attach_tablespace)
+
+    def get_check_condition(self, model: Type[models.Model]) -> str:
+        """Represent the range bound of the partition as the condition of a CHECK constraint."""
+
+        start, end = self.get_bound_sql()
+        column = double_quote(model._meta.get_field(model.partitioning.partition_key).column)
+        return SQL_RANGE_CHECK % {"column": column, "start": start, "end": end}
+
+    def get_attach_partition_sql(self, model: Type[models.Model], indexes: Optional[Dict[str, List[Tuple[str, str]]]] = None) -> List[str]:
+        """Generate the SQL sequence that moves the partition of this log to the attach tablespace, attaches it and drops
+        the CHECK constraints of its bound. Attaching doesn't scan the partition when the constraints are validated first,
+        see ``_PartitionManagerBase.validate_partitions``."""
+
+        sql_sequence = self.get_set_tablespace_sql(self.config.attach_tablespace, indexes)
+        start, end = self.get_bound_sql()
+        sql_sequence.append(
+            SQL_ATTACH_RANGE_PARTITION % {"parent": double_quote(model._meta.db_table), "child": double_quote(self.table_name), "start": start, "end": end}
+        )
+        sql_sequence.extend(generate_drop_partition_check_sql(self.table_name, model.partitioning.default_partition_table_name))
+        return sql_sequence
+
+    def get_detach_partition_sql(self, model: Type[models.Model], indexes: Optional[Dict[str, List[Tuple[str, str]]]] = None) -> List[str]:
+        """Generate the SQL sequence that detaches the partition of this log and moves it to the detach tablespace."""
+
+        sql_sequence = [SQL_DETACH_PARTITION % {"parent": double_quote(model._meta.db_table), "child": double_quote(self.table_name)}]
+        sql_sequence.extend(self.get_set_tablespace_sql(self.config.detach_tablespace, indexes))
+        return sql_sequence
+
+    def get_set_tablespace_sql(self, tablespace: Optional[str], indexes: Optional[Dict[str, List[Tuple[str, str]]]] = None) -> List[str]:
+        """Generate the SQL sequence that moves the partition of this log, its sub-partitions and their indexes to the tablespace, if any.
+        The indexes are looked up with one query unless they are looked up by ``get_indexes`` in bulk for several logs."""
+
+        sql_sequence = list()
+        if tablespace:
+            if indexes is None:
+                indexes = get_indexes([self.table_name])
+            for table_name in self._get_table_names():
+                sql_sequence.extend(generate_set_tablespace_sql(table_name, tablespace, indexes))
+        return sql_sequence
+
+    def get_set_indexes_tablespace_sql(self, tablespace: Optional[str], indexes: Optional[Dict[str, List[Tuple[str, str]]]] = None) -> List[str]:
+        """Generate the SQL sequence that moves the indexes of the partition of this log and its sub-partitions to the tablespace, if any."""
+
+        sql_sequence = list()
+        if tablespace:
+            if indexes is None:
+                indexes = get_indexes([self.table_name])
+            for table_name in self._get_table_names():
+                sql_sequence.extend(generate_set_indexes_tablespace_sql(table_name, tablespace, indexes))
+        return sql_sequence
+
+    def _get_table_names(self) -> List[str]:
+        """The partition and its sub-partitions, which are looked up in the system catalogs."""
+
+        model = apps.get_model(self.config.model_label)
+        if not model.partitioning.options.get("subpartition_type"):
+            return [self.table_name]
+        return [self.table_name] + [table_name for table_name, _ in get_partitions(self.table_name)]
+
     @transaction.atomic
     def delete(self, using=None, keep_parents=False):
         """When the instance is deleted, the partition corresponding to it will also be deleted."""
@@ -135,5 +220,35 @@ class PartitionLog(models.Model):
         drop_table(self.table_name)
         super().delete(using, keep_parents)
 
+    class Meta:
+        abstract = True
+
+
+class PartitionLog(_RangePartitionLogBase):
+    """You can only edit the following fields via the object's ``save`` method:"""
+
+    config = models.ForeignKey(PartitionConfig, on_delete=models.CASCADE, related_name="logs")
+    # range bound: [start, end)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+
+    def get_bound_sql(self) -> Tuple[str, str]:
+        return single_quote(self.start.isoformat()), single_quote(self.end.isoformat())
+
+    class Meta:
+        ordering = ("-id",)
+
+
+class IntegerRangePartitionLog(_RangePartitionLogBase):
+    """You can only edit the following fields via the object's ``save`` method:"""
+
+    config = models.ForeignKey(PartitionConfig, on_delete=models.CASCADE, related_name="integer_logs")
+    # range bound: [start, end)
+    start = models.BigIntegerField()
+    end = models.BigIntegerField()
+
+    def get_bound_sql(self) -> Tuple[str, str]:
+        return str(self.start), str(self.end)
+
     class Meta:
         ordering = ("-id",)
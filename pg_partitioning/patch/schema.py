@@ -37,6 +37,10 @@ def create_model(self, model):
         DatabaseSchemaEditor.sql_create_table = default_sql_create_table
     default_create_model_method(self, model)
     meta.pk.primary_key = True
+    if isinstance(partitioning, _PartitionManagerBase):
+        # Hash partitions and the default partition are created together with the table.
+        for sql in partitioning.get_initial_partitions_sql():
+            self.execute(sql)
 
 
 DatabaseSchemaEditor.create_model = create_model
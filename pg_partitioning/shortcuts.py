@@ -1,9 +1,44 @@
+import datetime
+import decimal
+import gzip
+import hashlib
+import io
 import logging
-from typing import List, Optional, Tuple, Union
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 
-from django.db import connection
+from django.db import OperationalError, connection, transaction
+from psycopg2.extras import Inet, Json, Range
 
-from pg_partitioning.constants import SQL_DROP_TABLE, SQL_GET_TABLE_INDEXES, SQL_SET_INDEX_TABLESPACE, SQL_SET_TABLE_TABLESPACE, SQL_TRUNCATE_TABLE
+from pg_partitioning.constants import (
+    PGCODE_LOCK_NOT_AVAILABLE,
+    SQL_ADD_CHECK_CONSTRAINT,
+    SQL_ADVISORY_UNLOCK,
+    SQL_ADVISORY_XACT_LOCK,
+    SQL_COPY_FROM_STDIN,
+    SQL_COPY_FROM_STDIN_BINARY,
+    SQL_COPY_TO_STDOUT_BINARY,
+    SQL_DROP_CONSTRAINT,
+    SQL_DROP_TABLE,
+    SQL_GET_INDEXES,
+    SQL_GET_PARTITION_STATS,
+    SQL_GET_PARTITIONS,
+    SQL_NOT_CHECK,
+    SQL_RESET_LOCK_TIMEOUT,
+    SQL_SET_INDEX_TABLESPACE,
+    SQL_SET_LOCK_TIMEOUT,
+    SQL_SET_TABLE_TABLESPACE,
+    SQL_TRUNCATE_TABLE,
+    SQL_TRY_ADVISORY_LOCK,
+    SQL_TRY_ADVISORY_XACT_LOCK,
+    SQL_VALIDATE_CONSTRAINT,
+    CompressionType,
+)
+from pg_partitioning.instrumentation import instrument
 
 logger = logging.getLogger(__name__)
 
@@ -31,28 +66,328 @@ def execute_sql(sql_sequence: Union[str, List[str], Tuple[str]], fetch: bool = F
             return []
         return
 
-    sql_str = ""
-    for statement in sql_sequence if isinstance(sql_sequence, (list, tuple)) else [sql_sequence]:
-        sql_str += ";\n" + statement if sql_str else statement
+    statements = sql_sequence if isinstance(sql_sequence, (list, tuple)) else [sql_sequence]
+    sql_str = ";\n".join(statements)
     logger.debug("The sequence of SQL statements to be executed:\n %s", sql_str)
-    with connection.cursor() as cursor:
+    with instrument(statements), connection.cursor() as cursor:
         cursor.execute(sql_str)
         if fetch:
             return cursor.fetchall()
 
 
-def generate_set_indexes_tablespace_sql(table_name: str, tablespace: str) -> List[str]:
-    """Generate set indexes tablespace SQL sequence.
+def _quote_element(text: str) -> str:
+    return '"%s"' % text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _copy_value(value: Any) -> str:
+    """Represent a value in the input format of its type, before the escaping of ``COPY``."""
+
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return "%d days %d seconds %d microseconds" % (value.days, value.seconds, value.microseconds)
+    if isinstance(value, (bytes, memoryview)):
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, Json):
+        return value.dumps(value.adapted)
+    if isinstance(value, (list, tuple)):
+        # Nested arrays are written as they are, other elements are quoted.
+        elements = (
+            "NULL" if item is None else _copy_value(item) if isinstance(item, (list, tuple)) else _quote_element(_copy_value(item)) for item in value
+        )
+        return "{%s}" % ",".join(elements)
+    if isinstance(value, Range):
+        if value.isempty:
+            return "empty"
+        lower = "" if value.lower is None else _quote_element(_copy_value(value.lower))
+        upper = "" if value.upper is None else _quote_element(_copy_value(value.upper))
+        return "%s%s,%s%s" % ("[" if value.lower_inc else "(", lower, upper, "]" if value.upper_inc else ")")
+    if isinstance(value, dict):
+        # The values of ``HStoreField``.
+        return ", ".join("%s=>%s" % (_quote_element(str(key)), "NULL" if item is None else _quote_element(str(item))) for key, item in value.items())
+    if not isinstance(value, (str, int, float, decimal.Decimal, uuid.UUID, Inet)):
+        raise TypeError(f"Values of type {type(value).__name__} can't be written with COPY.")
+    return str(value)
+
+
+def _copy_text(value: Any) -> str:
+    """Represent a value in the text format of ``COPY``."""
+
+    if value is None:
+        return "\\N"
+    return _copy_value(value).replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+
+
+def copy_rows(table_name: str, columns: Sequence[str], rows: Iterable[Sequence]) -> None:
+    """Write rows to a table with ``COPY FROM STDIN``, which is much cheaper than inserting them one by one.
+
+    Parameters:
+      table_name(str): Table name.
+      columns(Sequence[str]): Column names.
+      rows(Iterable[Sequence]): Values of the columns of each row, as prepared for the database.
+    """
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_text(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    sql = SQL_COPY_FROM_STDIN % {"name": double_quote(table_name), "columns": ", ".join(double_quote(column) for column in columns)}
+    logger.debug("Copy rows with:\n %s", sql)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
+
+
+def _open_compressed(path: str, mode: str, compression: str):
+    if compression == CompressionType.Gzip:
+        return gzip.open(path, mode, compresslevel=6)
+    if compression == CompressionType.Zstd:
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("The zstandard package is required by the zstd compression.")
+        file = open(path, mode)
+        if mode == "wb":
+            return zstandard.ZstdCompressor().stream_writer(file)
+        return zstandard.ZstdDecompressor().stream_reader(file)
+    raise ValueError(f"Unknown compression {compression}.")
+
+
+def file_checksum(path: str) -> str:
+    """Get the SHA-256 checksum of a file.
+
+    Parameters:
+      path(str): Path of the file.
+    """
+
+    checksum = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def dump_table(table_name: str, path: str, compression: str = CompressionType.Gzip) -> Tuple[int, str]:
+    """Stream the rows of a table to a compressed file with ``COPY ... TO STDOUT (FORMAT binary)``.
+    The file is written under a temporary name first, so that an interrupted dump leaves no file at ``path``.
+
+    Parameters:
+      table_name(str): Table name.
+      path(str): Path of the file.
+      compression(str): ``CompressionType.Gzip``, or ``CompressionType.Zstd`` which requires the ``zstandard`` package.
+
+    Returns:
+      Tuple[int, str]: The number of rows and the SHA-256 checksum of the file.
+    """
+
+    temp_path = path + ".tmp"
+    with _open_compressed(temp_path, "wb", compression) as file, connection.cursor() as cursor:
+        cursor.copy_expert(SQL_COPY_TO_STDOUT_BINARY % {"name": double_quote(table_name)}, file)
+        rows = cursor.rowcount
+    os.replace(temp_path, path)
+    return rows, file_checksum(path)
+
+
+def load_table(table_name: str, path: str, compression: str = CompressionType.Gzip) -> int:
+    """Load the rows of a file written by ``dump_table`` into a table with ``COPY ... FROM STDIN (FORMAT binary)``.
+
+    Parameters:
+      table_name(str): Table name, the columns of the table must be the same as the dumped table.
+      path(str): Path of the file.
+      compression(str): Compression of the file.
+
+    Returns:
+      int: The number of rows loaded.
+    """
+
+    with _open_compressed(path, "rb", compression) as file, connection.cursor() as cursor:
+        cursor.copy_expert(SQL_COPY_FROM_STDIN_BINARY % {"name": double_quote(table_name)}, file)
+        return cursor.rowcount
+
+
+@contextmanager
+def lock_timeout(timeout: Optional[int]):
+    """Abort any statement executed within the block that waits longer than ``timeout`` milliseconds for a lock.
+
+    Parameters:
+      timeout(Optional[int]): Lock timeout in milliseconds, no timeout is set when it is None or zero.
+    """
+
+    if not timeout:
+        yield
+        return
+
+    execute_sql(SQL_SET_LOCK_TIMEOUT % {"timeout": int(timeout)})
+    try:
+        yield
+    except Exception:
+        # Inside a transaction the setting is reverted together with the failed savepoint.
+        if not connection.in_atomic_block:
+            execute_sql(SQL_RESET_LOCK_TIMEOUT)
+        raise
+    execute_sql(SQL_RESET_LOCK_TIMEOUT)
+
+
+def _advisory_lock_key(name: str) -> int:
+    """A stable 64-bit advisory lock key of the name."""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+
+
+def advisory_xact_lock(name: str, nowait: bool = False) -> bool:
+    """Acquire the transaction level advisory lock of the name, which is released at the end of the transaction.
+
+    Parameters:
+      name(str): Name of the lock.
+      nowait(bool): Return False instead of waiting when another transaction holds the lock.
+
+    Returns:
+      bool: Whether the lock is acquired.
+    """
+
+    key = _advisory_lock_key(name)
+    if nowait:
+        return execute_sql(SQL_TRY_ADVISORY_XACT_LOCK % {"key": key}, fetch=True)[0][0]
+    execute_sql(SQL_ADVISORY_XACT_LOCK % {"key": key})
+    return True
+
+
+@contextmanager
+def try_advisory_lock(name: str):
+    """Try to acquire the session level advisory lock of the name without waiting, and release it at the end of the block.
+    The lock is held by the connection of the current thread, so processes on several nodes can exclude each other.
+
+    Parameters:
+      name(str): Name of the lock.
+
+    Yields:
+      bool: Whether the lock is acquired.
+    """
+
+    key = _advisory_lock_key(name)
+    acquired = execute_sql(SQL_TRY_ADVISORY_LOCK % {"key": key}, fetch=True)[0][0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            execute_sql(SQL_ADVISORY_UNLOCK % {"key": key})
+
+
+def retry_on_lock_timeout(func: Callable, retries: int = 0, delay: float = 1.0):
+    """Call ``func`` and retry it with a jittered exponential backoff each time it fails to acquire a lock in time.
+    Inside a transaction every attempt runs in its own savepoint when there are retries.
+
+    Parameters:
+      func(Callable): The function to call.
+      retries(int): Maximum number of retries.
+      delay(float): Base delay in seconds between attempts.
+    """
+
+    attempt = 0
+    while True:
+        try:
+            if retries and connection.in_atomic_block:
+                with transaction.atomic():
+                    return func()
+            return func()
+        except OperationalError as e:
+            if attempt >= retries or getattr(e.__cause__, "pgcode", None) != PGCODE_LOCK_NOT_AVAILABLE:
+                raise
+            logger.info("Lock not available, retry %d of %d.", attempt + 1, retries)
+            time.sleep(delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+            attempt += 1
+
+
+def get_indexes(table_names: Sequence[str]) -> Dict[str, List[Tuple[str, str]]]:
+    """Look up the indexes of the tables and of their partitions with a single catalog query. The tables are resolved
+    to OIDs through the search path like the statements changing them, so same-named tables in other schemas are ignored.
+
+    Parameters:
+      table_names(Sequence[str]): Table names.
+
+    Returns:
+      Dict[str, List[Tuple[str, str]]]: The names of the indexes, qualified and quoted as needed, and their tablespaces by table name.
+    """
+    indexes = dict()
+    if table_names:
+        names = "ARRAY[%s]" % ", ".join(single_quote(name) for name in table_names)
+        for table_name, index_name, tablespace in execute_sql(SQL_GET_INDEXES % {"names": names}, fetch=True):
+            indexes.setdefault(table_name, []).append((index_name, tablespace))
+    return indexes
+
+
+def generate_set_indexes_tablespace_sql(table_name: str, tablespace: str, indexes: Optional[Dict[str, List[Tuple[str, str]]]] = None) -> List[str]:
+    """Generate set indexes tablespace SQL sequence. Indexes already in the tablespace are skipped.
 
     Parameters:
       table_name(str): Table name.
       tablespace(str): Partition tablespace.
+      indexes(Optional[Dict[str, List[Tuple[str, str]]]]): The indexes looked up by ``get_indexes`` in bulk,
+        which include the table. They are looked up for the table alone by default.
     """
 
+    if indexes is None:
+        indexes = get_indexes([table_name])
     sql_sequence = []
-    result = execute_sql(SQL_GET_TABLE_INDEXES % {"table_name": single_quote(table_name)}, fetch=True)
-    for item in result:
-        sql_sequence.append(SQL_SET_INDEX_TABLESPACE % {"name": double_quote(item[0]), "tablespace": tablespace})
+    for index_name, index_tablespace in indexes.get(table_name, []):
+        if index_tablespace != tablespace:
+            sql_sequence.append(SQL_SET_INDEX_TABLESPACE % {"name": index_name, "tablespace": tablespace})
+    return sql_sequence
+
+
+def generate_partition_check_sql(table_name: str, condition: str, default_table_name: Optional[str] = None) -> Tuple[List[str], List[str]]:
+    """Generate the SQL sequences which add a CHECK constraint matching the partition bound without validation, replacing
+    one left by an interrupted attach, and validate it. Adding it takes an ACCESS EXCLUSIVE lock of the table only briefly,
+    validating it scans the table under a SHARE UPDATE EXCLUSIVE lock, so they should be committed separately.
+    The default partition of the parent table, if any, is checked against the negated condition likewise.
+
+    Parameters:
+      table_name(str): Table name of the partition.
+      condition(str): Condition equivalent to the partition bound.
+      default_table_name(Optional[str]): Table name of the default partition of the parent table.
+
+    Returns:
+      Tuple[List[str], List[str]]: The SQL sequences which add the constraints and which validate them.
+    """
+
+    checks = [(table_name, condition)]
+    if default_table_name:
+        checks.append((default_table_name, SQL_NOT_CHECK % {"condition": condition}))
+
+    # The constraints are named after the partition, several partitions can be checked against the default partition at once.
+    constraint = double_quote("%s_partition_check" % table_name)
+    add_sql, validate_sql = generate_drop_partition_check_sql(table_name, default_table_name), list()
+    for name, check in checks:
+        add_sql.append(SQL_ADD_CHECK_CONSTRAINT % {"name": double_quote(name), "constraint": constraint, "condition": check})
+        validate_sql.append(SQL_VALIDATE_CONSTRAINT % {"name": double_quote(name), "constraint": constraint})
+    return add_sql, validate_sql
+
+
+def generate_drop_partition_check_sql(table_name: str, default_table_name: Optional[str] = None) -> List[str]:
+    """Generate the SQL sequence which drops the CHECK constraints added by ``generate_partition_check_sql``, if any.
+
+    Parameters:
+      table_name(str): Table name of the partition.
+      default_table_name(Optional[str]): Table name of the default partition of the parent table.
+    """
+
+    names = [table_name, default_table_name] if default_table_name else [table_name]
+    constraint = double_quote("%s_partition_check" % table_name)
+    return [SQL_DROP_CONSTRAINT % {"name": double_quote(name), "constraint": constraint} for name in names]
+
+
+def generate_set_tablespace_sql(table_name: str, tablespace: str, indexes: Optional[Dict[str, List[Tuple[str, str]]]] = None) -> List[str]:
+    """Generate set table and indexes tablespace SQL sequence.
+
+    Parameters:
+      table_name(str): Table name.
+      tablespace(str): Tablespace name.
+      indexes(Optional[Dict[str, List[Tuple[str, str]]]]): The indexes looked up by ``get_indexes`` in bulk.
+    """
+
+    sql_sequence = [SQL_SET_TABLE_TABLESPACE % {"name": double_quote(table_name), "tablespace": tablespace}]
+    sql_sequence.extend(generate_set_indexes_tablespace_sql(table_name, tablespace, indexes))
     return sql_sequence
 
 
@@ -64,9 +399,52 @@ def set_tablespace(table_name: str, tablespace: str) -> None:
       tablespace(str): Tablespace name.
     """
 
-    sql_sequence = [SQL_SET_TABLE_TABLESPACE % {"name": double_quote(table_name), "tablespace": tablespace}]
-    sql_sequence.extend(generate_set_indexes_tablespace_sql(table_name, tablespace))
-    execute_sql(sql_sequence)
+    execute_sql(generate_set_tablespace_sql(table_name, tablespace))
+
+
+def get_partitions(table_name: str) -> List[Tuple[str, str]]:
+    """Get the partitions attached to a partitioned table from the system catalogs.
+
+    Parameters:
+      table_name(str): Table name of the partitioned table.
+
+    Returns:
+      List[Tuple[str, str]]: The table name and the bound expression of each partition, ordered by table name.
+    """
+
+    return [tuple(row) for row in execute_sql(SQL_GET_PARTITIONS % {"parent": single_quote(double_quote(table_name))}, fetch=True)]
+
+
+class PartitionStats(NamedTuple):
+    """Statistics of a partition. The values of a partition with sub-partitions are summed over its sub-partitions,
+    and the times are the oldest ones among them."""
+
+    table_name: str
+    bound: str
+    tablespace: Optional[str]
+    table_size: int
+    indexes_size: int
+    total_size: int
+    row_estimate: int
+    dead_tuples: int
+    last_vacuum: Optional[datetime.datetime]
+    last_autovacuum: Optional[datetime.datetime]
+    last_analyze: Optional[datetime.datetime]
+    last_autoanalyze: Optional[datetime.datetime]
+
+
+def get_partition_stats(table_name: str) -> List[PartitionStats]:
+    """Get the statistics of the partitions attached to a partitioned table with a single query of the system catalogs
+    and the statistics views. Sizes are in bytes, the number of rows is estimated by the latest ``ANALYZE`` or ``VACUUM``.
+
+    Parameters:
+      table_name(str): Table name of the partitioned table.
+
+    Returns:
+      List[PartitionStats]: The statistics of each partition, ordered by table name.
+    """
+
+    return [PartitionStats(*row) for row in execute_sql(SQL_GET_PARTITION_STATS % {"parent": single_quote(double_quote(table_name))}, fetch=True)]
 
 
 def truncate_table(table_name: str) -> None:
@@ -3,9 +3,18 @@ from django.dispatch import Signal
 post_create_partition = Signal(providing_args=["partition_log"])
 """Sent when a partition is created.
 """
+post_create_partitions = Signal(providing_args=["partition_logs"])
+"""Sent once when several partitions are created in bulk.
+"""
 post_attach_partition = Signal(providing_args=["partition_log"])
 """Sent when a partition is attached.
 """
 post_detach_partition = Signal(providing_args=["partition_log"])
 """Sent when a partition is detached.
 """
+post_attach_partitions = Signal(providing_args=["partition_logs"])
+"""Sent once when several partitions are attached in bulk.
+"""
+post_detach_partitions = Signal(providing_args=["partition_logs"])
+"""Sent once when several partitions are detached in bulk.
+"""
@@ -0,0 +1,103 @@
+import argparse
+import datetime
+import json
+import logging
+import sys
+
+from run_test import setup_django_environment
+
+SUITES = ("bulk_ingest", "partitioning")
+
+
+def environment():
+    import django
+    from django.db import connection
+
+    import pg_partitioning
+
+    return {
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "django": django.get_version(),
+        "pg_partitioning": pg_partitioning.__version__,
+        "postgresql": connection.pg_version,
+    }
+
+
+def print_results(results, file=sys.stdout):
+    print(f"{'benchmark':<20}{'case':<24}{'best':>14}{'median':>14}{'rows/s':>14}", file=file)
+    for result in results:
+        if "error" in result:
+            print(f"{result['benchmark']:<20}{result['case']:<24}  {result['error'].splitlines()[0]}", file=file)
+            continue
+        rate = f"{result['rows_per_second']:>14.0f}" if "rows_per_second" in result else ""
+        print(f"{result['benchmark']:<20}{result['case']:<24}{result['seconds']:>13.6f}s{result['median']:>13.6f}s{rate}", file=file)
+
+
+def compare(results, baseline, threshold, file=sys.stdout):
+    """Print the ratio of each result to the baseline, and return the number of results slower than the threshold."""
+    previous = {(result["benchmark"], result["case"]): result for result in baseline["results"] if "error" not in result}
+    regressions = 0
+    print(f"\n{'benchmark':<20}{'case':<24}{'baseline':>14}{'current':>14}{'ratio':>8}", file=file)
+    for result in results:
+        old = previous.get((result["benchmark"], result["case"]))
+        if old is None or "error" in result:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        regressed = ratio > threshold
+        regressions += regressed
+        print(
+            f"{result['benchmark']:<20}{result['case']:<24}{old['seconds']:>13.6f}s{result['seconds']:>13.6f}s{ratio:>7.2f}x"
+            + ("  slower" if regressed else ""),
+            file=file,
+        )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pg_partitioning benchmarks against a test database.")
+    parser.add_argument("-n", "--rows", dest="rows", type=int, default=100000, help="Number of rows written by each run.")
+    parser.add_argument("-r", "--repeat", dest="repeat", type=int, default=3, help="Number of runs, the best one and the median are reported.")
+    parser.add_argument("-s", "--suite", dest="suites", action="append", choices=SUITES, help="Suites to run, all of them by default.")
+    parser.add_argument(
+        "-p", "--partitions", dest="partitions", default="1,30,365,8760", help="Comma separated numbers of partitions created by the partitioning suite."
+    )
+    parser.add_argument("-o", "--output", dest="output", help="Write the results as JSON to this file, - for the standard output.")
+    parser.add_argument("-c", "--compare", dest="compare", help="Compare the results with a JSON file written by --output.")
+    parser.add_argument("-t", "--threshold", dest="threshold", type=float, default=1.2, help="Ratio to the baseline above which a result is slower.")
+    options = parser.parse_args()
+
+    setup_django_environment()
+    # Logging every statement would be measured too.
+    for name in ("pg_partitioning.shortcuts", "pg_partitioning.patch.schema"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    from django.test.utils import setup_databases, teardown_databases
+
+    from benchmarks import bulk_ingest, partitioning
+
+    old_config = setup_databases(verbosity=1, interactive=False)
+    try:
+        results = list()
+        suites = options.suites or SUITES
+        if "bulk_ingest" in suites:
+            results += bulk_ingest.run(options.rows, options.repeat)
+        if "partitioning" in suites:
+            results += partitioning.run(options.rows, options.repeat, [int(count) for count in options.partitions.split(",")])
+        report = {"environment": environment(), "rows": options.rows, "repeat": options.repeat, "results": results}
+    finally:
+        teardown_databases(old_config, verbosity=1)
+
+    if options.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_results(results)
+        if options.output:
+            with open(options.output, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if options.compare:
+        with open(options.compare) as f:
+            regressions = compare(results, json.load(f), options.threshold, sys.stderr if options.output == "-" else sys.stdout)
+        sys.exit(1 if regressions else 0)
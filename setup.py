@@ -30,6 +30,9 @@ extra_dependencies = {
     "django": [
         "Django>=2.0,<3.0"
     ],
+    "zstd": [
+        "zstandard"
+    ],
 }
 
 extra_dependencies["all"] = list(set(sum(extra_dependencies.values(), [])))
@@ -69,7 +72,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/x-rst",
     url="https://github.com/chaitin/django-pg-partitioning",
-    packages=["pg_partitioning", "pg_partitioning.migrations", "pg_partitioning.patch"],
+    packages=["pg_partitioning", "pg_partitioning.management", "pg_partitioning.management.commands", "pg_partitioning.migrations", "pg_partitioning.patch"],
     include_package_data=True,
     install_requires=dependencies,
     extras_require=extra_dependencies,
@@ -2,8 +2,8 @@ from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 from django.utils import timezone
 
-from pg_partitioning.constants import PeriodType
-from pg_partitioning.decorators import ListPartitioning, TimeRangePartitioning
+from pg_partitioning.constants import PartitioningType, PeriodType
+from pg_partitioning.decorators import HashPartitioning, IntegerRangePartitioning, ListPartitioning, TimeRangePartitioning
 
 
 @TimeRangePartitioning(partition_key="timestamp", default_period=PeriodType.Month, default_attach_tablespace="data1", default_detach_tablespace="data2")
@@ -29,6 +29,43 @@ class TimeRangeTableB(models.Model):
         ordering = ["text"]
 
 
+@TimeRangePartitioning(partition_key="timestamp", default_period=PeriodType.Day, default_attach_tablespace="data1", default_partition=True)
+class TimeRangeDefaultTable(models.Model):
+    text = models.TextField()
+    timestamp = models.DateTimeField(default=timezone.now)
+
+
+@TimeRangePartitioning(
+    partition_key="timestamp",
+    default_period=PeriodType.Day,
+    default_attach_tablespace="data1",
+    default_detach_tablespace="data2",
+    subpartition_type=PartitioningType.List,
+    subpartition_key="tenant",
+    subpartition_values={"a": "A", "b": "B", "others": ["C", "D"]},
+)
+class TimeRangeTenantTable(models.Model):
+    tenant = models.TextField()
+    timestamp = models.DateTimeField(default=timezone.now)
+
+
+@IntegerRangePartitioning(partition_key="id", default_width=10, default_attach_tablespace="data1", default_detach_tablespace="data2")
+class IntegerRangeTable(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    text = models.TextField()
+
+
+@IntegerRangePartitioning(partition_key="id", default_width=10)
+class IntegerRangeTableInt(models.Model):
+    text = models.TextField()
+
+
+@HashPartitioning(partition_key="id", modulus=4, tablespace="data1")
+class HashTable(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    text = models.TextField()
+
+
 @ListPartitioning(partition_key="category")
 class ListTableText(models.Model):
     category = models.TextField(default="A", null=True, blank=True)
@@ -45,3 +82,9 @@ class ListTableInt(models.Model):
 class ListTableBool(models.Model):
     category = models.NullBooleanField(default=False, null=True)
     timestamp = models.DateTimeField(default=timezone.now)
+
+
+@ListPartitioning(partition_key="category", default_partition=True)
+class ListTableDefault(models.Model):
+    category = models.TextField(null=True)
+    timestamp = models.DateTimeField(default=timezone.now)
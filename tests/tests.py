@@ -1,17 +1,57 @@
 import datetime
-from unittest.mock import patch
+import importlib.util
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from io import StringIO
+from unittest.mock import Mock, patch
 
+import pytz
 from dateutil.relativedelta import MO, relativedelta
-from django.db import connection
-from django.test import TestCase
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.db.transaction import TransactionManagementError
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.utils import timezone
 from django.utils.crypto import get_random_string
+from psycopg2.extras import DateTimeTZRange, NumericRange
 
-from pg_partitioning.constants import SQL_GET_TABLE_INDEXES, PeriodType
-from pg_partitioning.models import PartitionConfig, PartitionLog
-from pg_partitioning.shortcuts import single_quote
+from pg_partitioning.constants import SQL_GET_TABLE_INDEXES, CompressionType, DriftType, PartitioningType, PeriodType, RetentionAction
+from pg_partitioning.instrumentation import MemoryCollector, PrometheusCollector, collect, parse_command, parse_tables, step
+from pg_partitioning.models import IntegerRangePartitionLog, PartitionConfig, PartitionLog
+from pg_partitioning.shortcuts import (
+    _advisory_lock_key,
+    copy_rows,
+    double_quote,
+    drop_table,
+    execute_sql,
+    file_checksum,
+    generate_set_indexes_tablespace_sql,
+    get_indexes,
+    get_partition_stats,
+    get_partitions,
+    lock_timeout,
+    single_quote,
+    try_advisory_lock,
+)
+from pg_partitioning.signals import post_attach_partition, post_attach_partitions, post_create_partitions, post_detach_partition, post_detach_partitions
 
-from .models import ListTableBool, ListTableInt, ListTableText, TimeRangeTableA, TimeRangeTableB
+from .models import (
+    HashTable,
+    IntegerRangeTable,
+    IntegerRangeTableInt,
+    ListTableBool,
+    ListTableDefault,
+    ListTableInt,
+    ListTableText,
+    TimeRangeDefaultTable,
+    TimeRangeTableA,
+    TimeRangeTableB,
+    TimeRangeTenantTable,
+)
 
 
 def t(year=2018, month=8, day=25, hour=7, minute=15, second=15, millisecond=0):
@@ -36,6 +76,19 @@ class GeneralTestCase(TestCase):
                 rows = cursor.fetchall()
                 self.assertEqual(tablespace, rows[0][0])
 
+    def assertAttachedWithoutScan(self, table_name, func, *args, **kwargs):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL client_min_messages = debug1")
+            del connection.connection.notices[:]
+            func(*args, **kwargs)
+            notices = list(connection.connection.notices)
+            cursor.execute("SET LOCAL client_min_messages = notice")
+            self.assertTrue(any(f'"{table_name}" is implied by existing constraints' in notice for notice in notices))
+
+            # The temporary constraint is dropped once the partition is attached.
+            cursor.execute(f"SELECT count(*) FROM pg_constraint WHERE conrelid = {single_quote(double_quote(table_name))}::regclass AND contype = 'c'")
+            self.assertEqual(0, cursor.fetchone()[0])
+
 
 class TimeRangePartitioningTestCase(GeneralTestCase):
     def assertTimeRangeEqual(self, model, time_start, time_end):
@@ -73,6 +126,55 @@ class TimeRangePartitioningTestCase(GeneralTestCase):
     def test_create_partition_year(self):
         self._create_partition(PeriodType.Year, t(2018, 1, 1, 0, 0, 0), relativedelta(years=1))
 
+    @patch("django.utils.timezone.now", new=t)
+    def test_create_partition_hour(self):
+        self._create_partition(PeriodType.Hour, t(2018, 8, 25, 7, 0, 0), relativedelta(hours=1))
+        self.assertEqual("tests_timerangetableb_20180825T0100Z_20180825T0200Z", TimeRangeTableB.partitioning.latest.table_name)
+
+    @patch("django.utils.timezone.now", new=t)
+    def test_create_partition_minutes(self):
+        self._create_partition(PeriodType.multiple(15, PeriodType.Minute), t(2018, 8, 25, 7, 15, 0), relativedelta(minutes=15))
+
+    @patch("django.utils.timezone.now", new=t)
+    def test_create_partition_hours(self):
+        self._create_partition(PeriodType.multiple(6, PeriodType.Hour), t(2018, 8, 25, 6, 0, 0), relativedelta(hours=6))
+
+    def test_period_type(self):
+        self.assertEqual((15, PeriodType.Minute), PeriodType.parse(PeriodType.multiple(15, PeriodType.Minute)))
+        self.assertEqual((1, PeriodType.Month), PeriodType.parse(PeriodType.Month))
+        self.assertRaises(ValueError, PeriodType.multiple, 2, PeriodType.Day)
+        self.assertRaises(ValueError, PeriodType.multiple, 0, PeriodType.Hour)
+
+    @override_settings(PARTITION_TIMEZONE="America/New_York")
+    def test_create_partition_hour_dst(self):
+        new_york = pytz.timezone("America/New_York")
+        TimeRangeTableB.partitioning.options["default_period"] = PeriodType.Hour
+
+        # Clocks are turned back from 2:00 EDT to 1:00 EST, 1:00 to 2:00 local time happens twice.
+        with patch("django.utils.timezone.now", return_value=new_york.localize(datetime.datetime(2018, 11, 4, 0, 30))):
+            TimeRangeTableB.partitioning.config
+            logs = [TimeRangeTableB.partitioning.latest] + TimeRangeTableB.partitioning.create_partitions(count=3)
+        self.assertListEqual([datetime.timedelta(hours=1)] * 4, [log.end - log.start for log in logs])
+        self.assertListEqual([4, 5, 6, 7], [log.start.astimezone(pytz.utc).hour for log in logs])
+        self.assertListEqual([0, 1, 1, 2], [log.start.astimezone(new_york).hour for log in logs])
+        self.assertEqual(4, len({log.table_name for log in logs}))
+        TimeRangeTableB.partitioning.delete_partition(logs)
+
+        # Clocks are turned forward from 2:00 EST to 3:00 EDT, the first partition is aligned in local time.
+        self._update_config_period(TimeRangeTableB.partitioning.config, PeriodType.multiple(2, PeriodType.Hour))
+        with patch("django.utils.timezone.now", return_value=new_york.localize(datetime.datetime(2018, 3, 11, 1, 30))):
+            logs = TimeRangeTableB.partitioning.create_partitions(count=2)
+        self.assertEqual(new_york.localize(datetime.datetime(2018, 3, 11, 0, 0)), logs[0].start)
+        self.assertListEqual([datetime.timedelta(hours=2)] * 2, [log.end - log.start for log in logs])
+        self.assertListEqual([0, 3], [log.start.astimezone(new_york).hour for log in logs])
+
+        # Sub-day partitions are detached after the interval of periods.
+        config_b = TimeRangeTableB.partitioning.config
+        config_b.interval = 1
+        with patch("django.utils.timezone.now", return_value=new_york.localize(datetime.datetime(2018, 3, 11, 6, 30))):
+            config_b.save()
+        self.assertListEqual([False, True], [log.is_attached for log in config_b.logs.order_by("start")])
+
     @classmethod
     def _update_config_period(cls, config: PartitionConfig, period: str):
         config.period = period
@@ -128,6 +230,50 @@ class TimeRangePartitioningTestCase(GeneralTestCase):
             TimeRangeTableA.partitioning.create_partition(5)
             self.assertTimeRangeEqual(TimeRangeTableA, t(2019, 3, 1, 0, 0, 0), t(2019, 4, 1, 0, 0, 0))
 
+    def test_create_partition_num_queries(self):
+        with patch("django.utils.timezone.now", new=t):
+            TimeRangeTableA.partitioning.config
+
+            # Lock the model, read the config and the latest log once, then six statements for each of the four new partitions.
+            with self.assertNumQueries(4 + 6 * 4 + 1):
+                TimeRangeTableA.partitioning.create_partition(120)
+            self.assertTimeRangeEqual(TimeRangeTableA, t(2018, 12, 1, 0, 0, 0), t(2019, 1, 1, 0, 0, 0))
+
+    def test_create_partitions(self):
+        TimeRangeTableB.partitioning.options["default_period"] = PeriodType.Day
+
+        with patch("django.utils.timezone.now", new=t):
+            self.assertRaises(ValueError, TimeRangeTableB.partitioning.create_partitions)
+            config_b = TimeRangeTableB.partitioning.config  # Create first partition by side effect.
+
+            receiver = Mock()
+            post_create_partitions.connect(receiver)
+            try:
+                logs = TimeRangeTableB.partitioning.create_partitions(count=3)
+            finally:
+                post_create_partitions.disconnect(receiver)
+            self.assertEqual(3, len(logs))
+            self.assertEqual(1, receiver.call_count)
+            self.assertListEqual(logs, receiver.call_args[1]["partition_logs"])
+            self.assertTimeRangeEqual(TimeRangeTableB, t(2018, 8, 28, 0, 0, 0), t(2018, 8, 29, 0, 0, 0))
+            self.assertTablespace(TimeRangeTableB.partitioning.latest.table_name, "data2")
+            self.assertListEqual([log.pk for log in logs], list(config_b.logs.filter(start__gt=t()).order_by("start").values_list("pk", flat=True)))
+
+            self.assertListEqual([], TimeRangeTableB.partitioning.create_partitions(until=t(2018, 8, 28, 23, 0, 0)))
+            self.assertEqual(33, len(TimeRangeTableB.partitioning.create_partitions(until=t(2018, 9, 30, 0, 0, 0))))
+            self.assertTimeRangeEqual(TimeRangeTableB, t(2018, 9, 30, 0, 0, 0), t(2018, 10, 1, 0, 0, 0))
+            self.assertEqual(2, len(TimeRangeTableB.partitioning.create_partitions(until=t(2018, 12, 1, 0, 0, 0), count=2)))
+            self.assertTimeRangeEqual(TimeRangeTableB, t(2018, 10, 2, 0, 0, 0), t(2018, 10, 3, 0, 0, 0))
+
+    def test_create_partitions_num_queries(self):
+        with patch("django.utils.timezone.now", new=t):
+            TimeRangeTableA.partitioning.config
+
+            # The number of batches does not depend on the number of partitions, the indexes are looked up with one query.
+            with self.assertNumQueries(9):
+                TimeRangeTableA.partitioning.create_partitions(count=12)
+            self.assertTimeRangeEqual(TimeRangeTableA, t(2019, 8, 1, 0, 0, 0), t(2019, 9, 1, 0, 0, 0))
+
     def test_attach_or_detach_partition(self):
         self.test_create_partition()
 
@@ -174,6 +320,57 @@ class TimeRangePartitioningTestCase(GeneralTestCase):
             log.refresh_from_db()
             self.assertEqual(False, log.is_attached)
 
+    def test_bulk_attach_or_detach_partition(self):
+        with patch("django.utils.timezone.now", new=t):
+            TimeRangeTableA.partitioning.create_partitions(count=5)
+        config_a: PartitionConfig = TimeRangeTableA.partitioning.config
+        logs = list(config_a.logs.all())
+        self.assertEqual(6, len(logs))
+
+        receiver, log_receiver = Mock(), Mock()
+        post_detach_partitions.connect(receiver)
+        post_detach_partition.connect(log_receiver)
+        try:
+            # Lock the model and the logs once, look up the indexes of all partitions, then one update and one batch.
+            with self.assertNumQueries(8):
+                TimeRangeTableA.partitioning.detach_partition(logs)
+            TimeRangeTableA.partitioning.detach_partition(logs)
+        finally:
+            post_detach_partitions.disconnect(receiver)
+            post_detach_partition.disconnect(log_receiver)
+        self.assertEqual(1, receiver.call_count)
+        self.assertEqual(6, len(receiver.call_args[1]["partition_logs"]))
+        self.assertEqual(6, log_receiver.call_count)
+        self.assertSetEqual({log.pk for log in logs}, {call[1]["partition_log"].pk for call in log_receiver.call_args_list})
+        self.assertTrue(all(not log.is_attached for log in logs))
+        self.assertEqual(0, config_a.logs.filter(is_attached=True).count())
+        for log in logs:
+            self.assertTablespace(log.table_name, "data2")
+
+        receiver, log_receiver = Mock(), Mock()
+        post_attach_partitions.connect(receiver)
+        post_attach_partition.connect(log_receiver)
+        try:
+            TimeRangeTableA.partitioning.attach_partition(detach_time=t(2019, 1, 1, 0, 0, 0))
+        finally:
+            post_attach_partitions.disconnect(receiver)
+            post_attach_partition.disconnect(log_receiver)
+        self.assertEqual(1, receiver.call_count)
+        self.assertEqual(6, log_receiver.call_count)
+        self.assertEqual(0, config_a.logs.exclude(is_attached=True, detach_time=t(2019, 1, 1, 0, 0, 0)).count())
+        for log in logs:
+            self.assertTablespace(log.table_name, "data1")
+        self.assertTimeRangeEqual(TimeRangeTableA, t(2019, 1, 1, 0, 0, 0), t(2019, 2, 1, 0, 0, 0))
+
+    def test_attach_partition_without_scan(self):
+        TimeRangeTableA.partitioning.create_partition()
+        log: PartitionLog = TimeRangeTableA.partitioning.latest
+        TimeRangeTableA.objects.create(text="A", timestamp=log.start)
+        TimeRangeTableA.partitioning.detach_partition([log])
+
+        self.assertAttachedWithoutScan(log.table_name, TimeRangeTableA.partitioning.attach_partition, [log])
+        self.assertEqual(1, TimeRangeTableA.objects.count())
+
     def test_delete_partition(self):
         for _ in range(4):
             TimeRangeTableA.partitioning.create_partition(0)
@@ -206,6 +403,1047 @@ class TimeRangePartitioningTestCase(GeneralTestCase):
         self.assertEqual(True, log.is_attached)
         self.assertTablespace(log.table_name, log.config.attach_tablespace)
 
+    def test_get_indexes(self):
+        TimeRangeTableA.partitioning.create_partition()
+        log = TimeRangeTableA.partitioning.latest
+        # A same-named table in another schema is ignored.
+        execute_sql(["CREATE SCHEMA other", f'CREATE TABLE other."{log.table_name}" (id int PRIMARY KEY)'])
+        indexes = get_indexes([log.table_name, "missing_table"])
+        self.assertListEqual([log.table_name], list(indexes))
+        self.assertListEqual(
+            [(f'"{log.table_name}_text_timestamp_key"', "data1"), (f'"{log.table_name}_timestamp_idx"', "data1")], sorted(indexes[log.table_name])
+        )
+        # Indexes already in the tablespace are not moved.
+        self.assertListEqual([], generate_set_indexes_tablespace_sql(log.table_name, "data1", indexes))
+        self.assertEqual(2, len(generate_set_indexes_tablespace_sql(log.table_name, "data2", indexes)))
+        # The default tablespace used while creating partitions is restored.
+        self.assertEqual("", execute_sql("SHOW default_tablespace", fetch=True)[0][0])
+
+
+class SubPartitioningTestCase(GeneralTestCase):
+    def test_create_partition(self):
+        with patch("django.utils.timezone.now", new=t):
+            log: PartitionLog = TimeRangeTenantTable.partitioning.latest
+            TimeRangeTenantTable.partitioning.create_partitions(count=2)
+
+        self.assertListEqual(
+            [f"{log.table_name}_{suffix}" for suffix in ("a", "b", "others")], [table_name for table_name, _ in get_partitions(log.table_name)]
+        )
+        for table_name in log._get_table_names():
+            self.assertTablespace(table_name, "data1")
+        for tenant in ("A", "B", "C", "D"):
+            TimeRangeTenantTable.objects.create(tenant=tenant, timestamp=t())
+        self.assertEqual(1, execute_sql(f"SELECT count(*) FROM {double_quote(log.table_name + '_b')}", fetch=True)[0][0])
+        self.assertEqual(2, execute_sql(f"SELECT count(*) FROM {double_quote(log.table_name + '_others')}", fetch=True)[0][0])
+        self.assertEqual(1, TimeRangeTenantTable.objects.filter(tenant="A", timestamp__gte=log.start, timestamp__lt=log.end).count())
+
+    def test_attach_or_detach_partition(self):
+        with patch("django.utils.timezone.now", new=t):
+            log: PartitionLog = TimeRangeTenantTable.partitioning.latest
+        TimeRangeTenantTable.objects.create(tenant="A", timestamp=t())
+
+        TimeRangeTenantTable.partitioning.detach_partition([log])
+        for table_name in log._get_table_names():
+            self.assertTablespace(table_name, "data2")
+        self.assertEqual(0, TimeRangeTenantTable.objects.count())
+
+        self.assertAttachedWithoutScan(log.table_name, TimeRangeTenantTable.partitioning.attach_partition, [log])
+        for table_name in log._get_table_names():
+            self.assertTablespace(table_name, "data1")
+        self.assertEqual(1, TimeRangeTenantTable.objects.count())
+
+        TimeRangeTenantTable.partitioning.delete_partition([log])
+        self.assertEqual((None,), execute_sql(f"SELECT to_regclass({single_quote(double_quote(log.table_name + '_a'))})", fetch=True)[0])
+
+    def test_hash_subpartitions(self):
+        options = {"subpartition_type": PartitioningType.Hash, "subpartition_key": "tenant", "subpartition_modulus": 3}
+        with patch.dict(TimeRangeTenantTable.partitioning.options, options), patch("django.utils.timezone.now", new=t):
+            log: PartitionLog = TimeRangeTenantTable.partitioning.latest
+            self.assertListEqual([f"{log.table_name}_3_{i}" for i in range(3)], [table_name for table_name, _ in get_partitions(log.table_name)])
+            TimeRangeTenantTable.objects.bulk_create([TimeRangeTenantTable(tenant=str(i), timestamp=t()) for i in range(30)])
+            self.assertEqual(30, TimeRangeTenantTable.objects.count())
+
+
+class SplitMergeTestCase(GeneralTestCase):
+    def test_time_range(self):
+        with patch("django.utils.timezone.now", new=t):
+            log: PartitionLog = TimeRangeTableA.partitioning.latest
+        for day in (1, 15, 31):
+            TimeRangeTableA.objects.create(text=str(day), timestamp=t(day=day))
+
+        with self.assertRaises(ValueError):
+            TimeRangeTableA.partitioning.split_partition(log, PeriodType.Month)
+        logs = TimeRangeTableA.partitioning.split_partition(log, PeriodType.Day, batch_size=1)
+        self.assertEqual(31, len(logs))
+        self.assertEqual("tests_timerangetablea_2018-08-01_2018-08-02", logs[0].table_name)
+        self.assertEqual(31, TimeRangeTableA.partitioning.config.logs.filter(is_attached=True).count())
+        self.assertEqual(1, execute_sql(f"SELECT count(*) FROM {double_quote(logs[14].table_name)}", fetch=True)[0][0])
+        self.assertEqual(3, TimeRangeTableA.objects.count())
+        self.assertEqual(logs[-1], TimeRangeTableA.partitioning.latest)
+        self.assertTablespace(logs[0].table_name, "data1")
+        self.assertIsNone(execute_sql(f"SELECT to_regclass({single_quote(log.table_name)})", fetch=True)[0][0])
+
+        with self.assertRaises(ValueError):
+            TimeRangeTableA.partitioning.merge_partitions([logs[0], logs[2]])
+        merged = TimeRangeTableA.partitioning.merge_partitions(logs)
+        self.assertEqual(log.table_name, merged.table_name)
+        self.assertTrue(merged.is_attached)
+        self.assertListEqual([merged], list(TimeRangeTableA.partitioning.config.logs.all()))
+        self.assertEqual(3, TimeRangeTableA.objects.count())
+
+    def test_subpartitions(self):
+        with patch("django.utils.timezone.now", new=t):
+            log: PartitionLog = TimeRangeTenantTable.partitioning.latest
+        for tenant in ("A", "B", "C"):
+            TimeRangeTenantTable.objects.create(tenant=tenant, timestamp=t())
+
+        logs = TimeRangeTenantTable.partitioning.split_partition(log, PeriodType.multiple(6, PeriodType.Hour))
+        self.assertEqual(4, len(logs))
+        self.assertEqual(3, len(get_partitions(logs[1].table_name)))
+        self.assertEqual(3, TimeRangeTenantTable.objects.filter(timestamp__gte=logs[1].start, timestamp__lt=logs[1].end).count())
+
+    def test_integer_range(self):
+        IntegerRangeTable.partitioning.create_partitions(count=3)
+        IntegerRangeTable.objects.bulk_create([IntegerRangeTable(id=i, text=str(i)) for i in range(1, 30)])
+        config = IntegerRangeTable.partitioning.config
+        IntegerRangeTable.partitioning.detach_partition(config.integer_logs.filter(start=10))
+
+        with self.assertRaises(ValueError):
+            IntegerRangeTable.partitioning.split_partition(config.integer_logs.get(start=0), 3)
+        logs = IntegerRangeTable.partitioning.split_partition(config.integer_logs.get(start=10), 5)
+        self.assertListEqual(["tests_integerrangetable_10_15", "tests_integerrangetable_15_20"], [log.table_name for log in logs])
+        self.assertFalse(any(log.is_attached for log in logs))
+        self.assertTablespace(logs[0].table_name, "data2")
+        self.assertEqual(19, IntegerRangeTable.objects.count())
+
+        with self.assertRaises(ValueError):
+            IntegerRangeTable.partitioning.merge_partitions(config.integer_logs.filter(start__in=[0, 10]))
+        merged = IntegerRangeTable.partitioning.merge_partitions(logs)
+        self.assertFalse(merged.is_attached)
+        self.assertEqual(10, execute_sql(f"SELECT count(*) FROM {double_quote(merged.table_name)}", fetch=True)[0][0])
+
+        IntegerRangeTable.partitioning.split_partition(config.integer_logs.get(start=0), 5)
+        self.assertListEqual([0, 5, 10, 20, 30], list(config.integer_logs.order_by("start").values_list("start", flat=True)))
+        self.assertEqual(19, IntegerRangeTable.objects.count())
+
+
+class StatsTestCase(GeneralTestCase):
+    def test_stats(self):
+        IntegerRangeTable.partitioning.create_partitions(count=2)
+        IntegerRangeTable.objects.bulk_create([IntegerRangeTable(id=i, text=str(i)) for i in range(1, 26)])
+        IntegerRangeTable.objects.filter(id__lt=5).delete()
+        execute_sql("ANALYZE tests_integerrangetable")
+
+        with self.assertNumQueries(1):
+            stats = IntegerRangeTable.partitioning.stats()
+        self.assertListEqual([f"tests_integerrangetable_{start}_{start + 10}" for start in (0, 10, 20)], [s.table_name for s in stats])
+        self.assertEqual("FOR VALUES FROM ('0') TO ('10')", stats[0].bound)
+        self.assertEqual("data1", stats[0].tablespace)
+        self.assertListEqual([5, 10, 6], [s.row_estimate for s in stats])
+        self.assertEqual(stats[0].total_size, stats[0].table_size + stats[0].indexes_size)
+        self.assertGreater(stats[0].indexes_size, 0)
+
+    def test_subpartitions(self):
+        with patch("django.utils.timezone.now", new=t):
+            log: PartitionLog = TimeRangeTenantTable.partitioning.latest
+        for tenant in ("A", "B", "C", "D"):
+            TimeRangeTenantTable.objects.create(tenant=tenant, timestamp=t())
+        execute_sql("ANALYZE tests_timerangetenanttable")
+
+        stats = TimeRangeTenantTable.partitioning.stats()
+        self.assertListEqual([log.table_name], [s.table_name for s in stats])
+        self.assertEqual(4, stats[0].row_estimate)
+        self.assertEqual(sum(s.total_size for s in get_partition_stats(log.table_name)), stats[0].total_size)
+
+
+class ReconcileTestCase(GeneralTestCase):
+    def setUp(self):
+        IntegerRangeTable.partitioning.create_partitions(count=4)
+        logs = IntegerRangeTable.partitioning.config.integer_logs
+        IntegerRangeTable.partitioning.detach_partition(logs.filter(start__in=[20, 40]))
+        execute_sql(
+            [
+                "DROP TABLE tests_integerrangetable_10_20",
+                "ALTER TABLE tests_integerrangetable ATTACH PARTITION tests_integerrangetable_20_30 FOR VALUES FROM (20) TO (30)",
+                "ALTER TABLE tests_integerrangetable_30_40 SET TABLESPACE data2",
+                "DROP TABLE tests_integerrangetable_40_50",
+                "CREATE TABLE tests_integerrangetable_50_60 PARTITION OF tests_integerrangetable FOR VALUES FROM (50) TO (60)",
+            ]
+        )
+        self.expected = [
+            ("tests_integerrangetable_10_20", DriftType.Missing),
+            ("tests_integerrangetable_20_30", DriftType.WronglyAttached),
+            ("tests_integerrangetable_30_40", DriftType.WrongTablespace),
+            ("tests_integerrangetable_40_50", DriftType.Missing),
+            ("tests_integerrangetable_50_60", DriftType.Orphaned),
+            ("tests_integerrangetable_50_60", DriftType.WrongTablespace),
+        ]
+
+    def test_reconcile(self):
+        self.assertListEqual(self.expected, [drift[:2] for drift in IntegerRangeTable.partitioning.reconcile(dry_run=True)])
+        self.assertEqual(5, IntegerRangeTable.partitioning.config.integer_logs.count())
+
+        self.assertListEqual(self.expected, [drift[:2] for drift in IntegerRangeTable.partitioning.reconcile()])
+        self.assertListEqual([], IntegerRangeTable.partitioning.reconcile())
+        self.assertListEqual(
+            [(0, True), (10, True), (20, False), (30, True), (50, True)],
+            list(IntegerRangeTable.partitioning.config.integer_logs.order_by("start").values_list("start", "is_attached")),
+        )
+        self.assertListEqual(
+            ["tests_integerrangetable_0_10", "tests_integerrangetable_10_20", "tests_integerrangetable_30_40", "tests_integerrangetable_50_60"],
+            [table_name for table_name, _ in get_partitions("tests_integerrangetable")],
+        )
+        self.assertTablespace("tests_integerrangetable_30_40", "data1")
+        self.assertTablespace("tests_integerrangetable_20_30", "data2")
+
+    def test_int4_key(self):
+        # The bounds of int4 keys are not quoted in the system catalogs.
+        IntegerRangeTableInt.partitioning.create_partitions(count=2)
+        self.assertListEqual([], IntegerRangeTableInt.partitioning.reconcile(dry_run=True))
+        execute_sql(
+            [
+                "CREATE TABLE tests_integerrangetableint_m10_0 PARTITION OF tests_integerrangetableint FOR VALUES FROM (-10) TO (0)",
+                "CREATE TABLE tests_integerrangetableint_min PARTITION OF tests_integerrangetableint FOR VALUES FROM (MINVALUE) TO (-10)",
+            ]
+        )
+        drifts = IntegerRangeTableInt.partitioning.reconcile()
+        expected = [("tests_integerrangetableint_m10_0", DriftType.Orphaned), ("tests_integerrangetableint_min", DriftType.Orphaned)]
+        self.assertListEqual(expected, [drift[:2] for drift in drifts])
+        # An unbounded partition can't be adopted.
+        self.assertListEqual([-10, 0, 10, 20], list(IntegerRangeTableInt.partitioning.config.integer_logs.order_by("start").values_list("start", flat=True)))
+        self.assertListEqual(expected[1:], [drift[:2] for drift in IntegerRangeTableInt.partitioning.reconcile()])
+
+    def test_command(self):
+        out = StringIO()
+        call_command("partition_reconcile", "tests.IntegerRangeTable", dry_run=True, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual("tests.IntegerRangeTable: missing tests_integerrangetable_10_20", lines[0])
+        self.assertTrue(lines[1].startswith("    CREATE TABLE IF NOT EXISTS"))
+
+        call_command("partition_reconcile", stdout=StringIO())
+        self.assertListEqual([], IntegerRangeTable.partitioning.reconcile(dry_run=True))
+
+
+class RetentionTestCase(GeneralTestCase):
+    def setUp(self):
+        IntegerRangeTable.partitioning.create_partitions(count=4)
+        IntegerRangeTable.objects.bulk_create([IntegerRangeTable(id=i, text=str(i)) for i in range(1, 46)])
+        self.config = IntegerRangeTable.partitioning.config
+
+    def test_max_partitions(self):
+        self.assertTupleEqual(([], []), IntegerRangeTable.partitioning.apply_retention())
+        self.config.max_partitions = 3
+        self.config.save()
+        detached, removed = IntegerRangeTable.partitioning.apply_retention()
+        self.assertListEqual([0, 10], [log.start for log in detached])
+        self.assertListEqual([], removed)
+        self.assertListEqual([20, 30, 40], list(self.config.integer_logs.filter(is_attached=True).order_by("start").values_list("start", flat=True)))
+
+    def test_drop_after(self):
+        self.config.interval = 1
+        self.config.drop_after = 1
+        self.config.save()
+        # The sizes are read in one query, the partitions are dropped in one batch and their logs deleted in one query.
+        with self.assertNumQueries(9):
+            detached, removed = IntegerRangeTable.partitioning.apply_retention()
+        self.assertListEqual([0, 10], [log.start for log in removed])
+        self.assertListEqual([20, 30, 40], list(self.config.integer_logs.order_by("start").values_list("start", flat=True)))
+        self.assertIsNone(execute_sql("SELECT to_regclass('tests_integerrangetable_0_10')", fetch=True)[0][0])
+
+    def test_max_size(self):
+        self.config.max_size = 10 ** 9
+        self.config.save()
+        self.assertTupleEqual(([], []), IntegerRangeTable.partitioning.apply_retention())
+
+        self.config.max_size = 1
+        self.config.retention_action = RetentionAction.Truncate
+        self.config.save()
+        detached, removed = IntegerRangeTable.partitioning.apply_retention()
+        self.assertListEqual([0, 10, 20, 30], [log.start for log in removed])
+        self.assertEqual(5, self.config.integer_logs.filter(is_attached=True).count())
+        self.assertListEqual(list(range(40, 46)), list(IntegerRangeTable.objects.order_by("id").values_list("id", flat=True)))
+        # Truncated partitions are not removed again.
+        self.assertTupleEqual(([], []), IntegerRangeTable.partitioning.apply_retention())
+
+    @patch("django.utils.timezone.now", new=t)
+    def test_max_size_current_partition(self):
+        TimeRangeTableB.partitioning.options["default_period"] = PeriodType.Month
+        config = TimeRangeTableB.partitioning.config
+        TimeRangeTableB.partitioning.create_partition(0)
+        TimeRangeTableB.objects.bulk_create([TimeRangeTableB(text=str(i), timestamp=t()) for i in range(200)])
+        config.max_size = 1
+        config.save()
+        # The current partition alone is over the limit, but it still receives the rows.
+        self.assertTupleEqual(([], []), TimeRangeTableB.partitioning.apply_retention())
+        self.assertListEqual([t(2018, 8, 1, 0, 0, 0), t(2018, 9, 1, 0, 0, 0)], [tz(log.start) for log in config.logs.order_by("start")])
+        TimeRangeTableB.objects.create(text="new", timestamp=t())
+
+
+class DefaultPartitionTestCase(GeneralTestCase):
+    @classmethod
+    def count(cls, table_name):
+        return execute_sql(f"SELECT count(*) FROM {double_quote(table_name)}", fetch=True)[0][0]
+
+    def test_drain_time_range(self):
+        default = TimeRangeDefaultTable.partitioning.default_partition_table_name
+        with patch("django.utils.timezone.now", new=t):
+            TimeRangeDefaultTable.partitioning.create_partition()
+            self.assertTimeRangeEqual(t(2018, 8, 26, 0, 0, 0), t(2018, 8, 27, 0, 0, 0))
+
+            # Rows beyond the latest partition are kept by the default partition.
+            for day in (28, 28, 28, 30):
+                TimeRangeDefaultTable.objects.create(text="A", timestamp=t(day=day))
+            TimeRangeDefaultTable.objects.create(text="B", timestamp=t())
+            self.assertEqual(4, self.count(default))
+
+            receiver = Mock()
+            post_create_partitions.connect(receiver)
+            try:
+                self.assertAttachedWithoutScan(default, TimeRangeDefaultTable.partitioning.drain_default_partition, batch_size=2)
+            finally:
+                post_create_partitions.disconnect(receiver)
+
+        logs = receiver.call_args[1]["partition_logs"]
+        self.assertListEqual([t(2018, 8, day, 0, 0, 0) for day in (27, 28, 29, 30)], [tz(log.start) for log in logs])
+        self.assertTimeRangeEqual(t(2018, 8, 30, 0, 0, 0), t(2018, 8, 31, 0, 0, 0))
+        self.assertEqual(0, self.count(default))
+        self.assertEqual(3, self.count(logs[1].table_name))
+        self.assertEqual(5, TimeRangeDefaultTable.objects.count())
+        for log in logs:
+            self.assertTablespace(log.table_name, "data1")
+        self.assertListEqual([], TimeRangeDefaultTable.partitioning.drain_default_partition())
+
+    def assertTimeRangeEqual(self, time_start, time_end):
+        latest = TimeRangeDefaultTable.partitioning.latest
+        self.assertListEqual([time_start, time_end], [tz(latest.start), tz(latest.end)])
+
+    def test_attach_partition(self):
+        TimeRangeDefaultTable.partitioning.create_partition()
+        log: PartitionLog = TimeRangeDefaultTable.partitioning.latest
+        TimeRangeDefaultTable.partitioning.detach_partition([log])
+        self.assertAttachedWithoutScan(
+            TimeRangeDefaultTable.partitioning.default_partition_table_name, TimeRangeDefaultTable.partitioning.attach_partition, [log]
+        )
+
+    def test_drain_list(self):
+        default = ListTableDefault.partitioning.default_partition_table_name
+        ListTableDefault.partitioning.create_partition("list_table_default_a", "A")
+        for category in ("A", "B", "B", "C", None):
+            ListTableDefault.objects.create(category=category)
+        self.assertEqual(4, self.count(default))
+
+        partition_names = ListTableDefault.partitioning.drain_default_partition(lambda value: f"list_table_default_{value}".lower(), "data1", batch_size=1)
+        self.assertListEqual(["list_table_default_b", "list_table_default_c", "list_table_default_none"], sorted(partition_names))
+        self.assertEqual(0, self.count(default))
+        self.assertEqual(2, self.count("list_table_default_b"))
+        self.assertEqual(1, self.count("list_table_default_none"))
+        self.assertEqual(5, ListTableDefault.objects.count())
+        self.assertTablespace("list_table_default_c", "data1")
+        ListTableDefault.objects.create(category="C")
+        self.assertEqual(2, self.count("list_table_default_c"))
+
+
+class BulkIngestTestCase(GeneralTestCase):
+    @classmethod
+    def count(cls, table_name):
+        return execute_sql(f"SELECT count(*) FROM {double_quote(table_name)}", fetch=True)[0][0]
+
+    def test_time_range(self):
+        texts = ["tab\there", "new\nline", "back\\slash", "quote'", "\\N"]
+        with patch("django.utils.timezone.now", new=t):
+            rows = [TimeRangeTableB(text=text, timestamp=t(day=25 + i)) for i, text in enumerate(texts)]
+            self.assertEqual(5, TimeRangeTableB.partitioning.bulk_ingest(rows))
+
+        config = TimeRangeTableB.partitioning.config
+        self.assertEqual(t(2018, 8, 29, 0, 0, 0), tz(TimeRangeTableB.partitioning.latest.start))
+        for log in config.logs.all():
+            self.assertEqual(1, self.count(log.table_name))
+        self.assertListEqual(sorted(texts), list(TimeRangeTableB.objects.order_by("text").values_list("text", flat=True)))
+        self.assertEqual(0, TimeRangeTableB.partitioning.bulk_ingest([]))
+
+        # Rows before the first partition have no partition.
+        with self.assertRaises(ValueError):
+            TimeRangeTableB.partitioning.bulk_ingest([TimeRangeTableB(text="A", timestamp=t(day=1))])
+
+    def test_default_partition(self):
+        with patch("django.utils.timezone.now", new=t):
+            TimeRangeDefaultTable.partitioning.create_partition()
+            TimeRangeDefaultTable.partitioning.bulk_ingest(
+                [TimeRangeDefaultTable(text="A", timestamp=t(day=1)), TimeRangeDefaultTable(text="B", timestamp=t())]
+            )
+        self.assertEqual(1, self.count(TimeRangeDefaultTable.partitioning.default_partition_table_name))
+        self.assertEqual(2, TimeRangeDefaultTable.objects.count())
+
+    def test_integer_range(self):
+        rows = [IntegerRangeTable(id=i, text=str(i)) for i in (1, 9, 10, 35)]
+        IntegerRangeTable.partitioning.bulk_ingest(rows)
+        config = IntegerRangeTable.partitioning.config
+        self.assertListEqual([2, 1, 0, 1], [self.count(log.table_name) for log in config.integer_logs.order_by("start")])
+        self.assertEqual("35", IntegerRangeTable.objects.get(id=35).text)
+
+        # PostgreSQL 11 has no pending detaches to filter out.
+        with patch.object(connection, "pg_version", 110000):
+            IntegerRangeTable.partitioning.bulk_ingest([IntegerRangeTable(id=2, text="2")])
+        self.assertEqual(3, self.count(config.integer_logs.order_by("start").first().table_name))
+
+    def test_list(self):
+        ListTableText.partitioning.create_partition("list_table_text_a", "A")
+        ListTableText.partitioning.create_partition("list_table_text_none", None)
+        ListTableText.partitioning.create_partition("list_table_text_quote", "it's")
+        rows = [ListTableText(category=category) for category in ("A", None, "it's", "A")]
+        ListTableText.partitioning.bulk_ingest(rows)
+        self.assertListEqual([2, 1, 1], [self.count(f"list_table_text_{name}") for name in ("a", "none", "quote")])
+
+        with self.assertRaises(ValueError):
+            ListTableText.partitioning.bulk_ingest([ListTableText(category="B")])
+        ListTableText.partitioning.bulk_ingest([ListTableText(category="B")], lambda value: f"list_table_text_{value}".lower(), "data1")
+        self.assertEqual(1, self.count("list_table_text_b"))
+        self.assertTablespace("list_table_text_b", "data1")
+
+        ListTableInt.partitioning.create_partition("list_table_int_minus", -1)
+        ListTableInt.partitioning.bulk_ingest([ListTableInt(category=-1)])
+        self.assertEqual(1, self.count("list_table_int_minus"))
+        ListTableBool.partitioning.create_partition("list_table_bool_true", True)
+        ListTableBool.partitioning.bulk_ingest([ListTableBool(category=True)])
+        self.assertEqual(1, self.count("list_table_bool_true"))
+
+        ListTableDefault.partitioning.bulk_ingest([ListTableDefault(category="A")])
+        self.assertEqual(1, self.count(ListTableDefault.partitioning.default_partition_table_name))
+
+    def test_detached_partition(self):
+        # A partition detached after the rows were grouped is not written to.
+        with patch("django.utils.timezone.now", new=t):
+            TimeRangeDefaultTable.partitioning.create_partition()
+        log = TimeRangeDefaultTable.partitioning.latest
+        TimeRangeDefaultTable.partitioning.detach_partition([log])
+        with transaction.atomic():
+            TimeRangeDefaultTable.partitioning._copy_to_partitions({log.table_name: [TimeRangeDefaultTable(text="A", timestamp=log.start)]})
+        self.assertEqual(0, self.count(log.table_name))
+        self.assertEqual(1, self.count(TimeRangeDefaultTable.partitioning.default_partition_table_name))
+
+        IntegerRangeTable.partitioning.create_partitions(count=1)
+        log = IntegerRangeTable.partitioning.latest
+        IntegerRangeTable.partitioning.detach_partition([log])
+        with self.assertRaises(ValueError), transaction.atomic():
+            IntegerRangeTable.partitioning._copy_to_partitions({log.table_name: [IntegerRangeTable(id=log.start, text="A")]})
+
+    def test_copy_rows(self):
+        columns = {"integers": "int[]", "texts": "text[]", "matrix": "int[][]", "duration": "interval", "span": "int4range", "period": "tstzrange"}
+        execute_sql("CREATE TEMPORARY TABLE copy_rows (%s)" % ", ".join(f"{name} {type}" for name, type in columns.items()))
+        row = [
+            [1, None, 3],
+            ['quote"', "back\\slash", "comma,", "tab\t", "", None],
+            [[1, 2], [3, 4]],
+            datetime.timedelta(days=-1, seconds=5, microseconds=12),
+            NumericRange(1, 10),
+            DateTimeTZRange(None, t(), "()"),
+        ]
+        copy_rows("copy_rows", list(columns), [row, [None] * len(columns)])
+        rows = execute_sql("SELECT * FROM copy_rows", fetch=True)
+        self.assertListEqual(row, list(rows[0]))
+        self.assertListEqual([None] * len(columns), list(rows[1]))
+        self.assertListEqual([NumericRange(empty=True)], [execute_sql("SELECT 'empty'::int4range", fetch=True)[0][0]])
+
+        with self.assertRaises(TypeError):
+            copy_rows("copy_rows", ["integers"], [[{1, 2}]])
+
+
+class QueryTestCase(GeneralTestCase):
+    def test_between(self):
+        with patch("django.utils.timezone.now", new=t):
+            TimeRangeTableB.partitioning.create_partitions(count=2)
+            TimeRangeTableB.objects.bulk_create([TimeRangeTableB(text=str(day), timestamp=t(day=day)) for day in (25, 26, 27)])
+        log = TimeRangeTableB.partitioning.config.logs.get(start=t(day=26, hour=0, minute=0, second=0))
+
+        for literal in (False, True):
+            queryset = TimeRangeTableB.partitioning.between(log.start, log.end, literal=literal)
+            self.assertListEqual(["26"], [obj.text for obj in queryset])
+            plan = queryset.explain()
+            self.assertIn(log.table_name, plan)
+            self.assertNotIn(TimeRangeTableB.partitioning.latest.table_name, plan)
+        self.assertEqual((), TimeRangeTableB.partitioning.between(log.start, log.end, literal=True).query.sql_with_params()[1])
+        self.assertEqual(2, TimeRangeTableB.partitioning.between(t(day=26), t(day=28)).count())
+
+    def test_direct(self):
+        IntegerRangeTable.partitioning.create_partitions(count=2)
+        IntegerRangeTable.objects.bulk_create([IntegerRangeTable(id=i, text=str(i)) for i in (5, 15, 25)])
+        queryset = IntegerRangeTable.partitioning.between(10, 20, literal=True, direct=True)
+        self.assertEqual("tests_integerrangetable_10_20", queryset.model._meta.db_table)
+        self.assertListEqual(["15"], [obj.text for obj in queryset])
+        self.assertIs(queryset.model, IntegerRangeTable.partitioning.get_partition_model("tests_integerrangetable_10_20"))
+
+        # A range across partitions is read from the parent table.
+        queryset = IntegerRangeTable.partitioning.between(5, 20, direct=True)
+        self.assertIs(IntegerRangeTable, queryset.model)
+        self.assertEqual(2, queryset.count())
+
+        model = IntegerRangeTable.partitioning.get_partition_model("tests_integerrangetable_20_30")
+        model.objects.filter(id=25).update(text="A")
+        self.assertEqual("A", IntegerRangeTable.objects.get(id=25).text)
+
+
+class InstrumentationTestCase(GeneralTestCase):
+    def test_parse(self):
+        statements = [
+            "SET lock_timeout = 100",
+            'ALTER TABLE IF EXISTS "a" ATTACH PARTITION "b""c" FOR VALUES FROM (0) TO (10)',
+            "CREATE UNIQUE INDEX i ON d (id)",
+            "CREATE TABLE IF NOT EXISTS e PARTITION OF a DEFAULT",
+        ]
+        self.assertEqual(("a", 'b"c', "e"), parse_tables(statements))
+        self.assertEqual("ALTER TABLE", parse_command(statements))
+        self.assertEqual("CREATE INDEX", parse_command(statements[2:3]))
+        self.assertEqual("SET", parse_command(statements[:1]))
+
+    def test_collect(self):
+        memory, prometheus = MemoryCollector(), PrometheusCollector()
+        with collect(memory), collect(prometheus):
+            with step("create"):
+                IntegerRangeTable.partitioning.create_partition()
+            IntegerRangeTable.partitioning.stats()
+        IntegerRangeTable.partitioning.create_partition()
+
+        log = IntegerRangePartitionLog.objects.order_by("start").first()
+        created = [metrics for metrics in memory.metrics if log.table_name in metrics.tables]
+        self.assertEqual("CREATE TABLE", created[0].command)
+        self.assertEqual("create", created[0].step)
+        self.assertGreater(created[0].table_sizes[log.table_name], 0)
+        self.assertIsNone(created[0].lock_wait)
+        self.assertFalse(created[0].failed)
+        self.assertEqual("", memory.metrics[-1].step)
+
+        # A failed batch is collected too.
+        with collect(memory):
+            with self.assertRaises(Exception), transaction.atomic():
+                execute_sql("DROP TABLE missing_table")
+        self.assertTrue(memory.metrics[-1].failed)
+        self.assertEqual(("missing_table",), memory.metrics[-1].tables)
+
+        text = prometheus.export()
+        self.assertIn("# TYPE pg_partitioning_statement_seconds_total counter", text)
+        self.assertIn('pg_partitioning_statements_total{step="create",command="CREATE TABLE"} ', text)
+        self.assertIn(f'pg_partitioning_table_size_bytes{{table="{log.table_name}"}} {created[0].table_sizes[log.table_name]}', text)
+        self.assertNotIn("DROP", text)
+
+
+class IterateTestCase(GeneralTestCase):
+    def setUp(self):
+        IntegerRangeTable.partitioning.create_partitions(count=3)
+        IntegerRangeTable.objects.bulk_create([IntegerRangeTable(id=i, text=str(i)) for i in range(1, 40)])
+        IntegerRangeTable.partitioning.detach_partition(IntegerRangeTable.partitioning.config.integer_logs.filter(start=10))
+
+    def test_iter_partitions(self):
+        self.assertListEqual([0, 20, 30], [log.start for log in IntegerRangeTable.partitioning.iter_partitions()])
+        self.assertListEqual([0, 10, 20, 30], [log.start for log in IntegerRangeTable.partitioning.iter_partitions(include_detached=True)])
+
+    def test_iterate(self):
+        ids = [obj.id for obj in IntegerRangeTable.partitioning.iterate(chunk_size=4)]
+        self.assertListEqual(list(range(1, 10)) + list(range(20, 40)), sorted(ids[:9]) + sorted(ids[9:]))
+
+        queryset = IntegerRangeTable.objects.filter(id__gte=5).values_list("id", flat=True)
+        self.assertListEqual(list(range(5, 40)), sorted(IntegerRangeTable.partitioning.iterate(queryset, include_detached=True)))
+
+        with self.assertNumQueries(1 + 3 + 3 + 2):
+            rows = list(IntegerRangeTable.partitioning.iterate(IntegerRangeTable.objects.filter(id__lt=35), chunk_size=4, keyset="id"))
+        self.assertListEqual(list(range(1, 10)) + list(range(20, 35)), [obj.id for obj in rows])
+        self.assertIsInstance(rows[0], IntegerRangeTable)
+
+        with self.assertRaises(ValueError):
+            list(IntegerRangeTable.partitioning.iterate(queryset, keyset="id"))
+
+
+class ArchiveTestCase(GeneralTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        IntegerRangeTable.partitioning.create_partitions(count=3)
+        IntegerRangeTable.objects.bulk_create([IntegerRangeTable(id=i, text=f"'{i}'\t") for i in range(1, 30)])
+        self.log = IntegerRangeTable.partitioning.config.integer_logs.get(start=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertArchiveRoundTrip(self, compression, extension):
+        with self.assertRaises(ValueError):
+            IntegerRangeTable.partitioning.archive_partition([self.log], self.directory, compression)
+        IntegerRangeTable.partitioning.detach_partition([self.log])
+        IntegerRangeTable.partitioning.archive_partition([self.log], self.directory, compression)
+
+        log = IntegerRangeTable.partitioning.config.integer_logs.get(start=10)
+        self.assertEqual(os.path.join(self.directory, f"{log.table_name}.copy.{extension}"), log.archive_path)
+        self.assertEqual(10, log.archive_rows)
+        self.assertEqual(file_checksum(log.archive_path), log.archive_checksum)
+        self.assertIsNone(execute_sql(f"SELECT to_regclass({single_quote(log.table_name)})", fetch=True)[0][0])
+
+        # Archived partitions are neither attached by default nor explicitly.
+        IntegerRangeTable.partitioning.attach_partition()
+        with self.assertRaises(ValueError):
+            IntegerRangeTable.partitioning.attach_partition([log])
+
+        IntegerRangeTable.partitioning.restore_partition([log], attach=True)
+        log.refresh_from_db()
+        self.assertTrue(log.is_attached)
+        self.assertIsNone(log.archive_path)
+        self.assertListEqual(
+            [f"'{i}'\t" for i in range(10, 20)], list(IntegerRangeTable.objects.filter(id__gte=10, id__lt=20).order_by("id").values_list("text", flat=True))
+        )
+
+    def test_archive_gzip(self):
+        self.assertArchiveRoundTrip(CompressionType.Gzip, "gz")
+
+    @unittest.skipUnless(importlib.util.find_spec("zstandard"), "zstandard is not installed")
+    def test_archive_zstd(self):
+        self.assertArchiveRoundTrip(CompressionType.Zstd, "zst")
+
+    def test_checksum_mismatch(self):
+        IntegerRangeTable.partitioning.detach_partition([self.log])
+        IntegerRangeTable.partitioning.archive_partition([self.log], self.directory)
+        with open(self.log.archive_path, "ab") as f:
+            f.write(b"\0")
+        with self.assertRaises(ValueError):
+            IntegerRangeTable.partitioning.restore_partition([self.log])
+
+
+class ConvertTableTestCase(GeneralTestCase):
+    def setUp(self):
+        execute_sql(
+            [
+                "DROP TABLE tests_integerrangetable",
+                'CREATE TABLE "tests_integerrangetable" ("id" bigserial NOT NULL PRIMARY KEY, "text" text NOT NULL)',
+                'CREATE INDEX "tests_integerrangetable_text" ON "tests_integerrangetable" ("text")',
+            ]
+        )
+        IntegerRangeTable.objects.bulk_create([IntegerRangeTable(text=str(i)) for i in range(1, 26)])
+
+    def get_index_names(self, table_name):
+        return [
+            row[0] for row in execute_sql(f"SELECT indexname FROM pg_indexes WHERE tablename = {single_quote(table_name)} ORDER BY indexname", fetch=True)
+        ]
+
+    def test_convert_table(self):
+        IntegerRangeTable.partitioning._create_shadow_table("tests_integerrangetable_shadow", 1)
+        # Writes after the shadow table is created are replayed by the trigger.
+        self.assertEqual(26, IntegerRangeTable.objects.create(text="26").id)
+        IntegerRangeTable.objects.filter(id=3).update(text="three")
+        IntegerRangeTable.objects.filter(id=4).delete()
+
+        self.assertEqual(23, IntegerRangeTable.partitioning.convert_table(batch_size=4))
+        self.assertEqual("p", execute_sql("SELECT relkind FROM pg_class WHERE relname = 'tests_integerrangetable'", fetch=True)[0][0])
+        self.assertListEqual(
+            [f"tests_integerrangetable_{start}_{start + 10}" for start in range(0, 40, 10)], [name for name, _ in get_partitions("tests_integerrangetable")]
+        )
+        self.assertEqual(4, IntegerRangeTable.partitioning.config.integer_logs.count())
+        self.assertListEqual(["tests_integerrangetable_pkey", "tests_integerrangetable_text"], self.get_index_names("tests_integerrangetable"))
+        self.assertListEqual(
+            ["tests_integerrangetable_pkey_legacy", "tests_integerrangetable_text_legacy"], self.get_index_names("tests_integerrangetable_legacy")
+        )
+        self.assertTablespace("tests_integerrangetable_20_30", "data1")
+
+        self.assertEqual(25, IntegerRangeTable.objects.count())
+        self.assertEqual("three", IntegerRangeTable.objects.get(id=3).text)
+        self.assertEqual(27, IntegerRangeTable.objects.create(text="27").id)
+        # The legacy table is kept, but no longer synchronized.
+        self.assertEqual(25, execute_sql("SELECT count(*) FROM tests_integerrangetable_legacy", fetch=True)[0][0])
+
+        with self.assertRaises(ValueError):
+            IntegerRangeTable.partitioning.convert_table()
+
+    def test_nullable_partition_key(self):
+        execute_sql(
+            [
+                "DROP TABLE tests_timerangedefaulttable",
+                'CREATE TABLE "tests_timerangedefaulttable" ("id" serial NOT NULL PRIMARY KEY, "text" text NOT NULL, "timestamp" timestamptz NULL)',
+                "DROP TABLE tests_timerangetableb",
+                'CREATE TABLE "tests_timerangetableb" ("id" serial NOT NULL PRIMARY KEY, "text" text NOT NULL, "timestamp" timestamptz NULL)',
+            ]
+        )
+        for model in (TimeRangeDefaultTable, TimeRangeTableB):
+            model.objects.bulk_create([model(text=str(i), timestamp=t(day=i) if i % 2 else None) for i in range(1, 8)])
+
+        with patch("django.utils.timezone.now", new=t):
+            # The rows without a value of the partition key are copied to the default partition last.
+            self.assertEqual(7, TimeRangeDefaultTable.partitioning.convert_table(batch_size=2))
+            self.assertEqual(3, execute_sql("SELECT count(*) FROM tests_timerangedefaulttable_default", fetch=True)[0][0])
+            self.assertEqual(7, TimeRangeDefaultTable.objects.count())
+
+            with self.assertRaises(ValueError):
+                TimeRangeTableB.partitioning.convert_table(batch_size=2)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("partition_convert", "tests.IntegerRangeTable", batch_size=10, partitions_ahead=0, stdout=out)
+        self.assertEqual("Converted tests_integerrangetable, 25 rows copied.", out.getvalue().strip())
+        self.assertEqual(3, len(get_partitions("tests_integerrangetable")))
+
+        with self.assertRaises(CommandError):
+            call_command("partition_convert", "tests.HashTable")
+
+
+class AggregateTestCase(TransactionTestCase):
+    def tearDown(self):
+        for log in IntegerRangePartitionLog.objects.all():
+            drop_table(log.table_name)
+
+    def test_aggregate(self):
+        IntegerRangeTable.partitioning.create_partitions(count=4)
+        IntegerRangeTable.objects.bulk_create([IntegerRangeTable(id=i, text=str(i % 3)) for i in range(1, 50)])
+        aggregates = {"sum": Sum("id"), "count": Count("id"), "min": Min("id"), "max": Max("id"), "avg": Avg("id"), "ones": Count("id", filter=Q(text="1"))}
+
+        result = IntegerRangeTable.partitioning.aggregate(max_workers=3, **aggregates)
+        self.assertDictEqual(IntegerRangeTable.objects.aggregate(**aggregates), result)
+
+        queryset = IntegerRangeTable.objects.filter(id__gt=100)
+        self.assertDictEqual(
+            {"sum": None, "count": 0, "avg": None}, IntegerRangeTable.partitioning.aggregate(queryset, sum=Sum("id"), count=Count("id"), avg=Avg("id"))
+        )
+
+        queryset = IntegerRangeTable.objects.filter(text="2")
+        self.assertEqual(queryset.aggregate(avg=Avg("id")), IntegerRangeTable.partitioning.aggregate(queryset, avg=Avg("id")))
+
+        with self.assertRaises(ValueError):
+            IntegerRangeTable.partitioning.aggregate(count=Count("text", distinct=True))
+
+
+class MaintainTestCase(TransactionTestCase):
+    def tearDown(self):
+        for log in IntegerRangePartitionLog.objects.all():
+            drop_table(log.table_name)
+
+    def test_maintain(self):
+        IntegerRangeTable.partitioning.create_partitions(count=1)
+        IntegerRangeTable.objects.bulk_create([IntegerRangeTable(id=i, text=str(i)) for i in range(1, 20)])
+        PartitionConfig.objects.filter(model_label="tests.integerrangetable").update(max_partitions=2)
+
+        out = StringIO()
+        call_command("partition_maintain", "tests.IntegerRangeTable", "tests.HashTable", workers=2, stdout=out)
+        self.assertListEqual(["tests.IntegerRangeTable: maintained", "tests.HashTable: maintained"], out.getvalue().splitlines())
+        self.assertListEqual(
+            [(0, False), (10, True), (20, True)], list(IntegerRangePartitionLog.objects.order_by("start").values_list("start", "is_attached"))
+        )
+
+        # Another node maintaining the model holds the lock.
+        out = StringIO()
+        with try_advisory_lock("pg_partitioning.maintain.tests.integerrangetable") as acquired:
+            self.assertTrue(acquired)
+            call_command("partition_maintain", "tests.IntegerRangeTable", stdout=out)
+        self.assertEqual("tests.IntegerRangeTable: skipped, locked by another process", out.getvalue().strip())
+
+        with self.assertRaises(CommandError):
+            call_command("partition_maintain", "tests.Unknown")
+
+    def test_lock(self):
+        # The configuration is read without a transaction, the lock requires one.
+        self.assertEqual("tests.integerrangetable", IntegerRangeTable.partitioning.config.model_label)
+        with self.assertRaises(TransactionManagementError):
+            IntegerRangeTable.partitioning.lock()
+
+        other_connection = connection.get_new_connection(connection.get_connection_params())
+        try:
+            with transaction.atomic():
+                self.assertTrue(IntegerRangeTable.partitioning.lock())
+                with other_connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_try_advisory_lock(%s)", [_advisory_lock_key("pg_partitioning.tests.integerrangetable")])
+                    self.assertFalse(cursor.fetchone()[0])
+                    # Another model is not blocked.
+                    cursor.execute("SELECT pg_try_advisory_lock(%s)", [_advisory_lock_key("pg_partitioning.tests.hashtable")])
+                    self.assertTrue(cursor.fetchone()[0])
+            # The lock is released at the end of the transaction.
+            with other_connection.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [_advisory_lock_key("pg_partitioning.tests.integerrangetable")])
+                self.assertTrue(cursor.fetchone()[0])
+        finally:
+            other_connection.close()
+
+
+class DetachConcurrentlyTestCase(TransactionTestCase):
+    def setUp(self):
+        self.options = TimeRangeTableB.partitioning.options
+        TimeRangeTableB.partitioning.options = dict(self.options, default_period=PeriodType.Day, lock_timeout=100, lock_retries=2)
+        with patch("django.utils.timezone.now", new=t):
+            TimeRangeTableB.partitioning.create_partitions(count=3)
+        self.other_connection = connection.get_new_connection(connection.get_connection_params())
+
+    def tearDown(self):
+        self.other_connection.close()
+        for log in PartitionLog.objects.all():
+            drop_table(log.table_name)
+        TimeRangeTableB.partitioning.options = self.options
+
+    def assertPendingDetach(self, count):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_inherits WHERE inhdetachpending")
+            self.assertEqual(count, cursor.fetchone()[0])
+
+    def test_detach_partition_concurrently(self):
+        logs = list(PartitionLog.objects.all())
+        self.assertEqual(4, len(logs))
+
+        with transaction.atomic():
+            self.assertRaises(TransactionManagementError, TimeRangeTableB.partitioning.detach_partition, logs, concurrently=True)
+
+        receiver, log_receiver = Mock(), Mock()
+        post_detach_partitions.connect(receiver)
+        post_detach_partition.connect(log_receiver)
+        try:
+            TimeRangeTableB.partitioning.detach_partition(logs[:2], concurrently=True)
+            TimeRangeTableB.partitioning.detach_partition(logs, concurrently=True)
+        finally:
+            post_detach_partitions.disconnect(receiver)
+            post_detach_partition.disconnect(log_receiver)
+        self.assertListEqual([2, 2], [len(call[1]["partition_logs"]) for call in receiver.call_args_list])
+        self.assertEqual(4, log_receiver.call_count)
+        self.assertEqual(0, PartitionLog.objects.filter(is_attached=True).count())
+        for log in logs:
+            self.assertFalse(log.is_attached)
+            GeneralTestCase.assertTablespace(self, log.table_name, "data1")
+
+    def test_detach_partition_lock_timeout(self):
+        log = PartitionLog.objects.first()
+        with self.other_connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {TimeRangeTableB._meta.db_table} IN ACCESS EXCLUSIVE MODE")
+
+        with patch("pg_partitioning.shortcuts.time.sleep") as sleep:
+            self.assertRaises(OperationalError, TimeRangeTableB.partitioning.detach_partition, [log], concurrently=True)
+            self.assertEqual(2, sleep.call_count)
+        log.refresh_from_db()
+        self.assertTrue(log.is_attached)
+
+        self.other_connection.rollback()
+        TimeRangeTableB.partitioning.detach_partition([log], concurrently=True)
+        log.refresh_from_db()
+        self.assertFalse(log.is_attached)
+
+    def test_detach_partition_finalize(self):
+        log = PartitionLog.objects.first()
+        with self.other_connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {TimeRangeTableB._meta.db_table}")
+
+        # Waiting for the transaction of the other connection is interrupted, so the partition is left pending.
+        with lock_timeout(100):
+            sql = f'ALTER TABLE {TimeRangeTableB._meta.db_table} DETACH PARTITION "{log.table_name}" CONCURRENTLY'
+            self.assertRaises(OperationalError, execute_sql, sql)
+        self.assertPendingDetach(1)
+
+        self.other_connection.rollback()
+        TimeRangeTableB.partitioning.detach_partition(concurrently=True)  # No partition to detach but the pending one.
+        self.assertPendingDetach(0)
+        log.refresh_from_db()
+        self.assertFalse(log.is_attached)
+        self.assertEqual(1, PartitionLog.objects.filter(is_attached=False).count())
+
+    def test_detach_partition_model_lock(self):
+        key = _advisory_lock_key(f"pg_partitioning.{TimeRangeTableB._meta.label_lower}")
+        acquired = list()
+
+        def execute(execute, sql, params, many, context):
+            if "CONCURRENTLY" in sql:
+                # The lock of the model is held between the transactions detaching the partitions.
+                with self.other_connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [key])
+                    acquired.append(cursor.fetchone()[0])
+                self.other_connection.rollback()
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(execute):
+            TimeRangeTableB.partitioning.detach_partition(PartitionLog.objects.all()[:2], concurrently=True)
+        self.assertListEqual([False, False], acquired)
+
+        with self.other_connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [key])
+        self.assertRaises(OperationalError, TimeRangeTableB.partitioning.detach_partition, concurrently=True)
+        self.other_connection.rollback()
+
+    def test_lock_wait(self):
+        with self.other_connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {TimeRangeTableB._meta.db_table} IN ACCESS EXCLUSIVE MODE")
+        timer = threading.Timer(0.5, self.other_connection.rollback)
+        timer.start()
+        with collect(MemoryCollector(lock_wait_interval=0.01)) as collector:
+            execute_sql(f"SELECT count(*) FROM {TimeRangeTableB._meta.db_table}", fetch=True)
+        timer.join()
+        metrics = collector.metrics[0]
+        self.assertEqual("SELECT", metrics.command)
+        self.assertGreater(metrics.lock_wait, 0.3)
+        self.assertGreaterEqual(metrics.duration, metrics.lock_wait)
+
+
+class AttachTestCase(TransactionTestCase):
+    def setUp(self):
+        with patch("django.utils.timezone.now", new=t):
+            TimeRangeDefaultTable.partitioning.create_partitions(count=2)
+        self.log = PartitionLog.objects.filter(config=TimeRangeDefaultTable.partitioning.config).order_by("start").first()
+        TimeRangeDefaultTable.partitioning.detach_partition([self.log])
+        self.other_connection = connection.get_new_connection(connection.get_connection_params())
+
+    def tearDown(self):
+        self.other_connection.close()
+        for log in PartitionLog.objects.all():
+            drop_table(log.table_name)
+
+    def get_constraints(self, cursor):
+        cursor.execute(
+            "SELECT relname, convalidated FROM pg_constraint JOIN pg_class c ON c.oid = conrelid WHERE conname = %s ORDER BY 1",
+            [f"{self.log.table_name}_partition_check"],
+        )
+        return cursor.fetchall()
+
+    def test_attach_partition(self):
+        constraints = list()
+
+        def execute(execute, sql, params, many, context):
+            if "ATTACH PARTITION" in sql:
+                # The constraints are validated and committed before the transaction attaching the partition.
+                with self.other_connection.cursor() as cursor:
+                    constraints.extend(self.get_constraints(cursor))
+                self.other_connection.rollback()
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(execute):
+            TimeRangeDefaultTable.partitioning.attach_partition([self.log])
+        default = TimeRangeDefaultTable.partitioning.default_partition_table_name
+        self.assertListEqual(sorted([(default, True), (self.log.table_name, True)]), constraints)
+        self.log.refresh_from_db()
+        self.assertTrue(self.log.is_attached)
+        with connection.cursor() as cursor:
+            self.assertListEqual([], self.get_constraints(cursor))
+
+    def test_attach_partition_failed(self):
+        execute_sql(f"INSERT INTO {double_quote(self.log.table_name)} (text, timestamp) VALUES ('A', '2000-01-01')")
+        self.assertRaises(IntegrityError, TimeRangeDefaultTable.partitioning.attach_partition, [self.log])
+        self.log.refresh_from_db()
+        self.assertFalse(self.log.is_attached)
+        # The constraints are dropped, so that rows of the bound can still be written to the default partition.
+        with connection.cursor() as cursor:
+            self.assertListEqual([], self.get_constraints(cursor))
+
+
+class IntegerRangePartitioningTestCase(GeneralTestCase):
+    def assertRangeEqual(self, start, end):
+        log: IntegerRangePartitionLog = IntegerRangeTable.partitioning.latest
+        self.assertEqual((start, end), (log.start, log.end))
+        self.assertEqual(f"{IntegerRangeTable._meta.db_table}_{start}_{end}", log.table_name)
+
+    def test_create_partition(self):
+        config: PartitionConfig = IntegerRangeTable.partitioning.config
+        self.assertEqual(10, config.width)
+        self.assertRangeEqual(0, 10)
+
+        # Repeated calls will not produce wrong results (idempotence).
+        for _ in range(3):
+            IntegerRangeTable.partitioning.create_partition()
+        self.assertRangeEqual(10, 20)
+
+        IntegerRangeTable.objects.create(id=15, text="A")
+        IntegerRangeTable.partitioning.create_partition(2)
+        self.assertRangeEqual(30, 40)
+        IntegerRangeTable.partitioning.create_partition(0)
+        self.assertRangeEqual(40, 50)
+
+        config.width = 100
+        config.save()
+        IntegerRangeTable.partitioning.create_partition(0)
+        self.assertRangeEqual(50, 150)
+        self.assertTablespace(IntegerRangeTable.partitioning.latest.table_name, "data1")
+
+        IntegerRangeTable.objects.create(id=120, text="B")
+        self.assertEqual(["A", "B"], list(IntegerRangeTable.objects.order_by("id").values_list("text", flat=True)))
+
+    def test_create_partitions(self):
+        logs = IntegerRangeTable.partitioning.create_partitions(until=55)
+        self.assertEqual([10, 20, 30, 40, 50], [log.start for log in logs])
+        self.assertRangeEqual(50, 60)
+        self.assertEqual(2, len(IntegerRangeTable.partitioning.create_partitions(count=2)))
+        self.assertRangeEqual(70, 80)
+
+    def test_attach_or_detach_partition(self):
+        IntegerRangeTable.partitioning.create_partitions(count=5)
+        IntegerRangeTable.objects.create(id=55, text="A")
+        config: PartitionConfig = IntegerRangeTable.partitioning.config
+
+        # Partitions ending at least two widths below the maximum value are detached.
+        config.interval = 2
+        config.save()
+        self.assertListEqual([0, 10, 20], list(config.integer_logs.filter(is_attached=False).order_by("start").values_list("start", flat=True)))
+        for log in config.integer_logs.filter(is_attached=False):
+            self.assertTablespace(log.table_name, "data2")
+        self.assertEqual(1, IntegerRangeTable.objects.count())
+
+        log = config.integer_logs.get(start=20)
+        self.assertAttachedWithoutScan(log.table_name, IntegerRangeTable.partitioning.attach_partition, [log])
+        self.assertTablespace(log.table_name, "data1")
+
+        IntegerRangeTable.partitioning.delete_partition(config.integer_logs.filter(is_attached=False))
+        self.assertEqual(4, config.integer_logs.count())
+
+    def test_partition_key_type(self):
+        from pg_partitioning.decorators import IntegerRangePartitioning
+
+        self.assertRaises(ValueError, IntegerRangePartitioning(partition_key="text"), IntegerRangeTable)
+
+
+class HashPartitioningTestCase(TransactionTestCase):
+    def tearDown(self):
+        # Restore the layout created together with the table.
+        for table_name, _, _ in HashTable.partitioning.partitions:
+            drop_table(table_name)
+        HashTable.partitioning.create_partitions()
+
+    def assertLayout(self, layout):
+        self.assertListEqual(layout, [(modulus, remainder) for _, modulus, remainder in HashTable.partitioning.partitions])
+
+    def test_create_partitions(self):
+        self.assertLayout([(4, 0), (4, 1), (4, 2), (4, 3)])
+        self.assertEqual("tests_hashtable_4_1", HashTable.partitioning.partitions[1][0])
+        HashTable.objects.bulk_create([HashTable(id=i, text=str(i)) for i in range(1, 101)])
+        self.assertEqual(100, HashTable.objects.count())
+        for table_name, _, _ in HashTable.partitioning.partitions:
+            self.assertLess(0, execute_sql(f"SELECT count(*) FROM {table_name}", fetch=True)[0][0])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT tablespace FROM pg_tables WHERE tablename LIKE 'tests_hashtable_%'")
+            self.assertListEqual([("data1",)], cursor.fetchall())
+
+    def test_split_partitions(self):
+        HashTable.objects.bulk_create([HashTable(id=i, text=str(i)) for i in range(1, 101)])
+        with transaction.atomic():
+            self.assertRaises(TransactionManagementError, HashTable.partitioning.split_partitions)
+
+        HashTable.partitioning.split_partitions()
+        self.assertLayout([(8, i) for i in range(8)])
+        self.assertEqual(100, HashTable.objects.count())
+        self.assertEqual("50", HashTable.objects.get(id=50).text)
+        counts = [execute_sql(f"SELECT count(*) FROM {table_name}", fetch=True)[0][0] for table_name, _, _ in HashTable.partitioning.partitions]
+        self.assertEqual(100, sum(counts))
+
+        # An interrupted split is resumed with the same target modulus.
+        HashTable.partitioning._split_partition("tests_hashtable_8_0", 16, range(0, 16, 8), None)
+        HashTable.partitioning.split_partitions()
+        self.assertLayout([(16, i) for i in range(16)])
+        self.assertEqual(100, HashTable.objects.count())
+        HashTable.objects.create(id=1000, text="A")
+        self.assertEqual(101, HashTable.objects.count())
+
+        execute_sql([f"DROP TABLE {table_name}" for table_name, _, _ in HashTable.partitioning.partitions])
+        self.assertListEqual([], HashTable.partitioning.partitions)
+        self.assertRaises(ValueError, HashTable.partitioning.split_partitions)
+
+    def test_split_partitions_without_scan(self):
+        HashTable.objects.bulk_create([HashTable(id=i, text=str(i)) for i in range(1, 101)])
+        with connection.cursor() as cursor:
+            cursor.execute("SET client_min_messages = debug1")
+            del connection.connection.notices[:]
+            try:
+                HashTable.partitioning.split_partitions()
+            finally:
+                cursor.execute("RESET client_min_messages")
+            notices = list(connection.connection.notices)
+            for remainder in range(8):
+                self.assertTrue(any(f'"tests_hashtable_8_{remainder}" is implied by existing constraints' in notice for notice in notices))
+
+            # The new partitions are created with the indexes of the table, and their temporary constraints are dropped.
+            cursor.execute("SELECT count(*) FROM pg_constraint WHERE conrelid::regclass::text LIKE 'tests_hashtable_8_%' AND contype = 'c'")
+            self.assertEqual(0, cursor.fetchone()[0])
+            cursor.execute("SELECT count(*) FROM pg_indexes WHERE tablename LIKE 'tests_hashtable_8_%'")
+            self.assertEqual(8, cursor.fetchone()[0])
+
 
 class ListPartitioningTestCase(GeneralTestCase):
     @classmethod
@@ -254,5 +1492,9 @@ class ListPartitioningTestCase(GeneralTestCase):
         self.test_create_partition()
         ListTableText.partitioning.detach_partition("list_table_text_none", "data1")
         self.assertTablespace("list_table_text_none", "data1")
-        ListTableText.partitioning.attach_partition("list_table_text_none", None, "data2")
+        self.assertAttachedWithoutScan("list_table_text_none", ListTableText.partitioning.attach_partition, "list_table_text_none", None, "data2")
         self.assertTablespace("list_table_text_none", "data2")
+
+        ListTableInt.partitioning.detach_partition("list_table_int_1")
+        self.assertAttachedWithoutScan("list_table_int_1", ListTableInt.partitioning.attach_partition, "list_table_int_1", 1)
+        self.assertEqual(1, ListTableInt.objects.filter(category=1).count())